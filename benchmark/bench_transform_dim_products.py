@@ -0,0 +1,92 @@
+"""
+Benchmarks dim_products price cleaning and store key lookup against the previous row-wise code.
+
+    python -m benchmark.bench_transform_dim_products --rows 1000000
+"""
+import argparse
+import json
+import re
+import time
+import numpy as np
+import pandas as pd
+from src.utils.surrogate_key import resolve_surrogate_key
+from src.warehouse.transform.transform_dim_products import clean_price
+
+STORE_NAMES = ['Setara Coffee', 'Laci Coffee', 'Kopi Senja', 'Pacman Roastery', 'Teras Kopi']
+
+def make_products(rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    prices = rng.integers(5, 60, size=rows)
+    # About 5% of the feed carries the negative prices seen in the source data
+    signs = np.where(rng.random(rows) < 0.05, '-', '')
+    unit_price = pd.Series(signs, dtype=object) + '$' + pd.Series(prices).astype(str) + '.00'
+    cost_price = '$' + pd.Series(prices - rng.integers(1, 5, size=rows)).astype(str) + '.00'
+    return pd.DataFrame({
+        'unit_price': unit_price,
+        'cost_price': cost_price,
+        'store_name': rng.choice(STORE_NAMES, size=rows)
+    })
+
+def legacy_clean(data: pd.DataFrame) -> pd.DataFrame:
+    # The four .apply(re.sub) passes transform_dim_products used before
+    data = data.copy()
+    data['unit_price'] = pd.to_numeric(data['unit_price'].apply(lambda x: re.sub(r'\D', '', str(x))), errors='coerce')
+    data['cost_price'] = pd.to_numeric(data['cost_price'].apply(lambda x: re.sub(r'\D', '', str(x))), errors='coerce')
+    data['unit_price'] = data['unit_price'].apply(lambda x: re.sub(r'\s*-', '', str(x)))
+    data['cost_price'] = data['cost_price'].apply(lambda x: re.sub(r'\s*-', '', str(x)))
+    return data
+
+def vectorized_clean(data: pd.DataFrame) -> pd.DataFrame:
+    data = data.copy()
+    data['unit_price'] = clean_price(data['unit_price'])
+    data['cost_price'] = clean_price(data['cost_price'])
+    return data
+
+def legacy_store_lookup(data: pd.DataFrame, dim: pd.DataFrame) -> pd.Series:
+    return data['store_name'].apply(lambda x: dim.loc[dim['store_name'] == x, 'sk_store_id'].values[0])
+
+def vectorized_store_lookup(data: pd.DataFrame, dim: pd.DataFrame) -> pd.Series:
+    lookup = dim.set_index('store_name')['sk_store_id']
+    return resolve_surrogate_key(data, 'store_name', lookup, 'sk_store_branch')[0]['sk_store_branch']
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--legacy-rows', type=int, default=100_000,
+                        help="rows given to the row-wise store lookup, which is too slow for the full feed")
+    args = parser.parse_args()
+
+    data = make_products(args.rows)
+    dim = pd.DataFrame({'store_name': STORE_NAMES, 'sk_store_id': range(1, len(STORE_NAMES) + 1)})
+    legacy_sample = data.head(args.legacy_rows)
+
+    results = []
+    for stage, func, frame in [
+        ('price_clean_legacy', legacy_clean, data),
+        ('price_clean_vectorized', vectorized_clean, data),
+        ('store_lookup_legacy', lambda df: legacy_store_lookup(df, dim), legacy_sample),
+        ('store_lookup_vectorized', lambda df: vectorized_store_lookup(df, dim), data),
+    ]:
+        elapsed = timed(func, frame)
+        results.append({
+            'stage': stage,
+            'rows': len(frame),
+            'wall_time_sec': round(elapsed, 4),
+            'rows_per_sec': round(len(frame) / elapsed) if elapsed > 0 else None
+        })
+
+    rates = {result['stage']: result['rows_per_sec'] for result in results}
+    for result in results:
+        print(json.dumps(result))
+    print(json.dumps({
+        'price_clean_speedup': round(rates['price_clean_vectorized'] / rates['price_clean_legacy'], 1),
+        'store_lookup_speedup': round(rates['store_lookup_vectorized'] / rates['store_lookup_legacy'], 1)
+    }))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Deterministic synthetic Paccafe data at a configurable order volume.
+
+Every table is generated in chunks from its own seeded random stream, so the same
+(orders, seed, chunk_rows) always produces the same rows. The data carries the dirty
+values found in the real source: negative and '$'-prefixed prices, bogus employee roles
+and orders without a customer.
+"""
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = np.array(['John', 'Gregory', 'Chris', 'Paul', 'Jessica', 'Christian', 'Robert', 'Courtney', 'Roy', 'Shannon', 'Denise', 'Sean'])
+LAST_NAMES = np.array(['Gordon', 'Curry', 'Allen', 'Hawkins', 'Hendricks', 'Shepherd', 'Perry', 'Miller', 'Gilbert', 'Gonzalez', 'Brown', 'Farmer'])
+ROLES = np.array(['Cashier', 'Waitress', 'Barista', 'Manager'])
+BOGUS_ROLES = np.array(['today', 'third', 'me'])
+CATEGORIES = np.array(['Coffee', 'Tea', 'Pastry', 'Snack', 'Merchandise'])
+STORE_NAMES = np.array(['Setara Coffee', 'Laci Coffee', 'Kopi Senja', 'Pacman Roastery', 'Teras Kopi'])
+PAYMENT_METHODS = np.array(['Cash', 'Credit Card', 'Debit Card', 'E-Wallet'])
+ORDER_STATUSES = np.array(['Completed', 'Pending', 'Cancelled'])
+REASONS = np.array(['Restock', 'Damaged', 'Sold', 'Expired'])
+
+START_DATE = np.datetime64('2020-01-01T00:00:00')
+DATE_RANGE_SECONDS = 5 * 365 * 24 * 3600
+
+# Table -> primary key, in generation order
+TABLES = {
+    'store_branch': 'store_id',
+    'customers': 'customer_id',
+    'employees': 'employee_id',
+    'products': 'product_id',
+    'orders': 'order_id',
+    'order_details': 'order_detail_id',
+    'inventory_tracking': 'tracking_id'
+}
+
+def table_sizes(orders: int) -> dict:
+    """
+    Row counts for every table at a given order volume.
+    """
+    return {
+        'store_branch': len(STORE_NAMES),
+        'customers': max(100, orders // 10),
+        'employees': max(20, orders // 500),
+        'products': max(50, orders // 1000),
+        'orders': orders,
+        'order_details': orders * 3,
+        'inventory_tracking': max(100, orders // 2)
+    }
+
+def _timestamps(rng, rows: int) -> np.ndarray:
+    return START_DATE + rng.integers(0, DATE_RANGE_SECONDS, size=rows).astype('timedelta64[s]')
+
+def _prices(rng, base: np.ndarray, negative_share: float) -> pd.Series:
+    signs = np.where(rng.random(len(base)) < negative_share, '-', '')
+    return pd.Series(signs, dtype=object) + '$' + pd.Series(base).astype(str) + '.00'
+
+def _store_branch(rng, ids, sizes):
+    return pd.DataFrame({
+        'store_id': ids,
+        'store_name': STORE_NAMES[(ids - 1) % len(STORE_NAMES)],
+        'created_at': _timestamps(rng, len(ids))
+    })
+
+def _customers(rng, ids, sizes):
+    first = rng.choice(FIRST_NAMES, size=len(ids))
+    last = rng.choice(LAST_NAMES, size=len(ids))
+    return pd.DataFrame({
+        'customer_id': ids,
+        'first_name': first,
+        'last_name': last,
+        'email': pd.Series(first).str.lower() + '.' + pd.Series(ids).astype(str) + '@example.com',
+        'phone': pd.Series(rng.integers(10**12, 10**13, size=len(ids))).astype(str),
+        'loyalty_points': rng.integers(0, 1000, size=len(ids)),
+        'created_at': _timestamps(rng, len(ids))
+    })
+
+def _employees(rng, ids, sizes):
+    first = rng.choice(FIRST_NAMES, size=len(ids))
+    roles = np.where(rng.random(len(ids)) < 0.05, rng.choice(BOGUS_ROLES, size=len(ids)), rng.choice(ROLES, size=len(ids)))
+    created_at = _timestamps(rng, len(ids))
+    return pd.DataFrame({
+        'employee_id': ids,
+        'first_name': first,
+        'last_name': rng.choice(LAST_NAMES, size=len(ids)),
+        'hire_date': created_at.astype('datetime64[D]'),
+        'role': roles,
+        'email': pd.Series(first).str.lower() + '.staff' + pd.Series(ids).astype(str) + '@example.org',
+        'created_at': created_at
+    })
+
+def _products(rng, ids, sizes):
+    unit = rng.integers(5, 60, size=len(ids))
+    category = rng.choice(CATEGORIES, size=len(ids))
+    return pd.DataFrame({
+        'product_id': ids,
+        'product_name': pd.Series(category) + ' ' + pd.Series(ids).astype(str),
+        'category': category,
+        'unit_price': _prices(rng, unit, 0.05),
+        'cost_price': _prices(rng, unit - rng.integers(1, 5, size=len(ids)), 0.05),
+        'in_stock': rng.choice(np.array(['Yes', 'No']), size=len(ids)),
+        'store_branch': rng.choice(STORE_NAMES, size=len(ids)),
+        'created_at': _timestamps(rng, len(ids))
+    })
+
+def _orders(rng, ids, sizes):
+    customers = rng.integers(1, sizes['customers'] + 1, size=len(ids)).astype('float64')
+    customers[rng.random(len(ids)) < 0.1] = np.nan
+    order_date = _timestamps(rng, len(ids))
+    return pd.DataFrame({
+        'order_id': ids,
+        'employee_id': rng.integers(1, sizes['employees'] + 1, size=len(ids)),
+        'customer_id': pd.array(customers, dtype='Int64'),
+        'order_date': order_date,
+        'total_amount': rng.integers(10, 500, size=len(ids)).astype('float64'),
+        'payment_method': rng.choice(PAYMENT_METHODS, size=len(ids)),
+        'order_status': rng.choice(ORDER_STATUSES, size=len(ids)),
+        'created_at': order_date
+    })
+
+def _order_details(rng, ids, sizes):
+    quantity = rng.integers(1, 10, size=len(ids))
+    unit_price = rng.integers(5, 60, size=len(ids)).astype('float64')
+    return pd.DataFrame({
+        'order_detail_id': ids,
+        'order_id': (ids - 1) // 3 + 1,
+        'product_id': rng.integers(1, sizes['products'] + 1, size=len(ids)),
+        'quantity': quantity,
+        'unit_price': unit_price,
+        'subtotal': quantity * unit_price,
+        'created_at': _timestamps(rng, len(ids))
+    })
+
+def _inventory_tracking(rng, ids, sizes):
+    change_date = _timestamps(rng, len(ids))
+    return pd.DataFrame({
+        'tracking_id': ids,
+        'product_id': rng.integers(1, sizes['products'] + 1, size=len(ids)),
+        'quantity_change': rng.integers(-20, 50, size=len(ids)),
+        'change_date': change_date,
+        'reason': rng.choice(REASONS, size=len(ids)),
+        'created_at': change_date
+    })
+
+_GENERATORS = {
+    'store_branch': _store_branch,
+    'customers': _customers,
+    'employees': _employees,
+    'products': _products,
+    'orders': _orders,
+    'order_details': _order_details,
+    'inventory_tracking': _inventory_tracking
+}
+
+def generate_table(table_name: str, orders: int, seed: int = 42, chunk_rows: int = 1_000_000):
+    """
+    Yields the rows of one table as DataFrame chunks of at most chunk_rows rows.
+    """
+    sizes = table_sizes(orders)
+    table_index = list(TABLES).index(table_name)
+    total = sizes[table_name]
+    for chunk_index, start in enumerate(range(0, total, chunk_rows)):
+        rng = np.random.default_rng([seed, table_index, chunk_index])
+        ids = np.arange(start + 1, min(start + chunk_rows, total) + 1)
+        yield _GENERATORS[table_name](rng, ids, sizes)
+
+def generate_dataset(orders: int, seed: int = 42) -> dict:
+    """
+    Generates every table in memory; meant for small and medium scales.
+    """
+    return {
+        table_name: pd.concat(list(generate_table(table_name, orders, seed)), ignore_index=True)
+        for table_name in TABLES
+    }
@@ -0,0 +1,247 @@
+"""
+Runs every staging and warehouse stage on synthetic data and reports rows/s, wall time
+and peak memory per stage as JSON lines. Peak memory is the rise of the process's peak RSS during
+the stage, as etl_log records it (0 when the stage stayed under an earlier high-water mark);
+it is read from the kernel, so it adds nothing to the timed section.
+
+    python -m benchmark.run_benchmark --orders 10000                  # embedded SQLite stand-in
+    python -m benchmark.run_benchmark --orders 1000000 --db postgres --yes --output bench.jsonl
+
+--db postgres uses the databases configured in .env and TRUNCATES their pipeline tables and
+etl_log first, so point it at benchmark databases only.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+from benchmark.generator import TABLES, generate_table, table_sizes
+
+SOURCE_TABLES = [table_name for table_name in TABLES if table_name != 'store_branch']
+
+# Warehouse tables as produced by the transforms, with the surrogate key first for dimensions
+WAREHOUSE_TABLES = {
+    'dim_store_branch': ('sk_store_id', 'nk_store_id', ['store_name', 'created_at']),
+    'dim_customers': ('sk_customer_id', 'nk_customer_id', ['first_name', 'last_name', 'email', 'phone', 'loyalty_points', 'created_at']),
+    'dim_employees': ('sk_employee_id', 'nk_employee_id', ['first_name', 'last_name', 'hire_date', 'role', 'email', 'created_at']),
+    'dim_products': ('sk_product_id', 'nk_product_id', ['product_name', 'category', 'unit_price', 'cost_price', 'in_stock', 'sk_store_branch', 'created_at']),
+    'fct_order': (None, 'nk_order_id', ['order_date', 'total_amount', 'payment_method', 'order_status', 'created_at', 'sk_employee_id', 'sk_customer_id']),
+    'fct_inventory': (None, 'nk_tracking_id', ['nk_product_id', 'quantity_change', 'change_date', 'reason', 'created_at'])
+}
+
+def _sqlite_type(dtype) -> str:
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+def _sqlite_engine(workdir: str, name: str):
+    """
+    SQLite engine whose data lives in an attached database called 'public',
+    so the pipeline's schema-qualified and unqualified queries both resolve.
+    """
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, name + '_main.db')}",
+                           connect_args={'check_same_thread': False, 'detect_types': sqlite3.PARSE_DECLTYPES})
+
+    @event.listens_for(engine, 'connect')
+    def _attach_public(dbapi_conn, conn_record):
+        dbapi_conn.execute(f"ATTACH DATABASE '{os.path.join(workdir, name + '.db')}' AS public")
+
+    return engine
+
+def _create_sqlite_schema(orders: int, seed: int):
+    from src.utils.helper import get_db_connection
+
+    samples = {table_name: next(generate_table(table_name, orders, seed, chunk_rows=10)) for table_name in TABLES}
+    for db_type in ('source', 'staging'):
+        with get_db_connection(db_type).begin() as conn:
+            for table_name, idx_name in TABLES.items():
+                columns = [f'"{col}" {_sqlite_type(dtype)}' for col, dtype in samples[table_name].dtypes.items() if col != 'created_at']
+                columns.append('"created_at" TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+                conn.execute(text(f'CREATE TABLE public.{table_name} ({", ".join(columns)}, PRIMARY KEY ("{idx_name}"))'))
+
+    # etl_log plus the etl_watermark table and trigger from log_data/data/init.sql
+    with get_db_connection('log').begin() as conn:
+        conn.execute(text("CREATE TABLE etl_log (step TEXT, component TEXT, status TEXT, table_name TEXT, etl_date TIMESTAMP, error_msg TEXT, "
+                          "duration_sec REAL, rows_in INTEGER, rows_out INTEGER, bytes_read INTEGER, rows_rejected INTEGER, peak_memory_mb REAL)"))
+        conn.execute(text("CREATE TABLE public.etl_row_hash (step TEXT, table_name TEXT, row_key TEXT, row_hash INTEGER, PRIMARY KEY (step, table_name, row_key))"))
+        conn.execute(text("CREATE TABLE etl_watermark (step TEXT, component TEXT, status TEXT, table_name TEXT, etl_date TIMESTAMP, PRIMARY KEY (step, component, status, table_name))"))
+        conn.execute(text(
+            "CREATE TRIGGER etl_log_watermark AFTER INSERT ON etl_log BEGIN "
+            "INSERT INTO etl_watermark (step, component, status, table_name, etl_date) "
+            "SELECT NEW.step, NEW.component, NEW.status, lower(NEW.table_name), NEW.etl_date "
+            "WHERE NEW.step IS NOT NULL AND NEW.component IS NOT NULL AND NEW.status IS NOT NULL AND NEW.table_name IS NOT NULL "
+            "ON CONFLICT (step, component, status, table_name) DO UPDATE SET etl_date = max(etl_date, excluded.etl_date); "
+            "END"
+        ))
+
+    with get_db_connection('warehouse').begin() as conn:
+        for table_name, (sk_col, nk_col, columns) in WAREHOUSE_TABLES.items():
+            if sk_col:
+                definition = [f'"{sk_col}" INTEGER PRIMARY KEY AUTOINCREMENT', f'"{nk_col}" INTEGER UNIQUE']
+            else:
+                definition = [f'"{nk_col}" INTEGER PRIMARY KEY']
+            definition += [f'"{col}" TIMESTAMP' if col in ('created_at', 'hire_date') else f'"{col}"' for col in columns]
+            conn.execute(text(f'CREATE TABLE public.{table_name} ({", ".join(definition)})'))
+
+def _truncate_postgres():
+    from src.utils.helper import get_db_connection
+
+    with get_db_connection('source').begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join('public.' + name for name in SOURCE_TABLES)} CASCADE"))
+    with get_db_connection('staging').begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join('public.' + name for name in TABLES)} CASCADE"))
+    with get_db_connection('warehouse').begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join('public.' + name for name in WAREHOUSE_TABLES)} CASCADE"))
+    with get_db_connection('log').begin() as conn:
+        conn.execute(text("TRUNCATE public.etl_log, public.etl_watermark, public.etl_row_hash"))
+
+def _seed_source(orders: int, seed: int, db: str) -> int:
+    from src.utils.helper import get_db_connection
+    from src.utils.loader import write_table
+
+    rows = 0
+    for table_name in SOURCE_TABLES:
+        for chunk in generate_table(table_name, orders, seed):
+            if db == 'postgres':
+                write_table(get_db_connection('source'), chunk.set_index(TABLES[table_name]), 'public', table_name, mode='copy')
+            else:
+                chunk.to_sql(table_name, get_db_connection('source'), schema='public', if_exists='append', index=False)
+            rows += len(chunk)
+    return rows
+
+class StageRecorder:
+    """
+    Times one stage at a time and collects its result as a dict.
+    """
+    def __init__(self, backend: str, orders: int, seed: int):
+        self.backend = backend
+        self.orders = orders
+        self.seed = seed
+        self.records = []
+
+    def run(self, stage: str, table_name: str, func, *args):
+        from src.utils.metrics import peak_rss_mb
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        output = func(*args)
+        elapsed = time.perf_counter() - start
+        peak = peak_rss_mb()
+
+        if isinstance(output, pd.DataFrame):
+            rows = len(output)
+        elif isinstance(output, int) and not isinstance(output, bool):
+            rows = output
+        elif args and isinstance(args[0], pd.DataFrame):
+            rows = len(args[0])
+        else:
+            rows = None
+
+        record = {
+            'backend': self.backend,
+            'orders': self.orders,
+            'seed': self.seed,
+            'stage': stage,
+            'table_name': table_name,
+            'status': 'failed' if output is None else 'success',
+            'rows': rows,
+            'wall_time_sec': round(elapsed, 4),
+            'rows_per_sec': round(rows / elapsed) if rows and elapsed > 0 else None,
+            'peak_memory_mb': round(max(peak - baseline, 0), 2)
+        }
+        self.records.append(record)
+        print(json.dumps(record), flush=True)
+        return output
+
+def run_benchmark(orders: int, seed: int, db: str) -> list:
+    from src.staging.extract.extract_db import extract_database
+    from src.staging.load.load_staging import load_staging
+    from src.warehouse.extract.extract import extract_staging
+    from src.warehouse.transform.transform_dim_customers import transform_dim_customers
+    from src.warehouse.transform.transform_dim_employees import transform_dim_employees
+    from src.warehouse.transform.transform_dim_products import transform_dim_products
+    from src.warehouse.transform.transform_dim_store_branch import transform_dim_store_branch
+    from src.warehouse.transform.transform_fct_order import transform_fct_order
+    from src.warehouse.transform.transform_fct_inventory import transform_fct_inventory
+    from src.warehouse.load.load import load_warehouse
+    from src.utils.helper import flush_etl_log
+    from src.utils.process_pool import run_transform
+
+    recorder = StageRecorder(db, orders, seed)
+    recorder.run('seed_source', 'all', _seed_source, orders, seed, db)
+
+    # Staging: source tables from the database, store_branch straight from the generator (no Google Sheets)
+    for table_name in SOURCE_TABLES:
+        df = recorder.run('staging_extract', table_name, extract_database, table_name)
+        if df is not None:
+            recorder.run('staging_load', table_name, load_staging, df, 'public', table_name, TABLES[table_name])
+    df_store_branch = pd.concat(list(generate_table('store_branch', orders, seed)), ignore_index=True)
+    recorder.run('staging_load', 'store_branch', load_staging, df_store_branch, 'public', 'store_branch', 'store_id')
+
+    # Warehouse, in dependency order so fact transforms find their dimension keys
+    plan = [
+        ('store_branch', transform_dim_store_branch, 'dim_store_branch', 'nk_store_id'),
+        ('customers', transform_dim_customers, 'dim_customers', 'nk_customer_id'),
+        ('employees', transform_dim_employees, 'dim_employees', 'nk_employee_id'),
+        ('products', transform_dim_products, 'dim_products', 'nk_product_id'),
+        ('orders', transform_fct_order, 'fct_order', 'nk_order_id'),
+        ('inventory_tracking', transform_fct_inventory, 'fct_inventory', 'nk_tracking_id')
+    ]
+    for staging_table, transform, target_table, idx_name in plan:
+        df = recorder.run('warehouse_extract', staging_table, extract_staging, staging_table, 'public', target_table)
+        if df is None:
+            continue
+        df_tf = recorder.run('warehouse_transform', target_table, run_transform, df, transform, staging_table, target_table)
+        if df_tf is None:
+            continue
+        recorder.run('warehouse_load', target_table, load_warehouse, df_tf, 'public', target_table, idx_name, 'staging')
+
+    flush_etl_log()
+    return recorder.records
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Paccafe pipeline stages on synthetic data")
+    parser.add_argument('--orders', type=int, default=10_000, help="order volume; other tables scale from it (10k to 10M)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', choices=['sqlite', 'postgres'], default='sqlite',
+                        help="sqlite runs against an embedded stand-in; postgres uses the databases in .env")
+    parser.add_argument('--yes', action='store_true', help="confirm truncating the postgres pipeline tables")
+    parser.add_argument('--output', help="also append the JSON lines to this file")
+    args = parser.parse_args()
+
+    if args.db == 'postgres' and not args.yes:
+        parser.error("--db postgres truncates the configured databases; pass --yes to confirm")
+
+    workdir = tempfile.mkdtemp(prefix='paccafe_bench_')
+    # Keep the run's side files out of the working tree; must be set before src is imported
+    os.environ.setdefault('MODEL_PATH', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'models', ''))
+    os.environ['ETL_LOG_SPILL_PATH'] = os.path.join(workdir, 'etl_log_spill.jsonl')
+    os.environ['KEY_CACHE_DIR'] = os.path.join(workdir, 'key_cache')
+    os.environ['CHECKPOINT_DIR'] = os.path.join(workdir, 'checkpoints')
+
+    from src.utils.helper import register_engine
+
+    if args.db == 'sqlite':
+        for db_type in ('source', 'staging', 'warehouse', 'log'):
+            register_engine(db_type, _sqlite_engine(workdir, db_type))
+        _create_sqlite_schema(args.orders, args.seed)
+    else:
+        _truncate_postgres()
+
+    print(json.dumps({'benchmark': 'pipeline', 'table_sizes': table_sizes(args.orders), 'workdir': workdir}), file=sys.stderr)
+    records = run_benchmark(args.orders, args.seed, args.db)
+
+    if args.output:
+        with open(args.output, 'a') as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Reports how long importing the pipeline takes, per module, from `python -X importtime`.
+
+    python -m benchmark.startup_profile                         # import main_pipeline, top 25 modules
+    python -m benchmark.startup_profile --module src.staging_pipeline --top 40 --repeat 5
+
+Each run imports the module in a fresh interpreter. Wall time is reported for every run;
+the per-module table (cumulative and self time, in milliseconds) comes from the last run.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+def profile_import(module: str) -> tuple:
+    """
+    Imports module in a new interpreter and returns (wall seconds, [(module, self_us, cumulative_us, depth)]).
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return wall, modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the pipeline's import time per module")
+    parser.add_argument('--module', default='main_pipeline', help="module to import")
+    parser.add_argument('--top', type=int, default=25, help="modules to list, by cumulative time")
+    parser.add_argument('--repeat', type=int, default=3, help="fresh interpreters to time")
+    args = parser.parse_args()
+
+    walls = []
+    for _ in range(max(args.repeat, 1)):
+        wall, modules = profile_import(args.module)
+        walls.append(wall)
+
+    print(json.dumps({'module': args.module, 'wall_sec': [round(wall, 3) for wall in walls], 'best_wall_sec': round(min(walls), 3)}))
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, depth in sorted(modules, key=lambda module: module[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+
+if __name__ == '__main__':
+    main()
@@ -8,5 +8,69 @@ CREATE TABLE public.etl_log (
 	table_name varchar NULL,
 	etl_date timestamp NOT NULL,
 	error_msg varchar NULL,
+	duration_sec numeric NULL,
+	rows_in int8 NULL,
+	rows_out int8 NULL,
+	bytes_read int8 NULL,
+	rows_rejected int8 NULL,
+	peak_memory_mb numeric NULL,
 	CONSTRAINT etl_log_tmp_pk PRIMARY KEY (log_id)
-);
\ No newline at end of file
+);
+
+-- Speeds up MAX(etl_date) lookups on the raw log
+CREATE INDEX idx_etl_log_watermark ON public.etl_log USING btree (step, component, status, table_name, etl_date);
+
+-- Compact high-water mark per (step, component, status, table_name), maintained from etl_log
+CREATE TABLE public.etl_watermark (
+	step varchar NOT NULL,
+	component varchar NOT NULL,
+	status varchar NOT NULL,
+	table_name varchar NOT NULL,
+	etl_date timestamp NOT NULL,
+	CONSTRAINT etl_watermark_pk PRIMARY KEY (step, component, status, table_name)
+);
+
+CREATE OR REPLACE FUNCTION public.update_etl_watermark()
+RETURNS trigger AS $$
+BEGIN
+	IF NEW.step IS NULL OR NEW.component IS NULL OR NEW.status IS NULL OR NEW.table_name IS NULL THEN
+		RETURN NEW;
+	END IF;
+
+	INSERT INTO public.etl_watermark (step, component, status, table_name, etl_date)
+	VALUES (NEW.step, NEW.component, NEW.status, lower(NEW.table_name), NEW.etl_date)
+	ON CONFLICT (step, component, status, table_name)
+	DO UPDATE SET etl_date = GREATEST(public.etl_watermark.etl_date, EXCLUDED.etl_date);
+	RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER etl_log_watermark
+AFTER INSERT ON public.etl_log
+FOR EACH ROW EXECUTE FUNCTION public.update_etl_watermark();
+
+-- Backfill for an existing etl_log (no-op on a fresh database)
+INSERT INTO public.etl_watermark (step, component, status, table_name, etl_date)
+SELECT step, component, status, lower(table_name), MAX(etl_date)
+FROM public.etl_log
+WHERE step IS NOT NULL AND component IS NOT NULL AND status IS NOT NULL AND table_name IS NOT NULL
+GROUP BY step, component, status, lower(table_name)
+ON CONFLICT (step, component, status, table_name)
+DO UPDATE SET etl_date = GREATEST(public.etl_watermark.etl_date, EXCLUDED.etl_date);
+
+-- Fingerprint of every loaded row, so unchanged rows are skipped on the next load
+CREATE TABLE public.etl_row_hash (
+	step varchar NOT NULL,
+	table_name varchar NOT NULL,
+	row_key varchar NOT NULL,
+	row_hash int8 NOT NULL,
+	CONSTRAINT etl_row_hash_pk PRIMARY KEY (step, table_name, row_key)
+);
+
+-- Last cdc_changes.change_id loaded into staging per source table (EXTRACT_MODE=cdc)
+CREATE TABLE public.etl_cdc_cursor (
+	table_name varchar NOT NULL,
+	change_id int8 NOT NULL,
+	updated_at timestamp DEFAULT CURRENT_TIMESTAMP NOT NULL,
+	CONSTRAINT etl_cdc_cursor_pk PRIMARY KEY (table_name)
+);
@@ -1,6 +1,196 @@
-from src.staging_pipeline import staging_pipeline
-from src.warehouse_pipeline import warehouse_pipeline
+import argparse
+import os
+import signal
+import threading
+import time
+from src.staging_pipeline import staging_pipeline, SOURCE_TABLES
+from src.warehouse_pipeline import warehouse_pipeline, WAREHOUSE_TABLES
+from src.staging.extract.extract_db import has_new_rows as source_has_new_rows
+from src.warehouse.extract.extract import has_new_rows as staging_has_new_rows
+from src.utils.helper import get_pool_stats, dispose_engines, flush_etl_log
+from src.utils.metrics import run_metrics
+from src.utils.run_state import start_run, finish_run, failed_units
+from src.utils.watermark import refresh_watermarks
+
+# Seconds between cycle starts in --daemon mode
+DAEMON_INTERVAL = float(os.getenv('DAEMON_INTERVAL', '10'))
+
+# Longest wait between cycles while cycles keep overrunning the interval
+DAEMON_MAX_INTERVAL = float(os.getenv('DAEMON_MAX_INTERVAL', '300'))
+
+# Seconds between polls of the store_branch sheet in --daemon mode (each poll is a Google API call)
+DAEMON_SHEET_INTERVAL = float(os.getenv('DAEMON_SHEET_INTERVAL', '300'))
+
+def run_pipeline(staging_tables: list = None, warehouse_tables=None, resume: bool = True) -> str:
+    """
+    Runs staging then warehouse as one run (see src.utils.run_state) and returns its status.
+    warehouse_tables may be a callable, evaluated once staging has been loaded.
+    resume=False starts a new run even if the last one failed.
+    """
+    # Resume the last run if it failed: completed tables and tasks are skipped
+    start_run(resume)
+    completed = False
+    try:
+        staging_pipeline(staging_tables)
+        if callable(warehouse_tables):
+            warehouse_tables = warehouse_tables()
+        if warehouse_tables is None or warehouse_tables:
+            warehouse_pipeline(warehouse_tables)
+        completed = True
+    finally:
+        status = finish_run(completed)
+
+        # Write any buffered log records before the pools are closed
+        flush_etl_log()
+
+        # Per-stage duration, row counts and memory for this run, slowest first
+        print(run_metrics.summary())
+    return status
+
+def _failed_tables() -> set:
+    """
+    The (stage, staging table) pairs whose units failed in the run that just finished.
+    """
+    staging_of = {target_table: staging_table for staging_table, _, target_table, _, _ in WAREHOUSE_TABLES}
+    failed = set()
+    for unit in failed_units():
+        stage, name = unit.split('.', 1)
+        if stage == 'staging':
+            failed.add(('staging', name))
+        else:
+            # Warehouse units are DAG tasks: extract_<staging table>, transform_<target> or load_<target>
+            step, table_name = name.split('_', 1)
+            failed.add(('warehouse', table_name if step == 'extract' else staging_of.get(table_name, table_name)))
+    return failed
+
+def _run_batch(staging_tables: list, warehouse_tables, retries: dict, interval: float) -> str:
+    """
+    Runs the tables as a new run (never resuming an earlier cycle's run) and updates the retry schedule:
+    tables that failed wait interval, doubling per failure up to DAEMON_MAX_INTERVAL, before their next retry.
+    """
+    attempted = {('staging', table_name) for table_name in staging_tables}
+    chosen = []
+
+    def tables_after_staging() -> list:
+        chosen.extend(warehouse_tables() if callable(warehouse_tables) else warehouse_tables)
+        return chosen
+
+    status = run_pipeline(staging_tables, tables_after_staging, resume=False)
+    failed = _failed_tables()
+    attempted |= {('warehouse', table_name) for table_name in chosen}
+
+    now = time.monotonic()
+    for key in attempted:
+        if key in failed:
+            failures = retries[key][0] + 1 if key in retries else 1
+            retries[key] = (failures, now + min(interval * 2 ** (failures - 1), DAEMON_MAX_INTERVAL))
+            print(f"[daemon] {key[0]}.{key[1]} failed {failures} time(s) in a row, retrying separately")
+        else:
+            retries.pop(key, None)
+    return status
+
+def run_cycle(poll_sheet: bool, retries: dict = None, interval: float = DAEMON_INTERVAL) -> str:
+    """
+    One micro-batch: runs only the tables with rows newer than their watermarks.
+    Tables that failed in an earlier cycle (retries) are left out and retried in a run of their own
+    once their backoff has passed, so one failing table doesn't fail or slow every cycle.
+    Returns the status of the cycle's runs, or None when there was nothing to do.
+    """
+    retries = {} if retries is None else retries
+
+    # The previous cycle's log records feed the watermarks this cycle compares against
+    flush_etl_log()
+    refresh_watermarks()
+    run_metrics.reset()
+
+    staging_tables = [
+        table_name for table_name in SOURCE_TABLES
+        if ('staging', table_name) not in retries and source_has_new_rows(table_name)
+    ]
+    if poll_sheet and ('staging', 'store_branch') not in retries:
+        # An unchanged sheet is skipped by extract_sheet's revision check
+        staging_tables.append('store_branch')
+
+    def fresh_warehouse_tables() -> list:
+        return [
+            staging_table for staging_table, _, target_table, _, _ in WAREHOUSE_TABLES
+            if ('warehouse', staging_table) not in retries and staging_has_new_rows(staging_table, 'public', target_table)
+        ]
+
+    statuses = []
+    if staging_tables or fresh_warehouse_tables():
+        print(f"[daemon] new rows in source: {staging_tables or 'none'}")
+        statuses.append(_run_batch(staging_tables, fresh_warehouse_tables, retries, interval))
+
+    now = time.monotonic()
+    due = [key for key, (_, next_attempt) in retries.items() if next_attempt <= now]
+    if due:
+        print(f"[daemon] retrying failed tables: {[f'{stage}.{table_name}' for stage, table_name in due]}")
+        statuses.append(_run_batch(
+            [table_name for stage, table_name in due if stage == 'staging'],
+            [table_name for stage, table_name in due if stage == 'warehouse'],
+            retries, interval
+        ))
+
+    if not statuses:
+        return None
+    return "success" if all(status == "success" for status in statuses) else "failed"
+
+def run_daemon(interval: float):
+    """
+    Runs micro-batch cycles until SIGTERM or SIGINT, which stop the loop after the current cycle.
+    Engines, the Google Sheets client and the key and watermark caches stay warm between cycles.
+    When a cycle overruns the interval, the wait before the next one doubles (up to DAEMON_MAX_INTERVAL),
+    so a slow target gets fewer, bigger batches instead of back-to-back cycles.
+    """
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda signum, frame: stop.set())
+
+    backoff = 0.0
+    last_sheet_poll = None
+    # (stage, table) -> (consecutive failures, monotonic time of the next retry)
+    retries = {}
+    print(f"[daemon] polling every {interval:.1f}s")
+    while not stop.is_set():
+        cycle_start = time.monotonic()
+        poll_sheet = last_sheet_poll is None or cycle_start - last_sheet_poll >= DAEMON_SHEET_INTERVAL
+        if poll_sheet:
+            last_sheet_poll = cycle_start
+
+        try:
+            status = run_cycle(poll_sheet, retries, interval)
+        except Exception as e:
+            # A source that can't be reached fails this cycle only
+            status = "failed"
+            print(f"[daemon] cycle failed. Cause: {str(e)}")
+
+        elapsed = time.monotonic() - cycle_start
+        if elapsed > interval:
+            backoff = min(backoff * 2 if backoff else interval, DAEMON_MAX_INTERVAL)
+            delay = backoff
+            print(f"[daemon] cycle took {elapsed:.1f}s, over the {interval:.1f}s interval; next cycle in {delay:.1f}s")
+        else:
+            backoff = 0.0
+            delay = interval - elapsed
+            if status is not None:
+                print(f"[daemon] cycle {status} in {elapsed:.1f}s")
+        stop.wait(delay)
+    print("[daemon] stopped")
 
 if __name__ == "__main__":
-    staging_pipeline()
-    warehouse_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the Paccafe ETL pipeline")
+    parser.add_argument('--daemon', action='store_true', help="keep running micro-batch cycles instead of one full run")
+    parser.add_argument('--interval', type=float, default=DAEMON_INTERVAL, help="seconds between cycles in --daemon mode")
+    args = parser.parse_args()
+
+    try:
+        if args.daemon:
+            run_daemon(args.interval)
+        else:
+            run_pipeline()
+    finally:
+        # Report connection pressure for this run, then close pooled connections
+        for db_type, stats in get_pool_stats().items():
+            print(f"[pool] {db_type}: {stats}")
+        dispose_engines()
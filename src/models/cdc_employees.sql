@@ -0,0 +1,14 @@
+SELECT * 
+FROM employees 
+WHERE created_at > :etl_date
+UNION
+SELECT t.* 
+FROM employees t
+JOIN (
+    SELECT DISTINCT row_pk 
+    FROM cdc_changes 
+    WHERE table_name = 'employees' 
+    AND operation <> 'D' 
+    AND change_id > :last_change_id
+    AND change_id <= :high_change_id
+) c ON t.employee_id = c.row_pk
\ No newline at end of file
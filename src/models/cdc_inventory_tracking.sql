@@ -0,0 +1,14 @@
+SELECT * 
+FROM inventory_tracking 
+WHERE created_at > :etl_date
+UNION
+SELECT t.* 
+FROM inventory_tracking t
+JOIN (
+    SELECT DISTINCT row_pk 
+    FROM cdc_changes 
+    WHERE table_name = 'inventory_tracking' 
+    AND operation <> 'D' 
+    AND change_id > :last_change_id
+    AND change_id <= :high_change_id
+) c ON t.tracking_id = c.row_pk
\ No newline at end of file
@@ -0,0 +1,10 @@
+SELECT 
+    customer_id AS nk_customer_id,
+    first_name,
+    last_name,
+    email,
+    phone,
+    loyalty_points,
+    created_at
+FROM {staging_schema}.customers
+WHERE created_at > :etl_date
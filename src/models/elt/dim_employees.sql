@@ -0,0 +1,14 @@
+-- Inconsistent roles and rows missing a role or name are filtered out
+SELECT 
+    employee_id AS nk_employee_id,
+    first_name,
+    last_name,
+    hire_date,
+    role,
+    email,
+    created_at
+FROM {staging_schema}.employees
+WHERE created_at > :etl_date
+AND role NOT IN ('today', 'third', 'me')
+AND first_name IS NOT NULL
+AND last_name IS NOT NULL
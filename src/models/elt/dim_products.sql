@@ -0,0 +1,24 @@
+-- Prices keep only digits and decimal points (absolute values); unparseable prices become NULL.
+-- The store key is the newest dim_store_branch member (highest key) with the product's store name, as in the key cache.
+SELECT 
+    p.product_id AS nk_product_id,
+    p.product_name,
+    p.category,
+    CASE WHEN price.unit_price ~ '^([0-9]+\.?[0-9]*|\.[0-9]+)$' THEN price.unit_price::numeric END AS unit_price,
+    CASE WHEN price.cost_price ~ '^([0-9]+\.?[0-9]*|\.[0-9]+)$' THEN price.cost_price::numeric END AS cost_price,
+    p.in_stock,
+    p.created_at,
+    (
+        SELECT s.sk_store_id 
+        FROM public.dim_store_branch s 
+        WHERE s.store_name = p.store_branch 
+        ORDER BY s.sk_store_id DESC 
+        LIMIT 1
+    ) AS sk_store_branch
+FROM {staging_schema}.products p
+CROSS JOIN LATERAL (
+    SELECT 
+        regexp_replace(p.unit_price, '[^0-9.]', '', 'g') AS unit_price,
+        regexp_replace(p.cost_price, '[^0-9.]', '', 'g') AS cost_price
+) price
+WHERE p.created_at > :etl_date
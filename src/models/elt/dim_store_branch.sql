@@ -0,0 +1,6 @@
+SELECT 
+    store_id AS nk_store_id,
+    store_name,
+    created_at
+FROM {staging_schema}.store_branch
+WHERE created_at > :etl_date
@@ -0,0 +1,13 @@
+-- nk_product_id carries the product surrogate key; rows with an unknown product are rejected, a null product stays null.
+-- change_date becomes a Unix timestamp.
+SELECT 
+    i.tracking_id AS nk_tracking_id,
+    p.sk_product_id AS nk_product_id,
+    i.quantity_change,
+    EXTRACT(EPOCH FROM i.change_date)::float8 AS change_date,
+    i.reason,
+    i.created_at
+FROM {staging_schema}.inventory_tracking i
+LEFT JOIN public.dim_products p ON p.nk_product_id = i.product_id
+WHERE i.created_at > :etl_date
+AND (i.product_id IS NULL OR p.sk_product_id IS NOT NULL)
@@ -0,0 +1,15 @@
+-- Orders with an unknown employee are rejected; a null employee or an unknown customer keeps a null key
+SELECT 
+    o.order_id AS nk_order_id,
+    to_char(o.order_date, 'YYYYMMDD')::int AS order_date,
+    o.total_amount,
+    o.payment_method,
+    o.order_status,
+    o.created_at,
+    e.sk_employee_id,
+    c.sk_customer_id
+FROM {staging_schema}.orders o
+LEFT JOIN public.dim_employees e ON e.nk_employee_id = o.employee_id
+LEFT JOIN public.dim_customers c ON c.nk_customer_id = o.customer_id
+WHERE o.created_at > :etl_date
+AND (o.employee_id IS NULL OR e.sk_employee_id IS NOT NULL)
@@ -0,0 +1,4 @@
+IMPORT FOREIGN SCHEMA public
+LIMIT TO (store_branch, customers, employees, products, orders, inventory_tracking)
+FROM SERVER staging_server
+INTO {staging_schema};
@@ -0,0 +1,11 @@
+CREATE EXTENSION IF NOT EXISTS postgres_fdw;
+
+CREATE SERVER IF NOT EXISTS staging_server
+FOREIGN DATA WRAPPER postgres_fdw
+OPTIONS (host '{host}', port '{port}', dbname '{dbname}');
+
+CREATE USER MAPPING IF NOT EXISTS FOR CURRENT_USER
+SERVER staging_server
+OPTIONS (user '{user}', password '{password}');
+
+CREATE SCHEMA IF NOT EXISTS {staging_schema};
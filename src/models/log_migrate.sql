@@ -0,0 +1,15 @@
+-- Brings a log database created before the metric columns and the CDC cursor up to date (no-op on a fresh database)
+ALTER TABLE public.etl_log
+	ADD COLUMN IF NOT EXISTS duration_sec numeric NULL,
+	ADD COLUMN IF NOT EXISTS rows_in int8 NULL,
+	ADD COLUMN IF NOT EXISTS rows_out int8 NULL,
+	ADD COLUMN IF NOT EXISTS bytes_read int8 NULL,
+	ADD COLUMN IF NOT EXISTS rows_rejected int8 NULL,
+	ADD COLUMN IF NOT EXISTS peak_memory_mb numeric NULL;
+
+CREATE TABLE IF NOT EXISTS public.etl_cdc_cursor (
+	table_name varchar NOT NULL,
+	change_id int8 NOT NULL,
+	updated_at timestamp DEFAULT CURRENT_TIMESTAMP NOT NULL,
+	CONSTRAINT etl_cdc_cursor_pk PRIMARY KEY (table_name)
+);
@@ -0,0 +1,38 @@
+-- Converts public.{table} into a table range-partitioned by {column}, one partition per day,
+-- so it can be loaded with LOAD_MODE_{table_upper}=swap. Run once through src.utils.loader.partition_fact_table.
+-- The old table is kept as {table}_unpartitioned; drop it once the new table is checked.
+-- The unique key is ({key}, {column}); the swap load keeps {key} unique across days by moving a row out of its old day.
+-- The upsert and copy modes and the sql transform engine conflict on {key} alone, so they refuse the table once it is migrated.
+DO $$
+DECLARE
+    day record;
+    serial record;
+BEGIN
+    ALTER TABLE public.{table} RENAME TO {table}_unpartitioned;
+
+    CREATE TABLE public.{table} (LIKE public.{table}_unpartitioned INCLUDING DEFAULTS)
+    PARTITION BY RANGE ({column});
+
+    -- Serial columns' sequences move to the new table, so dropping the old one doesn't drop them
+    FOR serial IN
+        SELECT column_name, pg_get_serial_sequence('public.{table}_unpartitioned', column_name) AS seq
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = '{table}_unpartitioned'
+    LOOP
+        IF serial.seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY public.{table}.%I', serial.seq, serial.column_name);
+        END IF;
+    END LOOP;
+
+    -- A unique key on a partitioned table must include the partition column
+    ALTER TABLE public.{table} ADD CONSTRAINT {table}_{key}_{column}_key UNIQUE ({key}, {column});
+
+    FOR day IN SELECT DISTINCT {day_start} AS low FROM public.{table}_unpartitioned WHERE {column} IS NOT NULL LOOP
+        EXECUTE format(
+            'CREATE TABLE public.%I PARTITION OF public.{table} FOR VALUES FROM (%s) TO (%s)',
+            '{table}_p' || {day_suffix}, day.low, day.low + {day_width}
+        );
+    END LOOP;
+
+    INSERT INTO public.{table} SELECT * FROM public.{table}_unpartitioned WHERE {column} IS NOT NULL;
+END $$;
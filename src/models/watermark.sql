@@ -0,0 +1,3 @@
+SELECT step, component, status, lower(table_name) AS table_name, MAX(etl_date)
+FROM etl_watermark
+GROUP BY step, component, status, lower(table_name)
\ No newline at end of file
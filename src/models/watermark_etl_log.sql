@@ -0,0 +1,8 @@
+SELECT step, component, status, lower(table_name) AS table_name, MAX(etl_date)
+FROM etl_log
+WHERE 
+    step IS NOT NULL and
+    component IS NOT NULL and
+    status IS NOT NULL and
+    table_name IS NOT NULL
+GROUP BY step, component, status, lower(table_name)
\ No newline at end of file
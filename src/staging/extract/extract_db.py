@@ -1,32 +1,75 @@
+import os
 import pandas as pd
 from sqlalchemy import text 
 import sqlalchemy
-from src.utils.helper import get_db_connection, etl_log, read_etl_log, read_sql
+from src.utils.helper import get_db_connection, etl_log, read_sql
+from src.utils.watermark import get_watermark
+from src.utils.streaming import read_sql_chunks
+from src.utils.metrics import start_stage, finish_stage, frame_bytes
+from src.utils.schema import apply_dtypes
+from src.utils.partition import get_partitions, partition_key, read_partitioned, stream_partitioned
+from src.utils.cdc_cursor import get_cursor, snapshot_cursor
 from datetime import datetime
 
+# Default extract mode: 'incremental' reads rows created since the watermark,
+# 'cdc' also reads rows inserted or updated past the table's cdc_changes.change_id cursor (src.utils.cdc_cursor).
+# Deletes aren't propagated: a row deleted in the source stays in staging and the warehouse.
+# Override per table with EXTRACT_MODE_<TABLE_NAME>.
+EXTRACT_MODE = os.getenv('EXTRACT_MODE', 'incremental')
+
+EXTRACT_MODES = ('incremental', 'cdc')
+
+def get_extract_mode(table_name: str) -> str:
+    mode = os.getenv(f'EXTRACT_MODE_{table_name.upper()}', EXTRACT_MODE).lower()
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"Unknown extract mode for {table_name}: {mode}")
+    return mode
+
+def extract_query(table_name: str):
+    """
+    Returns the extraction query of a table for its extract mode (src/models/<table>.sql or cdc_<table>.sql).
+    """
+    if get_extract_mode(table_name) == 'cdc':
+        return sqlalchemy.text(read_sql(f"cdc_{table_name}"))
+    return sqlalchemy.text(read_sql(table_name))
+
+def extract_params(table_name: str, etl_date) -> dict:
+    """
+    Bind parameters of the table's extraction query. In cdc mode this snapshots the table's change cursor,
+    which staging_pipeline commits once the load has succeeded.
+    """
+    params = {"etl_date": etl_date}
+    if get_extract_mode(table_name) == 'cdc':
+        params["last_change_id"] = get_cursor(table_name)
+        params["high_change_id"] = snapshot_cursor(table_name)
+    return params
+
+def has_new_rows(table_name: str) -> bool:
+    """
+    Cheap freshness probe: True if the source has rows created since the staging watermark
+    (or, in cdc mode, changes past the table's change cursor).
+    """
+    etl_date = get_watermark(step="staging", table_name=table_name, component="load", status="success")
+    params = {"etl_date": etl_date, "table_name": table_name}
+    query = f"SELECT EXISTS (SELECT 1 FROM {table_name} WHERE created_at > :etl_date)"
+    if get_extract_mode(table_name) == 'cdc':
+        query += " OR EXISTS (SELECT 1 FROM cdc_changes WHERE table_name = :table_name AND operation <> 'D' AND change_id > :last_change_id)"
+        params["last_change_id"] = get_cursor(table_name)
+    with get_db_connection('source').connect() as conn:
+        return bool(conn.execute(sqlalchemy.text(query), params).scalar())
+
 def extract_database(table_name: str) -> pd.DataFrame:
     """
     Extracts data from the source database incrementally.
     """
+    stage = start_stage("staging", "extraction", table_name)
     try:
         conn = get_db_connection('source')
         
-        # Get the latest etl_date from the log table
-        filter_log = {
-            "step": "staging",
-            "table_name": table_name,
-            "status": "success",
-            "component": "load"
-        }
-        etl_date = read_etl_log(filter_log)
-
-        # If no previous extraction has been recorded (etl_date is empty), set etl_date to '1111-01-01' indicating the initial load.
-        # Otherwise, retrieve data added since the last successful extraction (etl_date).
-        # Set etl_date for incremental extraction
-        if etl_date.empty or etl_date['max'][0] is None:
-            etl_date = '1111-01-01'
-        else:
-            etl_date = etl_date['max'][0]
+        # Get the latest etl_date from the watermark cache (loaded once per run)
+        # If no previous extraction has been recorded, this is '1111-01-01' indicating the initial load.
+        # Otherwise, retrieve data added since the last successful load.
+        etl_date = get_watermark(step="staging", table_name=table_name, component="load", status="success")
 
         # Constructs a SQL query to select all columns from the specified table_name where created_at is greater than etl_date.
         """
@@ -34,8 +77,22 @@ def extract_database(table_name: str) -> pd.DataFrame:
         FROM customers 
         WHERE created_at > :etl_date
         """
-        query = sqlalchemy.text(read_sql(table_name))
-        df = pd.read_sql(sql=query, con=conn, params={"etl_date": etl_date})
+        # In cdc mode the query also returns rows changed past the change cursor
+        query = extract_query(table_name)
+        params = extract_params(table_name, etl_date)
+
+        # With EXTRACT_PARTITIONS > 1, primary-key ranges are read in parallel over several pooled connections
+        partitions = get_partitions(table_name)
+        key = partition_key('source', table_name)
+        if partitions > 1 and key is not None:
+            df = read_partitioned(conn, query, params, key, partitions)
+        else:
+            df = pd.read_sql(sql=query, con=conn, params=params)
+
+        # Compact dtypes from source_data/init.sql: categoricals, nullable int4, Arrow-backed strings
+        df = apply_dtypes(df, 'source', table_name)
+        stage["rows_out"] = len(df)
+        stage["bytes_read"] = frame_bytes(df)
 
         # Log success
         log_msg = {
@@ -60,4 +117,50 @@ def extract_database(table_name: str) -> pd.DataFrame:
         }
         print(e)
     finally:
-        etl_log(log_msg)
\ No newline at end of file
+        etl_log(finish_stage(stage, log_msg))
+
+def stream_database(table_name: str, chunksize: int):
+    """
+    Extracts data from the source database incrementally as a stream of DataFrame chunks.
+    """
+    stage = start_stage("staging", "extraction", table_name)
+    stage["rows_out"] = 0
+    stage["bytes_read"] = 0
+    try:
+        etl_date = get_watermark(step="staging", table_name=table_name, component="load", status="success")
+        query = extract_query(table_name)
+        params = extract_params(table_name, etl_date)
+
+        partitions = get_partitions(table_name)
+        key = partition_key('source', table_name)
+        if partitions > 1 and key is not None:
+            chunks = stream_partitioned(get_db_connection('source'), query, params, key, partitions, chunksize)
+        else:
+            chunks = read_sql_chunks(get_db_connection('source'), query, params, chunksize)
+
+        for chunk in chunks:
+            chunk = apply_dtypes(chunk, 'source', table_name)
+            stage["rows_out"] += len(chunk)
+            stage["bytes_read"] += frame_bytes(chunk)
+            yield chunk
+
+        # Log success once the last chunk has been read
+        etl_log(finish_stage(stage, {
+            "step": "staging",
+            "component": "extraction",
+            "status": "success",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }))
+    except Exception as e:
+        # Log failure and let the loader see the error
+        etl_log(finish_stage(stage, {
+            "step": "staging",
+            "component": "extraction",
+            "status": "failed",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "error_msg": str(e)
+        }))
+        print(e)
+        raise
@@ -1,20 +1,40 @@
 import pandas as pd
 from src.utils.helper import etl_log
+from src.utils.metrics import start_stage, finish_stage, frame_bytes
 from datetime import datetime
-import gspread
-from google.auth.transport.requests import Request
-from google.auth import load_credentials_from_file
 import os
+import threading
+
+# Directory holding the last loaded snapshot of every worksheet
+SHEET_CACHE_DIR = os.getenv('SHEET_CACHE_DIR', '.sheet_cache')
+
+_client = None
+_client_lock = threading.Lock()
+
+def set_client(client):
+    """
+    Replaces the Google Sheets client, e.g. with an offline stand-in (tests/fake_gspread.py); None re-authenticates.
+    """
+    global _client
+    with _client_lock:
+        _client = client
 
 def auth_gspread():
     """
-    Authenticates with Google Sheets API.
+    Authenticates with Google Sheets API once per process; the client refreshes its own token.
     """
-    scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-    
-    #Define your credentials
-    credentials, project = load_credentials_from_file(os.getenv('CRED_PATH'), scopes=scope)
-    return gspread.authorize(credentials)
+    global _client
+    with _client_lock:
+        if _client is None:
+            # The Google clients are imported on first use, so runs that skip the sheet don't pay for them
+            import gspread
+            from google.auth import load_credentials_from_file
+            scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+            #Define your credentials
+            credentials, project = load_credentials_from_file(os.getenv('CRED_PATH'), scopes=scope)
+            _client = gspread.authorize(credentials)
+        return _client
 
 def init_key_file(key_file:str):
     #define credentials to open the file
@@ -25,26 +45,58 @@ def init_key_file(key_file:str):
     
     return sheet_result
 
-def extract_sheet(key_file: str, worksheet_name: str) -> pd.DataFrame:
+def _snapshot_path(key_file: str, worksheet_name: str, pending: bool = False) -> str:
+    return os.path.join(SHEET_CACHE_DIR, f"{key_file}_{worksheet_name}.pkl" + (".pending" if pending else ""))
+
+def _load_snapshot(key_file: str, worksheet_name: str) -> dict:
+    path = _snapshot_path(key_file, worksheet_name)
+    return pd.read_pickle(path) if os.path.exists(path) else None
+
+def commit_sheet_snapshot(key_file: str, worksheet_name: str):
     """
-    Extracts data from a Google Sheet.
+    Marks the last extracted revision of a worksheet as loaded, so an unchanged sheet is skipped next run.
+    Call it only after the extracted data was loaded.
+    """
+    pending = _snapshot_path(key_file, worksheet_name, pending=True)
+    if os.path.exists(pending):
+        os.replace(pending, _snapshot_path(key_file, worksheet_name))
+
+def extract_sheet(key_file: str, worksheet_name: str) -> tuple:
     """
+    Extracts data from a Google Sheet. Returns (data, unchanged), or None if the extraction failed;
+    unchanged is True when the sheet wasn't downloaded because it hasn't changed since its last load.
+    """
+    stage = start_stage("staging", "extraction", worksheet_name)
     try:
         # init sheet
         sheet_result = init_key_file(key_file)
-        
-        worksheet_result = sheet_result.worksheet(worksheet_name)
-        
-        df_result = pd.DataFrame(worksheet_result.get_all_values())
-        
-        # set first rows as columns
-        df_result.columns = df_result.iloc[0]
-        
-        # get all the rest of the values
-        df_result = df_result[1:].copy()
+
+        # Skip the download when the spreadsheet hasn't changed since its last load
+        revision = sheet_result.get_lastUpdateTime()
+        snapshot = _load_snapshot(key_file, worksheet_name)
+        unchanged = snapshot is not None and snapshot["revision"] == revision
+        if unchanged:
+            print(f"[sheet] {worksheet_name} unchanged since {revision}, skipping download")
+            df_result = snapshot["data"].iloc[0:0].copy()
+        else:
+            worksheet_result = sheet_result.worksheet(worksheet_name)
+            
+            df_result = pd.DataFrame(worksheet_result.get_all_values())
+            
+            # set first rows as columns
+            df_result.columns = df_result.iloc[0]
+            
+            # get all the rest of the values
+            df_result = df_result[1:].copy()
+
+            # Keep the snapshot aside until the load succeeds (commit_sheet_snapshot)
+            os.makedirs(SHEET_CACHE_DIR, exist_ok=True)
+            pd.to_pickle({"revision": revision, "data": df_result}, _snapshot_path(key_file, worksheet_name, pending=True))
 
         # Add the 'created_at' column with the current datetime
         df_result['created_at'] = datetime.now()
+        stage["rows_out"] = len(df_result)
+        stage["bytes_read"] = frame_bytes(df_result)
 
         # Log success
         log_msg = {
@@ -55,7 +107,7 @@ def extract_sheet(key_file: str, worksheet_name: str) -> pd.DataFrame:
             "table_name": worksheet_name,
             "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-        return df_result
+        return df_result, unchanged
     
     except Exception as e:
         # Log failure
@@ -70,4 +122,4 @@ def extract_sheet(key_file: str, worksheet_name: str) -> pd.DataFrame:
         }
         print(e)
     finally:
-        etl_log(log_msg)
\ No newline at end of file
+        etl_log(finish_stage(stage, log_msg))
\ No newline at end of file
@@ -1,20 +1,34 @@
 import pandas as pd
 from src.utils.helper import get_db_connection, etl_log, handle_error
 from datetime import datetime
-from pangres import upsert
+from src.utils.row_hash import write_changed_rows
+from src.utils.metrics import start_stage, finish_stage
+from src.utils.checkpoint import save_checkpoint, remove_checkpoint
+from src.utils.watermark import get_watermark
 
-def load_staging(data, schema: str, table_name: str, idx_name: str):
+def load_staging(data, schema: str, table_name: str, idx_name: str, mode: str = None):
+    stage = start_stage("staging", "load", table_name, rows_in=len(data) if data is not None else None)
     try:
         conn = get_db_connection('staging')
         data = data.iloc[:, :-1] #Remove crated_at in the last column        
         data = data.set_index(idx_name)
 
-        # Do upsert (Update for existing data and Insert for new data)
-        upsert(con=conn, 
-               df=data, 
-               table_name=table_name, 
-               schema=schema, 
-               if_row_exists="update")
+        # A checkpoint is only valid for the load that wrote it
+        remove_checkpoint("staging", table_name)
+
+        # Write the new or changed rows with the table's load mode: pangres upsert, or COPY into a temp table and merge
+        data = write_changed_rows(conn, data, schema, table_name, "staging", mode)
+        stage["rows_out"] = len(data)
+
+        # Hand the written rows to the warehouse step, which reads them instead of querying staging again
+        try:
+            loaded_at = datetime.now()
+            save_checkpoint("staging", table_name, data.reset_index().assign(created_at=loaded_at), {
+                "previous_watermark": get_watermark(step="staging", table_name=table_name, component="load", status="success"),
+                "loaded_at": loaded_at
+            })
+        except Exception as e:
+            print(f"Can't save checkpoint for {table_name}. Cause: {str(e)}")
         
         #create success log message
         log_msg = {
@@ -25,6 +39,7 @@ def load_staging(data, schema: str, table_name: str, idx_name: str):
             "table_name": table_name,
             "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
+        return True
     except Exception as e:
         log_msg = {
             "step": "staging",
@@ -43,4 +58,52 @@ def load_staging(data, schema: str, table_name: str, idx_name: str):
             print(e)
 
     finally:
-        etl_log(log_msg)
\ No newline at end of file
+        etl_log(finish_stage(stage, log_msg))
+
+def load_staging_stream(chunks, schema: str, table_name: str, idx_name: str, mode: str = None):
+    """
+    Loads a stream of extracted chunks into staging.
+    Success is logged (advancing the watermark) only after the last chunk has been written.
+    """
+    stage = start_stage("staging", "load", table_name, rows_in=0)
+    stage["rows_out"] = 0
+    data = None
+    try:
+        conn = get_db_connection('staging')
+
+        # Streamed loads aren't checkpointed, so the warehouse step reads this table from staging
+        remove_checkpoint("staging", table_name)
+        for chunk in chunks:
+            stage["rows_in"] += len(chunk)
+            data = chunk.iloc[:, :-1] #Remove crated_at in the last column
+            data = data.set_index(idx_name)
+            data = write_changed_rows(conn, data, schema, table_name, "staging", mode)
+            stage["rows_out"] += len(data)
+
+        log_msg = {
+            "step": "staging",
+            "component": "load",
+            "status": "success",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        return True
+    except Exception as e:
+        log_msg = {
+            "step": "staging",
+            "component": "load",
+            "status": "failed",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "error_msg": str(e)
+        }
+
+        # Handling error: save the failing chunk to Object Storage
+        if data is not None:
+            try:
+                handle_error(data = data, bucket_name='error-paccafe', table_name= table_name, step='staging', component='load')
+            except Exception as e:
+                print(e)
+
+    finally:
+        etl_log(finish_stage(stage, log_msg))
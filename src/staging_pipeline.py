@@ -1,27 +1,85 @@
-from src.staging.extract.extract_db import extract_database
-from src.staging.extract.extract_spreadsheet import extract_sheet
-from src.staging.load.load_staging import load_staging
+from src.staging.extract.extract_db import extract_database, stream_database, has_new_rows
+from src.staging.extract.extract_spreadsheet import extract_sheet, commit_sheet_snapshot
+from src.staging.load.load_staging import load_staging, load_staging_stream
+from src.utils.parallel import run_parallel
+from src.utils.streaming import get_chunksize
+from src.utils.run_state import is_done, mark_unit
+from src.utils.cdc_cursor import commit_cursor
 # from src.staging.load.load_minio import handle_error
 from datetime import datetime
 import os
 
-def staging_pipeline():
-    # Extract data from database
-    df_customers = extract_database('customers')
-    df_employees = extract_database('employees')
-    df_products = extract_database('products')
-    df_orders = extract_database('orders')
-    df_order_details = extract_database('order_details')
-    df_inventory = extract_database('inventory_tracking')
-    
-    # Extract data from spreadsheet
-    df_store_branch = extract_sheet(os.getenv('KEY_SPREADSHEET'), 'store_branch')
+# Source tables and their primary keys, in load order
+SOURCE_TABLES = {
+    'customers': 'customer_id',
+    'employees': 'employee_id',
+    'products': 'product_id',
+    'orders': 'order_id',
+    'order_details': 'order_detail_id',
+    'inventory_tracking': 'tracking_id'
+}
+
+def _skip_done(table_name: str) -> bool:
+    """
+    True if an earlier attempt of this run loaded the table and the source has nothing newer since.
+    """
+    if not is_done(f"staging.{table_name}"):
+        return False
+    try:
+        return not has_new_rows(table_name)
+    except Exception as e:
+        print(f"Can't probe {table_name} for new rows, loading it again. Cause: {str(e)}")
+        return False
+
+def staging_pipeline(tables: list = None):
+    """
+    Extracts and loads the source tables and the store_branch sheet into staging.
+    `tables` limits the run to some of them (table names, 'store_branch' for the sheet).
+    """
+    selected = set(SOURCE_TABLES) | {'store_branch'} if tables is None else set(tables)
+
+    # Tables already loaded by an earlier attempt of this run are skipped, unless new rows arrived since
+    tables = {
+        table_name: idx_name for table_name, idx_name in SOURCE_TABLES.items()
+        if table_name in selected and not _skip_done(table_name)
+    }
+    key_spreadsheet = os.getenv('KEY_SPREADSHEET')
+
+    # Extract data from database and spreadsheet concurrently.
+    # Tables with a chunk size are streamed straight into staging inside their task.
+    tasks = {}
+    for table_name, idx_name in tables.items():
+        chunksize = get_chunksize(table_name)
+        if chunksize:
+            tasks[table_name] = ('source', load_staging_stream, (stream_database(table_name, chunksize), 'public', table_name, idx_name))
+        else:
+            tasks[table_name] = ('source', extract_database, (table_name,))
+    # The sheet is extracted even when done: extract_sheet's revision check is its new-rows probe
+    if 'store_branch' in selected:
+        tasks['store_branch'] = ('spreadsheet', extract_sheet, (key_spreadsheet, 'store_branch'))
+    extracted = run_parallel(tasks)
     
     # Load data into staging (except last column, created_at)
-    load_staging(data=df_customers, schema='public', table_name='customers', idx_name='customer_id')
-    load_staging(data=df_employees, schema='public', table_name='employees', idx_name='employee_id')
-    load_staging(data=df_products, schema='public', table_name='products', idx_name='product_id')
-    load_staging(data=df_orders, schema='public', table_name='orders', idx_name='order_id')
-    load_staging(data=df_order_details, schema='public', table_name='order_details', idx_name='order_detail_id')
-    load_staging(data=df_inventory, schema='public', table_name='inventory_tracking', idx_name='tracking_id')
-    load_staging(data=df_store_branch, schema='public', table_name='store_branch', idx_name='store_id')
\ No newline at end of file
+    for table_name, idx_name in tables.items():
+        if get_chunksize(table_name):
+            # Streamed tables were loaded inside their task
+            loaded = extracted[table_name]
+        else:
+            loaded = load_staging(data=extracted[table_name], schema='public', table_name=table_name, idx_name=idx_name)
+        if loaded:
+            # cdc mode: the changes just loaded aren't read again
+            try:
+                commit_cursor(table_name)
+            except Exception as e:
+                print(f"Can't save the change cursor of {table_name}, its changes are read again next run. Cause: {str(e)}")
+        mark_unit(f"staging.{table_name}", "success" if loaded else "failed")
+
+    # A sheet unchanged since its last load has nothing to load
+    if 'store_branch' in tasks:
+        df_store_branch, unchanged = extracted['store_branch'] or (None, False)
+        loaded = unchanged
+        if not unchanged:
+            loaded = load_staging(data=df_store_branch, schema='public', table_name='store_branch', idx_name='store_id')
+            if loaded:
+                commit_sheet_snapshot(key_spreadsheet, 'store_branch')
+        mark_unit("staging.store_branch", "success" if loaded else "failed")
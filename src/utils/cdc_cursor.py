@@ -0,0 +1,46 @@
+import threading
+import sqlalchemy
+from src.utils.helper import get_db_connection, migrate_log_db
+
+# Highest cdc_changes.change_id each extraction read up to, waiting for its staging load to succeed
+_pending = {}
+_pending_lock = threading.Lock()
+
+def get_cursor(table_name: str) -> int:
+    """
+    Returns the last cdc_changes.change_id loaded into staging for a table, or 0 if none was.
+    """
+    migrate_log_db()
+    query = sqlalchemy.text("SELECT change_id FROM public.etl_cdc_cursor WHERE table_name = :table_name")
+    with get_db_connection('log').connect() as conn:
+        change_id = conn.execute(query, {"table_name": table_name}).scalar()
+    return int(change_id) if change_id is not None else 0
+
+def snapshot_cursor(table_name: str) -> int:
+    """
+    Reads the source's highest change_id for a table before it is extracted. The extraction reads changes
+    up to it, and commit_cursor records it once the load has succeeded.
+    change_id comes from the source's own sequence, so unlike timestamps it doesn't depend on
+    when the ETL host finished loading or on the clocks of either host.
+    """
+    query = sqlalchemy.text("SELECT coalesce(max(change_id), 0) FROM cdc_changes WHERE table_name = :table_name")
+    with get_db_connection('source').connect() as conn:
+        change_id = int(conn.execute(query, {"table_name": table_name}).scalar())
+    with _pending_lock:
+        _pending[table_name] = change_id
+    return change_id
+
+def commit_cursor(table_name: str):
+    """
+    Records the change_id the last extraction of a table read up to. Call it only after the extracted rows were loaded.
+    """
+    with _pending_lock:
+        change_id = _pending.pop(table_name, None)
+    if change_id is None:
+        return
+    query = sqlalchemy.text(
+        "INSERT INTO public.etl_cdc_cursor (table_name, change_id) VALUES (:table_name, :change_id) "
+        "ON CONFLICT (table_name) DO UPDATE SET change_id = EXCLUDED.change_id, updated_at = CURRENT_TIMESTAMP"
+    )
+    with get_db_connection('log').begin() as conn:
+        conn.execute(query, {"table_name": table_name, "change_id": change_id})
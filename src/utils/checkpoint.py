@@ -0,0 +1,71 @@
+import json
+import os
+import pandas as pd
+
+# Set CHECKPOINTS=1 to keep each stage's output as an Arrow IPC file under CHECKPOINT_DIR
+CHECKPOINTS = os.getenv('CHECKPOINTS', '0') == '1'
+CHECKPOINT_DIR = os.getenv('CHECKPOINT_DIR', '.checkpoints')
+
+def _checkpoint_path(stage: str, table_name: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, stage, f"{table_name}.arrow")
+
+def write_ipc(path: str, data: pd.DataFrame, metadata: dict = None):
+    """
+    Writes data as an uncompressed Arrow IPC file, atomically; metadata goes into the schema metadata.
+    """
+    # pyarrow is imported on first use: most runs write no checkpoint
+    import pyarrow as pa
+    table = pa.Table.from_pandas(data)
+    if metadata:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def read_ipc(path: str) -> pd.DataFrame:
+    """
+    Reads an Arrow IPC file through a memory map.
+    """
+    import pyarrow as pa
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+def save_checkpoint(stage: str, table_name: str, data: pd.DataFrame, meta: dict = None):
+    """
+    Writes data (with meta in the file's schema metadata) as an uncompressed Arrow IPC file, atomically.
+    """
+    if not CHECKPOINTS:
+        return
+    path = _checkpoint_path(stage, table_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_ipc(path, data, {b'checkpoint': json.dumps(meta or {}, default=str).encode('utf-8')})
+
+def read_checkpoint_meta(stage: str, table_name: str) -> dict:
+    """
+    Returns the meta saved with a checkpoint without reading its data, or None if there is none.
+    """
+    path = _checkpoint_path(stage, table_name)
+    if not CHECKPOINTS or not os.path.exists(path):
+        return None
+    import pyarrow as pa
+    with pa.memory_map(path) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return json.loads(metadata.get(b'checkpoint', b'{}'))
+
+def load_checkpoint(stage: str, table_name: str) -> pd.DataFrame:
+    """
+    Reads a checkpoint through a memory map, or returns None if there is none.
+    """
+    path = _checkpoint_path(stage, table_name)
+    if not CHECKPOINTS or not os.path.exists(path):
+        return None
+    return read_ipc(path)
+
+def remove_checkpoint(stage: str, table_name: str):
+    path = _checkpoint_path(stage, table_name)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,171 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.utils.parallel import get_source_limit
+
+# Upper bound on tasks running at the same time inside one DAG run
+DAG_MAX_WORKERS = int(os.getenv('DAG_MAX_WORKERS', '8'))
+
+def task(name: str, func, inputs: tuple = (), args: tuple = (), after: tuple = (), source: str = None) -> dict:
+    """
+    Declares one DAG node.
+    The results of `inputs` are passed to func positionally, followed by `args`.
+    `after` lists nodes that must succeed first without passing their result along.
+    `source` applies the per-source concurrency limit from src.utils.parallel.
+    """
+    return {
+        "name": name,
+        "func": func,
+        "inputs": tuple(inputs),
+        "args": tuple(args),
+        "after": tuple(after),
+        "source": source
+    }
+
+def _run_task(node: dict, values: list):
+    start = time.perf_counter()
+    try:
+        if node["source"]:
+            with get_source_limit(node["source"]):
+                result = node["func"](*values, *node["args"])
+        else:
+            result = node["func"](*values, *node["args"])
+        error = None
+    except Exception as e:
+        result = None
+        error = str(e)
+    return result, error, start, time.perf_counter()
+
+def _critical_path(nodes: dict, timings: dict) -> list:
+    """
+    Walks back from the last node to finish, following the upstream node that finished last.
+    """
+    if not timings:
+        return []
+    current = max(timings, key=lambda name: timings[name][1])
+    path = [current]
+    while True:
+        upstream = [dep for dep in nodes[current]["inputs"] + nodes[current]["after"] if dep in timings]
+        if not upstream:
+            break
+        current = max(upstream, key=lambda name: timings[name][1])
+        path.append(current)
+    return path[::-1]
+
+def _resume_plan(nodes: dict, completed: set, restore) -> dict:
+    """
+    Returns the results of completed tasks that don't need to run again.
+    A completed task still runs when a task that must run needs its result and restore can't provide it.
+    """
+    must_run = {name for name in nodes if name not in completed}
+    restored = {}
+    changed = True
+    while changed:
+        changed = False
+        for name in nodes:
+            if name in must_run or name in restored:
+                continue
+            if any(name in nodes[consumer]["inputs"] for consumer in must_run):
+                value = restore(name) if restore else None
+                if value is None:
+                    must_run.add(name)
+                    changed = True
+                else:
+                    restored[name] = value
+    return {name: restored.get(name, True) for name in nodes if name not in must_run}
+
+def run_dag(tasks: list, max_workers: int = None, completed: set = None, restore=None, on_finish=None) -> dict:
+    """
+    Runs tasks as soon as their upstream nodes succeed.
+    A task fails when it raises or returns None (the pipeline's convention for a failed step),
+    and every task downstream of a failure is skipped.
+    Tasks in `completed` (done by an earlier attempt) are not run again; when a task that does run
+    needs one of their results, restore(name) provides it or the completed task runs again too.
+    on_finish(name, status) is called as each task succeeds, fails or is skipped.
+    Returns the results, status, timings and critical path of the run.
+    """
+    nodes = {node["name"]: node for node in tasks}
+    for node in tasks:
+        for dep in node["inputs"] + node["after"]:
+            if dep not in nodes:
+                raise ValueError(f"Task {node['name']} depends on unknown task {dep}")
+
+    results = {}
+    status = {}
+    timings = {}
+    run_start = time.perf_counter()
+
+    def finish(name: str, task_status: str):
+        status[name] = task_status
+        if on_finish is not None:
+            on_finish(name, task_status)
+
+    # Tasks finished by an earlier attempt count as succeeded
+    for name, result in _resume_plan(nodes, set(completed or ()), restore).items():
+        results[name] = result
+        status[name] = "success"
+        print(f"[dag] {name} resumed: done in an earlier attempt")
+
+    def ready(name: str) -> bool:
+        deps = nodes[name]["inputs"] + nodes[name]["after"]
+        return all(status.get(dep) == "success" for dep in deps)
+
+    def blocked(name: str) -> bool:
+        deps = nodes[name]["inputs"] + nodes[name]["after"]
+        return any(status.get(dep) in ("failed", "skipped") for dep in deps)
+
+    pending = [name for name in nodes if name not in status]
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers or DAG_MAX_WORKERS, thread_name_prefix="dag") as executor:
+        while pending or running:
+            # Skip everything downstream of a failure, then start whatever is ready
+            progressed = True
+            while progressed:
+                progressed = False
+                for name in list(pending):
+                    if blocked(name):
+                        finish(name, "skipped")
+                        pending.remove(name)
+                        progressed = True
+                        print(f"[dag] {name} skipped: upstream task failed")
+            for name in list(pending):
+                if ready(name):
+                    values = [results[dep] for dep in nodes[name]["inputs"]]
+                    running[executor.submit(_run_task, nodes[name], values)] = name
+                    pending.remove(name)
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Tasks can't be scheduled (cycle?): {pending}")
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                result, error, start, end = future.result()
+                timings[name] = (start - run_start, end - run_start)
+                if error is None and result is not None and result is not False:
+                    results[name] = result
+                    finish(name, "success")
+                else:
+                    finish(name, "failed")
+                    print(f"[dag] {name} failed" + (f": {error}" if error else ""))
+
+    critical_path = _critical_path(nodes, timings)
+    report = {
+        "results": results,
+        "status": status,
+        "timings": timings,
+        "critical_path": critical_path,
+        "wall_time": time.perf_counter() - run_start
+    }
+    print_dag_report(report)
+    return report
+
+def print_dag_report(report: dict):
+    path = report["critical_path"]
+    timings = report["timings"]
+    if path:
+        steps = " -> ".join(f"{name} ({timings[name][1] - timings[name][0]:.2f}s)" for name in path)
+        print(f"[dag] critical path: {steps}")
+    print(f"[dag] wall time: {report['wall_time']:.2f}s")
@@ -1,63 +1,380 @@
 import os
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-import sqlalchemy
-from minio import Minio
-from io import BytesIO
+import atexit
+import glob
+import gzip
+import io
+import json
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.pool import QueuePool
 import pandas as pd
 from datetime import datetime
 
+_env_loaded = False
+
+def load_env():
+    """
+    Loads .env into the environment once per process. Module settings read the environment
+    when they are imported, so this runs when helper is imported, before any other src module.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
 # Load environment variables
-load_dotenv()
+load_env()
+
+# Environment variable prefix for each database
+DB_ENV_PREFIX = {
+    'source': 'SRC',
+    'staging': 'STG',
+    'warehouse': 'WH',
+    'log': 'LOG'
+}
+
+# Process-wide engine registry, one pooled engine per db_type
+_engines = {}
+_engines_lock = threading.Lock()
+_pool_stats = {}
+_stats_lock = threading.Lock()
+
+
+class _TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long callers wait to check out a connection.
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats = getattr(self, '_paccafe_stats', None)
+            if stats is not None:
+                with _stats_lock:
+                    wait = time.perf_counter() - start
+                    stats['wait_total_sec'] += wait
+                    stats['wait_max_sec'] = max(stats['wait_max_sec'], wait)
+
+
+def _register_pool_metrics(engine, db_type: str):
+    stats = {
+        'checkouts': 0,
+        'checkins': 0,
+        'connects': 0,
+        'in_use': 0,
+        'in_use_peak': 0,
+        'wait_total_sec': 0.0,
+        'wait_max_sec': 0.0
+    }
+    engine.pool._paccafe_stats = stats
+    _pool_stats[db_type] = stats
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_conn, conn_record):
+        with _stats_lock:
+            stats['connects'] += 1
+
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_conn, conn_record, conn_proxy):
+        with _stats_lock:
+            stats['checkouts'] += 1
+            stats['in_use'] += 1
+            stats['in_use_peak'] = max(stats['in_use_peak'], stats['in_use'])
+
+    @event.listens_for(engine, 'checkin')
+    def _on_checkin(dbapi_conn, conn_record):
+        with _stats_lock:
+            stats['checkins'] += 1
+            stats['in_use'] = max(stats['in_use'] - 1, 0)
+
+
+def _create_engine(db_type: str):
+    prefix = DB_ENV_PREFIX[db_type]
+    url = f"postgresql://{os.getenv(f'{prefix}_POSTGRES_USER')}:{os.getenv(f'{prefix}_POSTGRES_PASSWORD')}@{os.getenv(f'{prefix}_POSTGRES_HOST')}:{os.getenv(f'{prefix}_POSTGRES_PORT')}/{os.getenv(f'{prefix}_POSTGRES_DB')}"
+
+    # Pool settings can be tuned globally (DB_POOL_*) or per database (e.g. SRC_DB_POOL_SIZE)
+    def pool_setting(name: str, default: str) -> str:
+        return os.getenv(f'{prefix}_DB_{name}', os.getenv(f'DB_{name}', default))
+
+    engine = create_engine(url,
+                           poolclass=_TimedQueuePool,
+                           pool_size=int(pool_setting('POOL_SIZE', '5')),
+                           max_overflow=int(pool_setting('MAX_OVERFLOW', '5')),
+                           pool_timeout=int(pool_setting('POOL_TIMEOUT', '30')),
+                           pool_recycle=int(pool_setting('POOL_RECYCLE', '1800')),
+                           pool_pre_ping=pool_setting('POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'))
+    _register_pool_metrics(engine, db_type)
+    return engine
 
 # Database Connections
 def get_db_connection(db_type):
-    if db_type == 'source':
-        return create_engine(f"postgresql://{os.getenv('SRC_POSTGRES_USER')}:{os.getenv('SRC_POSTGRES_PASSWORD')}@{os.getenv('SRC_POSTGRES_HOST')}:{os.getenv('SRC_POSTGRES_PORT')}/{os.getenv('SRC_POSTGRES_DB')}")
-    elif db_type == 'staging':
-        return create_engine(f"postgresql://{os.getenv('STG_POSTGRES_USER')}:{os.getenv('STG_POSTGRES_PASSWORD')}@{os.getenv('STG_POSTGRES_HOST')}:{os.getenv('STG_POSTGRES_PORT')}/{os.getenv('STG_POSTGRES_DB')}")
-    elif db_type == 'warehouse':
-        return create_engine(f"postgresql://{os.getenv('WH_POSTGRES_USER')}:{os.getenv('WH_POSTGRES_PASSWORD')}@{os.getenv('WH_POSTGRES_HOST')}:{os.getenv('WH_POSTGRES_PORT')}/{os.getenv('WH_POSTGRES_DB')}")
-    elif db_type == 'log':
-        return create_engine(f"postgresql://{os.getenv('LOG_POSTGRES_USER')}:{os.getenv('LOG_POSTGRES_PASSWORD')}@{os.getenv('LOG_POSTGRES_HOST')}:{os.getenv('LOG_POSTGRES_PORT')}/{os.getenv('LOG_POSTGRES_DB')}")
+    """
+    Returns the shared pooled engine for db_type, creating it on first use.
+    """
+    if db_type not in DB_ENV_PREFIX:
+        return None
+
+    engine = _engines.get(db_type)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(db_type)
+            if engine is None:
+                engine = _create_engine(db_type)
+                _engines[db_type] = engine
+    return engine
+
+def register_engine(db_type: str, engine):
+    """
+    Puts an externally created engine (e.g. a local stand-in database) in the registry for db_type.
+    """
+    with _engines_lock:
+        previous = _engines.get(db_type)
+        _engines[db_type] = engine
+    _register_pool_metrics(engine, db_type)
+    if previous is not None and previous is not engine:
+        previous.dispose()
+
+def get_pool_stats() -> dict:
+    """
+    Returns connection pool checkout and wait metrics per db_type.
+    """
+    report = {}
+    with _engines_lock:
+        engines = dict(_engines)
+    for db_type, engine in engines.items():
+        with _stats_lock:
+            stats = dict(_pool_stats.get(db_type, {}))
+        # Stand-in engines may use pools without size accounting
+        if isinstance(engine.pool, QueuePool):
+            stats['pool_size'] = engine.pool.size()
+            stats['checked_out'] = engine.pool.checkedout()
+            stats['overflow'] = engine.pool.overflow()
+        report[db_type] = stats
+    return report
+
+def dispose_engines():
+    """
+    Closes every pooled connection and clears the engine registry.
+    """
+    with _engines_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+        _pool_stats.clear()
+    for engine in engines:
+        engine.dispose()
+
+atexit.register(dispose_engines)
 
 # Logging
+# etl_log records are buffered in memory, mirrored to a local spill file so a crash
+# doesn't lose them, and written to the log database in multi-row batches by a
+# background thread.
+ETL_LOG_BATCH_SIZE = int(os.getenv('ETL_LOG_BATCH_SIZE', '50'))
+ETL_LOG_FLUSH_INTERVAL = float(os.getenv('ETL_LOG_FLUSH_INTERVAL', '5'))
+# Each process spills to <ETL_LOG_SPILL_PATH>.<pid>, so concurrent runs in one directory don't share a file
+ETL_LOG_SPILL_PATH = os.getenv('ETL_LOG_SPILL_PATH', 'etl_log_spill.jsonl')
+
+# Failed flushes of the same records before they are written one by one and the rejects set aside
+ETL_LOG_MAX_RETRIES = int(os.getenv('ETL_LOG_MAX_RETRIES', '5'))
+
+# Log records the log database keeps rejecting, one JSON object per line, for replay by hand
+ETL_LOG_DEAD_LETTER_PATH = os.getenv('ETL_LOG_DEAD_LETTER_PATH', 'etl_log_dead_letter.jsonl')
+
+_log_buffer = []
+_log_lock = threading.Lock()
+_log_flush_lock = threading.Lock()
+_log_wakeup = threading.Event()
+_log_writer = None
+_log_failures = 0
+_log_migrated = False
+
+def _spill_path() -> str:
+    return f"{ETL_LOG_SPILL_PATH}.{os.getpid()}"
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _write_spill(records: list, mode: str):
+    with open(_spill_path(), mode) as file:
+        for record in records:
+            file.write(json.dumps(record, default=str) + "\n")
+        file.flush()
+
+def _read_spill(path: str) -> list:
+    records = []
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # A torn last line from a crash mid-write
+                continue
+    return records
+
+def _recover_spill() -> list:
+    """
+    Reads records left behind in spill files by runs and transform worker processes that died before flushing.
+    Files of processes that are still running are theirs to flush; ETL_LOG_SPILL_PATH itself is the
+    spill file of versions that didn't suffix it.
+    """
+    records = []
+    for path in [ETL_LOG_SPILL_PATH] + glob.glob(glob.escape(ETL_LOG_SPILL_PATH) + ".*"):
+        match = re.search(r"\.(?:worker-|recovering-)?(\d+)$", path)
+        if path == _spill_path() or (path != ETL_LOG_SPILL_PATH and (match is None or _pid_alive(int(match.group(1))))):
+            continue
+        # Claimed by renaming, so two processes recovering at once don't both replay it
+        claimed = f"{path}.recovering-{os.getpid()}"
+        try:
+            os.rename(path, claimed)
+        except OSError:
+            continue
+        recovered = _read_spill(claimed)
+        # Keep them in this process's spill file until they are flushed
+        _write_spill(recovered, 'a')
+        records.extend(recovered)
+        os.remove(claimed)
+    return records
+
+def _log_writer_loop():
+    while True:
+        _log_wakeup.wait(timeout=ETL_LOG_FLUSH_INTERVAL)
+        _log_wakeup.clear()
+        flush_etl_log()
+
+def _start_log_writer():
+    global _log_writer
+    if _log_writer is not None:
+        return
+    _log_buffer.extend(_recover_spill())
+    _log_writer = threading.Thread(target=_log_writer_loop, name="etl-log-writer", daemon=True)
+    _log_writer.start()
+
 def etl_log(log_msg: dict):
+    """
+    Queues a log record for the next batched insert into etl_log.
+    """
     try:
-        conn = get_db_connection('log')
-        df_log = pd.DataFrame([log_msg])
-        df_log.to_sql(name="etl_log", con=conn, if_exists="append", index=False)
+        with _log_lock:
+            _start_log_writer()
+            _write_spill([log_msg], 'a')
+            _log_buffer.append(log_msg)
+            buffered = len(_log_buffer)
+        if buffered >= ETL_LOG_BATCH_SIZE:
+            _log_wakeup.set()
     except Exception as e:
         print(f"Can't save your log message. Cause: {str(e)}")
 
-def read_etl_log(filter_params: dict) -> pd.DataFrame:
+def migrate_log_db():
     """
-    Reads the latest etl_date from the log table for incremental extraction.
+    Adds the columns and tables introduced after a log database was created (src/models/log_migrate.sql), once per process.
+    init.sql only runs on a fresh volume, and inserts would fail on an older log database.
     """
-    try:
-        # create connection to database        
-        conn = get_db_connection('log')
-
-        # To help with the incremental process, get the etl_date from the relevant process
-        """
-        SELECT MAX(etl_date)
-        FROM etl_log "
-        WHERE 
-            step = %s and
-            table_name ilike %s and
-            status = %s and
-            process = %s
-        """
-        query = sqlalchemy.text(read_sql("log"))
-
-        # Execute the query with pd.read_sql
-        df = pd.read_sql(sql=query, con=conn, params=(filter_params,))
-
-        #return extracted data
-        return df
-    except Exception as e:
-        print(f"Can't execute your query. Cause: {str(e)}")
-        return pd.DataFrame()
+    global _log_migrated
+    if _log_migrated:
+        return
+    conn = get_db_connection('log')
+    # Stand-in databases (the benchmark's SQLite) are created with the current columns
+    if conn.dialect.name == 'postgresql':
+        with conn.begin() as connection:
+            connection.exec_driver_sql(read_sql("log_migrate"))
+    _log_migrated = True
+
+def _insert_log(records: list):
+    migrate_log_db()
+    pd.DataFrame(records).to_sql(name="etl_log", con=get_db_connection('log'), if_exists="append", index=False, method="multi")
+
+def _rejected_by_database(error: BaseException) -> bool:
+    """
+    True if the database refused the rows themselves (a constraint or a bad value), through pandas' wrapping.
+    """
+    while error is not None:
+        if isinstance(error, (IntegrityError, DataError)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+def _dead_letter(records: list, error: str) -> list:
+    """
+    Inserts records one at a time and moves the ones the database rejects to the dead-letter file.
+    Stops at the first other error (the database went away) and returns the records not yet written.
+    """
+    rejected = []
+    for position, record in enumerate(records):
+        try:
+            _insert_log([record])
+        except Exception as e:
+            if _rejected_by_database(e):
+                rejected.append({**record, "dead_letter_error": str(e)})
+                continue
+            print(f"Can't save your log message. Cause: {str(e)}")
+            records = records[position:]
+            break
+    else:
+        records = []
+    if rejected:
+        with open(ETL_LOG_DEAD_LETTER_PATH, 'a') as file:
+            for record in rejected:
+                file.write(json.dumps(record, default=str) + "\n")
+        print(f"Moved {len(rejected)} etl_log records to {ETL_LOG_DEAD_LETTER_PATH} after {ETL_LOG_MAX_RETRIES} failed flushes. Cause: {error}")
+    return records
+
+def flush_etl_log():
+    """
+    Writes every buffered log record to the log database in one multi-row insert.
+    A batch the database rejects (IntegrityError, DataError) ETL_LOG_MAX_RETRIES flushes in a row is written
+    record by record, and the rejected records go to ETL_LOG_DEAD_LETTER_PATH so they stop blocking later ones.
+    Records that fail for other reasons (the log database is unreachable) stay buffered and spilled.
+    """
+    global _log_failures
+    with _log_flush_lock:
+        with _log_lock:
+            records = list(_log_buffer)
+            del _log_buffer[:]
+        if not records:
+            return
+        try:
+            _insert_log(records)
+            _log_failures = 0
+        except Exception as e:
+            _log_failures += 1
+            if _log_failures < ETL_LOG_MAX_RETRIES or not _rejected_by_database(e):
+                # Keep the records buffered (they are still in the spill file) and retry on the next flush
+                with _log_lock:
+                    _log_buffer[:0] = records
+                print(f"Can't save your log message. Cause: {str(e)}")
+                return
+            _log_failures = 0
+            unwritten = _dead_letter(records, str(e))
+            if unwritten:
+                with _log_lock:
+                    _log_buffer[:0] = unwritten
+
+        # Only records queued after this flush started still need to survive a crash
+        with _log_lock:
+            if _log_buffer:
+                _write_spill(_log_buffer, 'w')
+            elif os.path.exists(_spill_path()):
+                os.remove(_spill_path())
+
+# Registered after dispose_engines so it runs first at interpreter exit
+atexit.register(flush_etl_log)
 
 # Read SQL Query from File
 def read_sql(table_name: str) -> str:
@@ -69,33 +386,141 @@ def read_sql(table_name: str) -> str:
         return file.read()
 
 # Create Function handle_error to dump failure data to MiniO
+# Failed batches are queued and uploaded by a background thread, so the pipeline
+# doesn't wait on object storage. MINIO_ENDPOINT=file:///some/dir writes the objects
+# to a local directory instead (offline runs and tests).
+MINIO_ENDPOINT = os.getenv('MINIO_ENDPOINT', 'localhost:9000')
+MINIO_SECURE = os.getenv('MINIO_SECURE', 'false').lower() == 'true'
+
+# 'csv.gz' or 'parquet'
+ERROR_DUMP_FORMAT = os.getenv('ERROR_DUMP_FORMAT', 'csv.gz')
+ERROR_DUMP_QUEUE_SIZE = int(os.getenv('ERROR_DUMP_QUEUE_SIZE', '100'))
+# Multipart upload part size (S3 minimum is 5 MiB); serialized dumps above this stay on disk
+ERROR_DUMP_PART_SIZE = int(os.getenv('ERROR_DUMP_PART_SIZE', str(10 * 1024 * 1024)))
+
+_dump_queue = queue.Queue(maxsize=ERROR_DUMP_QUEUE_SIZE)
+_dump_writer = None
+_dump_writer_lock = threading.Lock()
+_minio_client = None
+_known_buckets = set()
+
+class LocalObjectStore:
+    """
+    Minimal MinIO stand-in that stores every object as a file under <root>/<bucket>/.
+    """
+    def __init__(self, root: str):
+        self.root = root
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return os.path.isdir(os.path.join(self.root, bucket_name))
+
+    def make_bucket(self, bucket_name: str):
+        os.makedirs(os.path.join(self.root, bucket_name), exist_ok=True)
+
+    def put_object(self, bucket_name: str, object_name: str, data, length: int, part_size: int = 0, content_type: str = None):
+        with open(os.path.join(self.root, bucket_name, object_name), 'wb') as file:
+            shutil.copyfileobj(data, file)
+
+def get_minio_client():
+    """
+    Returns the process-wide MinIO client (or a LocalObjectStore for a file:// endpoint).
+    """
+    global _minio_client
+    if _minio_client is None:
+        if MINIO_ENDPOINT.startswith('file://'):
+            _minio_client = LocalObjectStore(MINIO_ENDPOINT[len('file://'):])
+        else:
+            # Imported on first use: most runs never dump a failed batch
+            from minio import Minio
+            _minio_client = Minio(MINIO_ENDPOINT,
+                        access_key=os.getenv('MINIO_ACCESS_KEY'),
+                        secret_key=os.getenv('MINIO_SECRET_KEY'),
+                        secure=MINIO_SECURE)
+    return _minio_client
+
+def _upload_dump(data, bucket_name: str, object_name: str):
+    client = get_minio_client()
+
+    # Make a bucket if it doesn't exist (checked once per bucket per process)
+    if bucket_name not in _known_buckets:
+        if not client.bucket_exists(bucket_name):
+            client.make_bucket(bucket_name)
+        _known_buckets.add(bucket_name)
+
+    # Serialize into a spooled file so large batches go to disk rather than memory
+    with tempfile.SpooledTemporaryFile(max_size=ERROR_DUMP_PART_SIZE) as buffer:
+        if ERROR_DUMP_FORMAT == 'parquet':
+            data.to_parquet(buffer)
+            content_type = 'application/vnd.apache.parquet'
+        else:
+            # The CSV is compressed as it is written, never held whole as a string
+            with gzip.GzipFile(fileobj=buffer, mode='wb') as gz, io.TextIOWrapper(gz, 'utf-8', newline='') as text:
+                data.to_csv(text)
+            content_type = 'application/gzip'
+        buffer.seek(0)
+
+        # Unknown length: the client streams it as a multipart upload
+        client.put_object(
+            bucket_name=bucket_name,
+            object_name=object_name,
+            data=buffer,
+            length=-1,
+            part_size=ERROR_DUMP_PART_SIZE,
+            content_type=content_type
+        )
+
+def _dump_writer_loop():
+    while True:
+        data, bucket_name, object_name = _dump_queue.get()
+        try:
+            _upload_dump(data, bucket_name, object_name)
+        except Exception as e:
+            print(f"Can't dump {object_name} to {bucket_name}. Cause: {str(e)}")
+        finally:
+            _dump_queue.task_done()
+
 def handle_error(data, bucket_name: str, table_name: str, step: str, component: str):
+    """
+    Queues a failed batch for upload to object storage and returns immediately.
+    When ERROR_DUMP_QUEUE_SIZE dumps are already waiting, the batch is dropped rather than blocking the pipeline.
+    """
+    global _dump_writer
+    if data is None:
+        return
+    with _dump_writer_lock:
+        if _dump_writer is None:
+            _dump_writer = threading.Thread(target=_dump_writer_loop, name="error-dump-writer", daemon=True)
+            _dump_writer.start()
+
     current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    extension = 'parquet' if ERROR_DUMP_FORMAT == 'parquet' else 'csv.gz'
+    object_name = f"{step}_{component}_{table_name}_{current_date}.{extension}"
+    try:
+        _dump_queue.put_nowait((data, bucket_name, object_name))
+    except queue.Full:
+        print(f"Error dump queue is full, dropping {object_name} ({len(data)} rows)")
 
-    # Initialize MinIO client
-    client = Minio('localhost:9000',
-                access_key=os.getenv('MINIO_ACCESS_KEY'),
-                secret_key=os.getenv('MINIO_SECRET_KEY'),
-                secure=False)
-    
-    # Make a bucket if it doesn't exist
-    if not client.bucket_exists(bucket_name):
-        client.make_bucket(bucket_name)
-
-    # Convert DataFrame to CSV and then to bytes
-    csv_bytes = data.to_csv().encode('utf-8')
-    csv_buffer = BytesIO(csv_bytes)
-
-    # Upload the CSV file to the bucket
-    client.put_object(
-        bucket_name=bucket_name,
-        object_name=f"{step}_{component}_{table_name}_{current_date}.csv",
-        data=csv_buffer,
-        length=len(csv_bytes),
-        content_type='application/csv'
-    )
-
-    # List objects in the bucket
-    objects = client.list_objects(bucket_name, recursive=True)
-    for obj in objects:
-        print(obj.object_name)
\ No newline at end of file
+def flush_error_dumps():
+    """
+    Waits until every queued failure dump has been uploaded.
+    """
+    if _dump_writer is not None:
+        _dump_queue.join()
+
+atexit.register(flush_error_dumps)
+
+def init_worker_process():
+    """
+    Prepares a worker process (src.utils.process_pool): pooled connections and buffered logs or dumps
+    left from the process it started from are dropped. etl_log records spill to a file of the worker's own, named by its pid.
+    """
+    global _log_writer, _dump_writer, _dump_queue
+    with _engines_lock:
+        for engine in _engines.values():
+            # Leaves the parent's connections open for the parent
+            engine.dispose(close=False)
+    with _log_lock:
+        del _log_buffer[:]
+        _log_writer = None
+    _dump_writer = None
+    _dump_queue = queue.Queue(maxsize=ERROR_DUMP_QUEUE_SIZE)
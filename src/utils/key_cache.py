@@ -0,0 +1,117 @@
+import os
+import threading
+import pandas as pd
+import sqlalchemy
+from src.utils.helper import get_db_connection
+
+# Directory holding one pickled natural key -> surrogate key Series per dimension, with the dimension's fingerprint
+KEY_CACHE_DIR = os.getenv('KEY_CACHE_DIR', '.key_cache')
+
+# Dimension -> (primary natural key, lookup column used by facts, surrogate key)
+DIMENSION_KEYS = {
+    'dim_customers': ('nk_customer_id', 'nk_customer_id', 'sk_customer_id'),
+    'dim_employees': ('nk_employee_id', 'nk_employee_id', 'sk_employee_id'),
+    'dim_products': ('nk_product_id', 'nk_product_id', 'sk_product_id'),
+    'dim_store_branch': ('nk_store_id', 'store_name', 'sk_store_id')
+}
+
+_caches = {}
+_cache_lock = threading.Lock()
+
+def _cache_path(dim_name: str) -> str:
+    return os.path.join(KEY_CACHE_DIR, f"{dim_name}.pkl")
+
+def _query_keys(dim_name: str, filter_col: str = None, values: list = None) -> pd.Series:
+    """
+    Reads lookup -> surrogate key pairs from the warehouse, optionally only for some values of filter_col.
+    A lookup value shared by several members (a store name) resolves to the highest surrogate key,
+    the same member src/models/elt/dim_products.sql picks.
+    """
+    _, lookup_col, sk_col = DIMENSION_KEYS[dim_name]
+    query = sqlalchemy.text(f"SELECT {lookup_col}, {sk_col} FROM public.{dim_name} ORDER BY {sk_col}")
+    params = {}
+    if filter_col is not None:
+        query = sqlalchemy.text(f"SELECT {lookup_col}, {sk_col} FROM public.{dim_name} WHERE {filter_col} IN :values ORDER BY {sk_col}")
+        query = query.bindparams(sqlalchemy.bindparam("values", expanding=True))
+        params["values"] = values
+    df = pd.read_sql(sql=query, con=get_db_connection('warehouse'), params=params)
+    return df.dropna(subset=[lookup_col]).drop_duplicates(subset=[lookup_col], keep='last').set_index(lookup_col)[sk_col]
+
+def _fingerprint(dim_name: str) -> tuple:
+    """
+    Row count and highest surrogate key of a dimension; truncating or rebuilding it changes them.
+    """
+    _, _, sk_col = DIMENSION_KEYS[dim_name]
+    with get_db_connection('warehouse').connect() as conn:
+        count, max_sk = conn.execute(sqlalchemy.text(f"SELECT count(*), max({sk_col}) FROM public.{dim_name}")).one()
+    return int(count), None if max_sk is None else int(max_sk)
+
+def _save(dim_name: str, keys: pd.Series):
+    os.makedirs(KEY_CACHE_DIR, exist_ok=True)
+    tmp_path = _cache_path(dim_name) + ".tmp"
+    pd.to_pickle({"fingerprint": _fingerprint(dim_name), "keys": keys}, tmp_path)
+    os.replace(tmp_path, _cache_path(dim_name))
+
+def _merge(dim_name: str, keys: pd.Series):
+    nk_col, lookup_col, _ = DIMENSION_KEYS[dim_name]
+    current = _caches.get(dim_name)
+    if current is not None and not current.empty:
+        keys = pd.concat([current, keys])
+        if lookup_col == nk_col:
+            keys = keys[~keys.index.duplicated(keep='last')]
+        else:
+            # A refreshed member mustn't displace a newer one sharing its lookup value
+            keys = keys.groupby(level=0).max()
+    _caches[dim_name] = keys
+    _save(dim_name, keys)
+
+def _load(dim_name: str) -> pd.Series:
+    """
+    Returns the in-memory cache, reading the local file or seeding it from the warehouse on first use.
+    The file is used only if the dimension's fingerprint still matches the one saved with it.
+    """
+    if dim_name not in _caches:
+        cached = None
+        if os.path.exists(_cache_path(dim_name)):
+            try:
+                cached = pd.read_pickle(_cache_path(dim_name))
+            except Exception as e:
+                print(f"Can't read the key cache of {dim_name}, reseeding it. Cause: {str(e)}")
+        if isinstance(cached, dict) and cached.get("fingerprint") == _fingerprint(dim_name):
+            _caches[dim_name] = cached["keys"]
+        else:
+            # No file, a file without a fingerprint, or a dimension truncated or rebuilt since it was saved
+            _merge(dim_name, _query_keys(dim_name))
+    return _caches[dim_name]
+
+def get_key_lookup(dim_name: str, natural_keys=None) -> pd.Series:
+    """
+    Returns the natural key -> surrogate key lookup for a dimension.
+    Keys in natural_keys that the cache doesn't know yet are fetched from the warehouse first.
+    """
+    with _cache_lock:
+        keys = _load(dim_name)
+        if natural_keys is not None:
+            wanted = pd.Index(pd.Series(natural_keys).dropna().unique())
+            missing = wanted[~wanted.isin(keys.index)]
+            if len(missing) > 0:
+                _, lookup_col, _ = DIMENSION_KEYS[dim_name]
+                found = _query_keys(dim_name, lookup_col, missing.tolist())
+                if not found.empty:
+                    _merge(dim_name, found)
+                keys = _caches[dim_name]
+        return keys
+
+def update_key_cache(dim_name: str, natural_keys):
+    """
+    Refreshes the cache for rows just loaded into a dimension, identified by its primary natural key.
+    """
+    if dim_name not in DIMENSION_KEYS:
+        return
+    nk_col, _, _ = DIMENSION_KEYS[dim_name]
+    values = pd.Series(natural_keys).dropna().unique()
+    if len(values) == 0:
+        return
+    with _cache_lock:
+        _load(dim_name)
+        _merge(dim_name, _query_keys(dim_name, nk_col, pd.Series(values).tolist()))
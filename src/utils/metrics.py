@@ -0,0 +1,101 @@
+import resource
+import sys
+import threading
+import time
+
+# Metric columns added to every etl_log record (see log_data/data/init.sql).
+# peak_memory_mb is how far the process's peak RSS rose while the stage ran, not the process-lifetime peak;
+# it is 0 when the stage stayed under an earlier high-water mark, and stages running concurrently share the rise.
+METRIC_COLUMNS = ['duration_sec', 'rows_in', 'rows_out', 'bytes_read', 'rows_rejected', 'peak_memory_mb']
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 2)
+
+def frame_bytes(data) -> int:
+    """
+    Shallow in-memory size of a DataFrame, cheap enough to take on every stage.
+    """
+    return int(data.memory_usage(index=True, deep=False).sum())
+
+class RunMetrics:
+    """
+    Collects the finished stages of the current run.
+    """
+    def __init__(self):
+        self._stages = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict):
+        with self._lock:
+            self._stages.append(record)
+
+    def reset(self):
+        with self._lock:
+            self._stages = []
+
+    @property
+    def stages(self) -> list:
+        with self._lock:
+            return list(self._stages)
+
+    def slowest(self):
+        stages = self.stages
+        return max(stages, key=lambda stage: stage['duration_sec']) if stages else None
+
+    def summary(self) -> str:
+        stages = sorted(self.stages, key=lambda stage: stage['duration_sec'], reverse=True)
+        if not stages:
+            return "[metrics] no stages recorded"
+        lines = [f"[metrics] {len(stages)} stages, {sum(stage['duration_sec'] for stage in stages):.2f}s total stage time"]
+        for stage in stages:
+            lines.append(
+                f"[metrics] {stage['step']}.{stage['component']}.{stage['table_name']}: "
+                f"{stage['duration_sec']:.2f}s, rows in={stage['rows_in']} out={stage['rows_out']} "
+                f"rejected={stage['rows_rejected']}, bytes read={stage['bytes_read']}, "
+                f"peak memory rise={stage['peak_memory_mb']}MB, status={stage['status']}"
+            )
+        slowest = stages[0]
+        lines.append(f"[metrics] slowest stage: {slowest['step']}.{slowest['component']}.{slowest['table_name']} ({slowest['duration_sec']:.2f}s)")
+        return "\n".join(lines)
+
+# Metrics of the current run, shared by every stage in the process
+run_metrics = RunMetrics()
+
+def start_stage(step: str, component: str, table_name: str, rows_in: int = None) -> dict:
+    """
+    Starts timing a stage. Fill in rows_out, bytes_read and rows_rejected on the returned dict as they become known.
+    """
+    return {
+        "step": step,
+        "component": component,
+        "table_name": table_name,
+        "started": time.perf_counter(),
+        "peak_rss_start": peak_rss_mb(),
+        "rows_in": rows_in,
+        "rows_out": None,
+        "bytes_read": None,
+        "rows_rejected": None
+    }
+
+def finish_stage(stage: dict, log_msg: dict) -> dict:
+    """
+    Stops timing a stage, records it in run_metrics and returns log_msg with the metric columns added.
+    """
+    metrics = {
+        "duration_sec": round(time.perf_counter() - stage["started"], 4),
+        "rows_in": stage["rows_in"],
+        "rows_out": stage["rows_out"],
+        "bytes_read": stage["bytes_read"],
+        "rows_rejected": stage["rows_rejected"],
+        "peak_memory_mb": round(max(peak_rss_mb() - stage["peak_rss_start"], 0), 2)
+    }
+    run_metrics.add({
+        "step": stage["step"],
+        "component": stage["component"],
+        "table_name": stage["table_name"],
+        "status": log_msg.get("status"),
+        **metrics
+    })
+    return {**log_msg, **metrics}
@@ -0,0 +1,54 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.helper import DB_ENV_PREFIX
+
+# Upper bound on extraction threads for a whole stage
+EXTRACT_MAX_WORKERS = int(os.getenv('EXTRACT_MAX_WORKERS', '8'))
+
+# Default number of concurrent extractions against a single source
+EXTRACT_CONCURRENCY = int(os.getenv('EXTRACT_CONCURRENCY', '4'))
+
+_limits = {}
+_limits_lock = threading.Lock()
+
+def get_source_limit(source: str) -> threading.BoundedSemaphore:
+    """
+    Returns the semaphore that caps concurrent work against one source.
+    The limit is read from <PREFIX>_EXTRACT_CONCURRENCY (e.g. SRC_EXTRACT_CONCURRENCY),
+    or SPREADSHEET_EXTRACT_CONCURRENCY for non-database sources, falling back to EXTRACT_CONCURRENCY.
+    """
+    with _limits_lock:
+        if source not in _limits:
+            prefix = DB_ENV_PREFIX.get(source, source.upper())
+            limit = int(os.getenv(f'{prefix}_EXTRACT_CONCURRENCY', EXTRACT_CONCURRENCY))
+            _limits[source] = threading.BoundedSemaphore(max(limit, 1))
+        return _limits[source]
+
+def _run_limited(source: str, func, args: tuple):
+    with get_source_limit(source):
+        return func(*args)
+
+def run_parallel(tasks: dict, max_workers: int = None) -> dict:
+    """
+    Runs independent tasks concurrently and returns their results by name.
+    tasks maps a name to (source, func, args); source selects the concurrency limit.
+    A task that raises returns None, the same as a failed extract function.
+    """
+    if not tasks:
+        return {}
+
+    results = {}
+    workers = min(max_workers or EXTRACT_MAX_WORKERS, len(tasks))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as executor:
+        futures = {
+            name: executor.submit(_run_limited, source, func, args)
+            for name, (source, func, args) in tasks.items()
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"Task {name} failed. Cause: {str(e)}")
+                results[name] = None
+    return results
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+import sqlalchemy
+from sqlalchemy.pool import QueuePool
+from src.utils.schema import get_schema
+
+# Number of primary-key ranges a table is read in, each over its own pooled connection; 1 keeps a single read.
+# Override per table with EXTRACT_PARTITIONS_<TABLE_NAME>. Parallel reads are capped at the pool's size plus overflow.
+EXTRACT_PARTITIONS = int(os.getenv('EXTRACT_PARTITIONS', '1'))
+
+# Integer column types that can be split into ranges
+PARTITION_TYPES = ('int2', 'smallint', 'int4', 'integer', 'int', 'int8', 'bigint', 'serial', 'bigserial')
+
+def get_partitions(table_name: str) -> int:
+    return max(int(os.getenv(f'EXTRACT_PARTITIONS_{table_name.upper()}', EXTRACT_PARTITIONS)), 1)
+
+def partition_key(db_type: str, table_name: str) -> str:
+    """
+    Returns the table's single integer primary key column from its DDL, or None if it can't be range-partitioned.
+    """
+    table = get_schema(db_type).get(table_name)
+    if table is None or len(table['primary_key']) != 1:
+        return None
+    column = table['primary_key'][0]
+    return column if table['columns'].get(column) in PARTITION_TYPES else None
+
+def max_readers(engine, wanted: int) -> int:
+    """
+    Caps parallel reads at the connections the engine's pool can hand out at once (pool size plus overflow),
+    so extra readers don't sit waiting for a connection until the pool times out.
+    """
+    pool = engine.pool
+    # Stand-in engines may use pools without size accounting; a negative overflow is unbounded
+    if not isinstance(pool, QueuePool) or pool._max_overflow < 0:
+        return max(wanted, 1)
+    return max(min(wanted, pool.size() + pool._max_overflow), 1)
+
+def key_ranges(engine, query, params: dict, key: str, partitions: int = None, width: int = None) -> list:
+    """
+    Splits the key span of the query's rows into [low, high] ranges, either `partitions` equal ranges
+    or ranges of `width` keys. Returns [] when the query has no rows.
+    """
+    bounds_query = sqlalchemy.text(f"SELECT min({key}), max({key}) FROM ({query.text}) q")
+    with engine.connect() as conn:
+        low, high = conn.execute(bounds_query, params).one()
+    if low is None:
+        return []
+
+    low, high = int(low), int(high)
+    if width is None:
+        width = -(-(high - low + 1) // partitions)
+    return [(start, min(start + width - 1, high)) for start in range(low, high + 1, max(width, 1))]
+
+def _read_range(engine, query, params: dict, key: str, key_range: tuple) -> pd.DataFrame:
+    range_query = sqlalchemy.text(f"SELECT * FROM ({query.text}) q WHERE {key} BETWEEN :partition_low AND :partition_high")
+    range_params = dict(params, partition_low=key_range[0], partition_high=key_range[1])
+    return pd.read_sql(sql=range_query, con=engine, params=range_params)
+
+def read_partitioned(engine, query, params: dict, key: str, partitions: int) -> pd.DataFrame:
+    """
+    Reads the query's rows in `partitions` key ranges in parallel and concatenates them in key order.
+    """
+    ranges = key_ranges(engine, query, params, key, partitions=partitions)
+    if not ranges:
+        return pd.read_sql(sql=query, con=engine, params=params)
+
+    with ThreadPoolExecutor(max_workers=max_readers(engine, len(ranges)), thread_name_prefix="partition") as executor:
+        frames = list(executor.map(lambda key_range: _read_range(engine, query, params, key, key_range), ranges))
+    return pd.concat(frames, ignore_index=True)
+
+def stream_partitioned(engine, query, params: dict, key: str, partitions: int, chunksize: int):
+    """
+    Yields the query's rows in ranges of chunksize keys, read by `partitions` parallel workers (at most max_readers).
+    Chunks are yielded as they finish, so at most `partitions` chunks are held in memory at once.
+    """
+    partitions = max_readers(engine, partitions)
+    ranges = iter(key_ranges(engine, query, params, key, width=chunksize))
+    with ThreadPoolExecutor(max_workers=partitions, thread_name_prefix="partition") as executor:
+        pending = set()
+        try:
+            while True:
+                for key_range in ranges:
+                    pending.add(executor.submit(_read_range, engine, query, params, key, key_range))
+                    if len(pending) >= partitions:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = future.result()
+                    if len(chunk):
+                        yield chunk
+        finally:
+            # Stop queued reads if the consumer stops early or a read fails
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,137 @@
+import atexit
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from src.utils.helper import init_worker_process, flush_etl_log, flush_error_dumps
+from src.utils.metrics import run_metrics
+from src.utils.checkpoint import write_ipc, read_ipc
+from src.utils.partition import partition_key
+
+# Default transform executor: 'thread' runs transforms in the pipeline's own threads,
+# 'process' runs them in a pool of worker processes so CPU-bound transforms don't share the GIL.
+# Override per table with TRANSFORM_EXECUTOR_<TABLE_NAME>.
+TRANSFORM_EXECUTOR = os.getenv('TRANSFORM_EXECUTOR', 'thread')
+
+TRANSFORM_EXECUTORS = ('thread', 'process')
+
+# Worker processes in the pool
+TRANSFORM_WORKERS = int(os.getenv('TRANSFORM_WORKERS', str(os.cpu_count() or 1)))
+
+# Row shards one table's transform is split into (process executor only); override per table with TRANSFORM_SHARDS_<TABLE_NAME>
+TRANSFORM_SHARDS = int(os.getenv('TRANSFORM_SHARDS', '1'))
+
+# 'spawn' or 'forkserver': workers build their own engines from the environment.
+# 'fork' isn't offered: a child forked while a writer thread holds a lock (etl_log, key cache) would deadlock on it.
+TRANSFORM_START_METHOD = os.getenv('TRANSFORM_START_METHOD', 'spawn')
+
+TRANSFORM_START_METHODS = ('spawn', 'forkserver')
+
+# Frames pass between processes as Arrow IPC files here (shared memory where available)
+TRANSFORM_SHM_DIR = os.getenv('TRANSFORM_SHM_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_transform_executor(table_name: str) -> str:
+    executor = os.getenv(f'TRANSFORM_EXECUTOR_{table_name.upper()}', TRANSFORM_EXECUTOR).lower()
+    if executor not in TRANSFORM_EXECUTORS:
+        raise ValueError(f"Unknown transform executor for {table_name}: {executor}")
+    return executor
+
+def get_shards(table_name: str) -> int:
+    return max(int(os.getenv(f'TRANSFORM_SHARDS_{table_name.upper()}', TRANSFORM_SHARDS)), 1)
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if TRANSFORM_START_METHOD not in TRANSFORM_START_METHODS:
+        raise ValueError(f"Unsupported TRANSFORM_START_METHOD: {TRANSFORM_START_METHOD} (use one of {', '.join(TRANSFORM_START_METHODS)})")
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(TRANSFORM_WORKERS, 1),
+                mp_context=multiprocessing.get_context(TRANSFORM_START_METHOD),
+                initializer=init_worker_process
+            )
+        return _pool
+
+def shutdown_transform_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+atexit.register(shutdown_transform_pool)
+
+def _shard(data: pd.DataFrame, staging_table: str, shards: int) -> list:
+    """
+    Splits rows by their staging primary key, so rows with the same key (and their duplicates) stay in one shard.
+    """
+    key = partition_key('staging', staging_table)
+    if shards <= 1 or key is None or key not in data.columns or len(data) < shards:
+        return [data]
+    shard_ids = data[key].fillna(0).astype('int64') % shards
+    return [data[shard_ids == shard_id] for shard_id in range(shards)]
+
+def _run_shard(transform, in_path: str, out_path: str):
+    """
+    Runs in a worker: reads the input shard, transforms it and writes the result for the parent.
+    Returns whether the transform succeeded and the stage metrics it recorded.
+    """
+    run_metrics.reset()
+    try:
+        result = transform(read_ipc(in_path))
+        if result is not None:
+            write_ipc(out_path, result)
+        return result is not None, run_metrics.stages
+    finally:
+        # Worker processes exit without running atexit handlers
+        flush_etl_log()
+        flush_error_dumps()
+
+def run_transform(data: pd.DataFrame, transform, staging_table: str, table_name: str) -> pd.DataFrame:
+    """
+    Runs transform(data) with the table's transform executor.
+    In the process pool the input is split into TRANSFORM_SHARDS row shards transformed in parallel;
+    a failed shard fails the whole transform (returns None).
+    """
+    if data is None or get_transform_executor(table_name) != 'process':
+        return transform(data)
+
+    paths = []
+    try:
+        futures = []
+        for shard in _shard(data, staging_table, get_shards(table_name)):
+            in_path = os.path.join(TRANSFORM_SHM_DIR, f"paccafe_{table_name}_{uuid.uuid4().hex}.in.arrow")
+            out_path = in_path[:-len(".in.arrow")] + ".out.arrow"
+            paths.extend([in_path, out_path])
+            write_ipc(in_path, shard.reset_index(drop=True))
+            futures.append((out_path, _get_pool().submit(_run_shard, transform, in_path, out_path)))
+
+        frames = []
+        failed = False
+        for out_path, future in futures:
+            try:
+                succeeded, stages = future.result()
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for the next transform
+                shutdown_transform_pool()
+                raise
+            for stage in stages:
+                run_metrics.add(stage)
+            if succeeded:
+                frames.append(read_ipc(out_path))
+            else:
+                failed = True
+        if failed:
+            return None
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    finally:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,129 @@
+import os
+import pandas as pd
+import sqlalchemy
+from src.utils.helper import get_db_connection
+from src.utils.loader import write_table
+
+# Set ROW_HASH_DIFF=0 to upsert every extracted row
+ROW_HASH_DIFF = os.getenv('ROW_HASH_DIFF', '1') == '1'
+
+# Keys looked up per query against the stored hashes
+ROW_HASH_LOOKUP_BATCH = int(os.getenv('ROW_HASH_LOOKUP_BATCH', '10000'))
+
+def row_hashes(data: pd.DataFrame) -> pd.Series:
+    """
+    Vectorized 64-bit fingerprint of every row's values, indexed like data.
+    """
+    # Numbers are hashed as float64 so an int column read back as float (nulls in another batch) hashes the same
+    values = data.copy()
+    for col in values.columns:
+        if pd.api.types.is_numeric_dtype(values[col]) and not pd.api.types.is_bool_dtype(values[col]):
+            values[col] = values[col].astype('float64')
+    hashes = pd.util.hash_pandas_object(values, index=False)
+    # Stored as int8 in the log database
+    return pd.Series(hashes.to_numpy().view('int64'), index=data.index)
+
+def _row_keys(index: pd.Index) -> pd.Index:
+    if isinstance(index, pd.MultiIndex):
+        return pd.Index(['|'.join(map(str, key)) for key in index])
+    return index.astype(str)
+
+def _stored_hashes(step: str, table_name: str, keys: pd.Index) -> pd.Series:
+    query = sqlalchemy.text(
+        "SELECT row_key, row_hash FROM public.etl_row_hash "
+        "WHERE step = :step AND table_name = :table_name AND row_key IN :keys"
+    ).bindparams(sqlalchemy.bindparam("keys", expanding=True))
+    conn = get_db_connection('log')
+    frames = [
+        pd.read_sql(sql=query, con=conn, params={"step": step, "table_name": table_name, "keys": list(keys[start:start + ROW_HASH_LOOKUP_BATCH])})
+        for start in range(0, len(keys), ROW_HASH_LOOKUP_BATCH)
+    ]
+    stored = pd.concat(frames) if frames else pd.DataFrame(columns=['row_key', 'row_hash'])
+    return stored.set_index('row_key')['row_hash']
+
+def _present_in_target(conn, schema: str, table_name: str, index: pd.Index) -> pd.Series:
+    """
+    Tells for each key of index whether the target table still has a row for it.
+    Composite keys aren't probed one by one; they count as present while the target isn't empty.
+    """
+    target = f"{schema}.{table_name}"
+    with conn.connect() as connection:
+        if isinstance(index, pd.MultiIndex):
+            not_empty = connection.execute(sqlalchemy.text(f"SELECT EXISTS (SELECT 1 FROM {target})")).scalar()
+            return pd.Series(bool(not_empty), index=range(len(index)))
+        query = sqlalchemy.text(
+            f"SELECT {index.name} FROM {target} WHERE {index.name} IN :keys"
+        ).bindparams(sqlalchemy.bindparam("keys", expanding=True))
+        keys = index.unique()
+        found = set()
+        for start in range(0, len(keys), ROW_HASH_LOOKUP_BATCH):
+            found.update(row[0] for row in connection.execute(query, {"keys": keys[start:start + ROW_HASH_LOOKUP_BATCH].tolist()}))
+    return pd.Series(index.isin(list(found)), index=range(len(index)))
+
+def changed_rows(data: pd.DataFrame, step: str, table_name: str, conn=None, schema: str = None):
+    """
+    Returns (rows of data that are new or changed since the last load, their hashes).
+    If the stored hashes can't be read, every row is treated as changed.
+    With conn and schema, a matching hash is trusted only if the target still has the row,
+    so hashes outlive neither a truncated or rebuilt target nor deleted rows.
+    """
+    hashes = row_hashes(data)
+    if not ROW_HASH_DIFF or data.empty:
+        return data, hashes
+
+    keys = _row_keys(data.index)
+    try:
+        stored = _stored_hashes(step, table_name, keys.unique())
+    except Exception as e:
+        print(f"Can't read row hashes for {table_name}, loading every row. Cause: {str(e)}")
+        return data, hashes
+
+    changed = (stored.reindex(keys).to_numpy() != hashes.to_numpy())
+    if conn is not None and not changed.all():
+        try:
+            unchanged = ~changed
+            present = _present_in_target(conn, schema, table_name, data.index[unchanged]).to_numpy()
+            changed[unchanged] = ~present
+        except Exception as e:
+            print(f"Can't check {schema}.{table_name} for hashed rows, loading every row. Cause: {str(e)}")
+            return data, hashes
+
+    skipped = len(data) - int(changed.sum())
+    print(f"[hash-diff] {step}.{table_name}: {skipped}/{len(data)} rows unchanged ({skipped / len(data):.1%} skipped)")
+    return data[changed], hashes[changed]
+
+def save_row_hashes(hashes: pd.Series, step: str, table_name: str):
+    """
+    Stores the hashes of rows that were just loaded, for the next run's comparison.
+    """
+    if not ROW_HASH_DIFF or hashes.empty:
+        return
+    df_hash = pd.DataFrame({
+        'step': step,
+        'table_name': table_name,
+        'row_key': _row_keys(hashes.index),
+        'row_hash': hashes.to_numpy()
+    })
+    df_hash = df_hash.drop_duplicates(subset=['row_key'], keep='last').set_index(['step', 'table_name', 'row_key'])
+    conn = get_db_connection('log')
+    # One hash row per loaded row: COPY into a temp table and one merge, whatever the target table's load mode.
+    # Stand-in databases without COPY (the benchmark's SQLite) fall back to upsert.
+    mode = 'copy' if conn.dialect.name == 'postgresql' else 'upsert'
+    write_table(conn, df_hash, 'public', 'etl_row_hash', mode)
+
+def write_changed_rows(conn, data: pd.DataFrame, schema: str, table_name: str, step: str, mode: str = None) -> pd.DataFrame:
+    """
+    Writes only the new or changed rows of data with write_table, then stores their hashes.
+    Returns the rows that were written.
+    """
+    data, hashes = changed_rows(data, step, table_name, conn, schema)
+    if data.empty:
+        return data
+    write_table(conn, data, schema, table_name, mode)
+
+    # A failed hash save only means these rows are written again next run
+    try:
+        save_row_hashes(hashes, step, table_name)
+    except Exception as e:
+        print(f"Can't save row hashes for {table_name}. Cause: {str(e)}")
+    return data
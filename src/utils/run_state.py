@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+# Manifest of the current run: its run_id and the status of every unit (table step or DAG task)
+RUN_STATE_PATH = os.getenv('RUN_STATE_PATH', 'run_state.json')
+
+# Set RUN_RESUME=0 to start a fresh run even if the last one didn't finish
+RUN_RESUME = os.getenv('RUN_RESUME', '1') == '1'
+
+# A failed run is resumed at most this many times, and only while it is younger than RUN_RESUME_MAX_AGE hours;
+# after that the next run starts fresh, so a table that keeps failing doesn't pin every other table to the old run
+RUN_RESUME_MAX_ATTEMPTS = int(os.getenv('RUN_RESUME_MAX_ATTEMPTS', '3'))
+RUN_RESUME_MAX_AGE = float(os.getenv('RUN_RESUME_MAX_AGE', '24'))
+
+_state = None
+_state_lock = threading.Lock()
+
+def _save():
+    tmp_path = RUN_STATE_PATH + ".tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(_state, file, indent=2, default=str)
+    os.replace(tmp_path, RUN_STATE_PATH)
+
+def _read_manifest() -> dict:
+    if not os.path.exists(RUN_STATE_PATH):
+        return None
+    try:
+        with open(RUN_STATE_PATH, 'r') as file:
+            return json.load(file)
+    except ValueError:
+        return None
+
+def _resumable(previous: dict) -> bool:
+    if previous is None or previous.get("status") == "success":
+        return False
+    if previous.get("attempt", 1) >= RUN_RESUME_MAX_ATTEMPTS:
+        print(f"[run] run {previous['run_id']} failed {previous.get('attempt', 1)} attempts, starting fresh")
+        return False
+    age = datetime.now() - datetime.fromisoformat(str(previous.get("started_at", datetime.now())))
+    if age.total_seconds() > RUN_RESUME_MAX_AGE * 3600:
+        print(f"[run] run {previous['run_id']} started {age} ago, starting fresh")
+        return False
+    return True
+
+def start_run(resume: bool = True) -> str:
+    """
+    Resumes the last run if it didn't succeed (its completed units are skipped), otherwise starts a new one.
+    A run is resumed within RUN_RESUME_MAX_ATTEMPTS attempts and RUN_RESUME_MAX_AGE hours of its start;
+    resume=False always starts a new one.
+    Returns the run_id.
+    """
+    global _state
+    with _state_lock:
+        previous = _read_manifest() if RUN_RESUME and resume else None
+        if _resumable(previous):
+            _state = previous
+            _state["status"] = "running"
+            _state["attempt"] = _state.get("attempt", 1) + 1
+            done = sum(1 for unit in _state["units"].values() if unit["status"] == "success")
+            print(f"[run] resuming run {_state['run_id']} (attempt {_state['attempt']}), {done} units already done")
+        else:
+            _state = {
+                "run_id": uuid.uuid4().hex,
+                "started_at": datetime.now(),
+                "attempt": 1,
+                "status": "running",
+                "units": {}
+            }
+            print(f"[run] starting run {_state['run_id']}")
+        _save()
+        return _state["run_id"]
+
+def current_run_id() -> str:
+    return _state["run_id"] if _state is not None else None
+
+def is_done(unit: str) -> bool:
+    """
+    True if the unit succeeded in an earlier attempt of the current run.
+    Always False outside a run started with start_run. Callers re-run a done unit anyway when its source
+    has rows past its watermark (the pipelines' has_new_rows probes).
+    """
+    with _state_lock:
+        return _state is not None and _state["units"].get(unit, {}).get("status") == "success"
+
+def mark_unit(unit: str, status: str):
+    """
+    Records a unit's status ('success', 'failed' or 'skipped') in the manifest.
+    """
+    with _state_lock:
+        if _state is None:
+            return
+        _state["units"][unit] = {"status": status, "finished_at": datetime.now()}
+        _save()
+
+def failed_units() -> list:
+    """
+    Units of the current run that failed (not those skipped because something upstream failed).
+    """
+    with _state_lock:
+        if _state is None:
+            return []
+        return [unit for unit, info in _state["units"].items() if info["status"] == "failed"]
+
+def finish_run(completed: bool) -> str:
+    """
+    Marks the run successful if it completed and every unit succeeded, so the next run starts fresh.
+    """
+    with _state_lock:
+        if _state is None:
+            return None
+        all_done = all(unit["status"] == "success" for unit in _state["units"].values())
+        _state["status"] = "success" if completed and all_done else "failed"
+        _state["finished_at"] = datetime.now()
+        _save()
+        print(f"[run] run {_state['run_id']} {_state['status']}")
+        return _state["status"]
@@ -0,0 +1,94 @@
+import importlib.util
+import os
+import re
+import pandas as pd
+
+# Table DDL the pipeline reads from, relative to the repository root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DDL_PATHS = {
+    'source': os.path.join(ROOT_DIR, 'source_data', 'init.sql'),
+    'staging': os.path.join(ROOT_DIR, 'staging_data', 'init.sql')
+}
+
+# Set EXTRACT_DTYPES=0 to keep the dtypes pd.read_sql infers
+EXTRACT_DTYPES = os.getenv('EXTRACT_DTYPES', '1') == '1'
+
+# Low-cardinality text columns, read as categoricals
+CATEGORICAL_COLUMNS = {'payment_method', 'order_status', 'role', 'category', 'reason', 'store_branch', 'in_stock'}
+
+# Looked up without importing pyarrow, which pandas loads only when a column uses it
+STRING_DTYPE = 'string[pyarrow]' if importlib.util.find_spec('pyarrow') is not None else 'string'
+
+# Postgres type -> pandas dtype; types not listed (numeric, dates, timestamps) keep the inferred dtype
+SQL_DTYPES = {
+    'int2': 'Int16',
+    'smallint': 'Int16',
+    'int4': 'Int32',
+    'integer': 'Int32',
+    'int': 'Int32',
+    'int8': 'Int64',
+    'bigint': 'Int64',
+    'varchar': STRING_DTYPE,
+    'text': STRING_DTYPE,
+    'bool': 'boolean',
+    'boolean': 'boolean'
+}
+
+_CREATE_TABLE = re.compile(r'CREATE TABLE\s+(?:\w+\.)?"?(\w+)"?\s*\((.*?)\n\);', re.IGNORECASE | re.DOTALL)
+_PRIMARY_KEY = re.compile(r'PRIMARY KEY\s*\(([^)]*)\)', re.IGNORECASE)
+
+_schemas = {}
+
+def parse_ddl(path: str) -> dict:
+    """
+    Reads the CREATE TABLE statements of a DDL file into {table: {'columns': {column: type}, 'primary_key': [columns]}}.
+    """
+    with open(path, 'r') as file:
+        ddl = file.read()
+
+    tables = {}
+    for table_name, body in _CREATE_TABLE.findall(ddl):
+        columns = {}
+        primary_key = []
+        for line in body.split('\n'):
+            line = line.strip().rstrip(',')
+            if not line:
+                continue
+            if line.upper().startswith('CONSTRAINT'):
+                match = _PRIMARY_KEY.search(line)
+                if match:
+                    primary_key = [col.strip().strip('"') for col in match.group(1).split(',')]
+                continue
+            parts = line.split()
+            columns[parts[0].strip('"')] = re.split(r'[\s(]', parts[1].lower())[0]
+        tables[table_name] = {'columns': columns, 'primary_key': primary_key}
+    return tables
+
+def get_schema(db_type: str) -> dict:
+    if db_type not in _schemas:
+        _schemas[db_type] = parse_ddl(DDL_PATHS[db_type])
+    return _schemas[db_type]
+
+def get_dtypes(db_type: str, table_name: str) -> dict:
+    """
+    Compact pandas dtypes for a table's columns: nullable ints sized from the DDL, categoricals, Arrow-backed strings.
+    """
+    table = get_schema(db_type).get(table_name)
+    if table is None:
+        return {}
+    dtypes = {}
+    for column, sql_type in table['columns'].items():
+        if column in CATEGORICAL_COLUMNS:
+            dtypes[column] = 'category'
+        elif sql_type in SQL_DTYPES:
+            dtypes[column] = SQL_DTYPES[sql_type]
+    return dtypes
+
+def apply_dtypes(data: pd.DataFrame, db_type: str, table_name: str) -> pd.DataFrame:
+    """
+    Casts an extracted frame to its table's compact dtypes (columns missing from the frame are ignored).
+    """
+    if not EXTRACT_DTYPES or data is None:
+        return data
+    dtypes = {column: dtype for column, dtype in get_dtypes(db_type, table_name).items() if column in data.columns}
+    return data.astype(dtypes) if dtypes else data
@@ -0,0 +1,18 @@
+import os
+import pandas as pd
+
+# Rows per chunk for streaming extraction; 0 keeps the single pd.read_sql path.
+# Override per table with EXTRACT_CHUNKSIZE_<TABLE_NAME>.
+EXTRACT_CHUNKSIZE = int(os.getenv('EXTRACT_CHUNKSIZE', '0'))
+
+def get_chunksize(table_name: str) -> int:
+    return int(os.getenv(f'EXTRACT_CHUNKSIZE_{table_name.upper()}', EXTRACT_CHUNKSIZE))
+
+def read_sql_chunks(engine, query, params, chunksize: int):
+    """
+    Yields DataFrame chunks from a server-side cursor, so only one chunk is held in memory.
+    """
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=chunksize)
+        for chunk in pd.read_sql(sql=query, con=conn, params=params, chunksize=chunksize):
+            yield chunk
@@ -0,0 +1,49 @@
+import pandas as pd
+
+# Surrogate key of the "unknown member" row used by the 'unknown' policy
+UNKNOWN_MEMBER_KEY = -1
+
+# What to do with a fact row whose natural key has no dimension member:
+#   null    -> keep the row with a null surrogate key
+#   unknown -> keep the row and point it at UNKNOWN_MEMBER_KEY
+#   reject  -> drop the row from the output and return it in the reject set
+MISSING_KEY_POLICIES = ('null', 'unknown', 'reject')
+
+def build_key_lookup(dim: pd.DataFrame, nk_col: str, sk_col: str) -> pd.Series:
+    """
+    Builds a hash-indexed natural key -> surrogate key lookup from a dimension DataFrame.
+    """
+    dim = dim[[nk_col, sk_col]].dropna(subset=[nk_col]).drop_duplicates(subset=[nk_col], keep='last')
+    return dim.set_index(nk_col)[sk_col]
+
+def resolve_surrogate_key(data: pd.DataFrame, nk_col: str, lookup, sk_col: str, on_missing: str = 'null', unknown_key=UNKNOWN_MEMBER_KEY):
+    """
+    Adds sk_col to data by mapping nk_col through lookup (a Series indexed by natural key, or a dict).
+    Null natural keys stay null; non-null keys without a member follow the on_missing policy.
+    Returns (data, rejected), where rejected holds the rows dropped by the 'reject' policy.
+    """
+    if on_missing not in MISSING_KEY_POLICIES:
+        raise ValueError(f"Unknown missing key policy: {on_missing}")
+
+    if isinstance(lookup, dict):
+        lookup = pd.Series(lookup, dtype=object if not lookup else None)
+
+    data = data.copy()
+    keys = data[nk_col].map(lookup)
+    missing = keys.isna() & data[nk_col].notna()
+
+    rejected = data.iloc[0:0]
+    if missing.any():
+        if on_missing == 'unknown':
+            keys = keys.where(~missing, unknown_key)
+        elif on_missing == 'reject':
+            rejected = data[missing]
+            data = data[~missing]
+            keys = keys[~missing]
+
+    # Keep integer surrogate keys integer, using the nullable dtype when nulls remain
+    if lookup.dtype.kind in 'iu':
+        keys = keys.astype(lookup.dtype if keys.notna().all() else 'Int64')
+
+    data[sk_col] = keys
+    return data, rejected
@@ -0,0 +1,56 @@
+import threading
+import pandas as pd
+import sqlalchemy
+from src.utils.helper import get_db_connection, read_sql
+
+# etl_date used when a table has never been loaded (initial load)
+INITIAL_ETL_DATE = '1111-01-01'
+
+# In-memory high-water marks keyed by (step, component, status, table_name)
+_watermarks = None
+_load_lock = threading.Lock()
+
+def _fetch_watermarks() -> dict:
+    """
+    Reads every high-water mark from the log database in one grouped query.
+    """
+    conn = get_db_connection('log')
+    try:
+        df = pd.read_sql(sql=sqlalchemy.text(read_sql("watermark")), con=conn)
+    except Exception as e:
+        # Log databases created before etl_watermark existed: group the raw log instead
+        print(f"Can't read etl_watermark, falling back to etl_log. Cause: {str(e)}")
+        df = pd.read_sql(sql=sqlalchemy.text(read_sql("watermark_etl_log")), con=conn)
+
+    watermarks = {}
+    for step, component, status, table_name, etl_date in df.itertuples(index=False, name=None):
+        watermarks[(step, component, status, table_name)] = etl_date
+    return watermarks
+
+def refresh_watermarks():
+    """
+    Reloads the watermark cache from the log database.
+    If the log database can't be read, the previous cache is kept; with no previous cache the error is raised,
+    since an empty cache would make every table reload from INITIAL_ETL_DATE.
+    """
+    global _watermarks
+    try:
+        _watermarks = _fetch_watermarks()
+    except Exception as e:
+        if _watermarks is None:
+            raise
+        print(f"Can't refresh watermarks, keeping the previous ones. Cause: {str(e)}")
+
+def get_watermark(step: str, table_name: str, component: str = 'load', status: str = 'success'):
+    """
+    Returns the latest etl_date for a table, or INITIAL_ETL_DATE if it was never processed.
+    """
+    if _watermarks is None:
+        with _load_lock:
+            if _watermarks is None:
+                refresh_watermarks()
+
+    etl_date = _watermarks.get((step, component, status, table_name.lower()))
+    if etl_date is None or pd.isnull(etl_date):
+        return INITIAL_ETL_DATE
+    return etl_date
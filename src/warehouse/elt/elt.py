@@ -0,0 +1,154 @@
+import os
+import re
+import threading
+import sqlalchemy
+from datetime import datetime
+from src.utils.helper import get_db_connection, etl_log, read_sql
+from src.utils.watermark import get_watermark
+from src.utils.metrics import start_stage, finish_stage
+from src.utils.key_cache import DIMENSION_KEYS, update_key_cache
+from src.utils.loader import check_partitioned_mode
+
+# Default transform engine: 'pandas' (extract, transform and load through Python) or
+# 'sql' (src/models/elt/<table>.sql runs inside the warehouse as INSERT ... SELECT ... ON CONFLICT).
+# Override per table with TRANSFORM_ENGINE_<TABLE_NAME>.
+TRANSFORM_ENGINE = os.getenv('TRANSFORM_ENGINE', 'pandas')
+
+TRANSFORM_ENGINES = ('pandas', 'sql')
+
+# Schema in the warehouse database where the staging tables are visible
+ELT_STAGING_SCHEMA = os.getenv('ELT_STAGING_SCHEMA', 'staging')
+
+# Set ELT_USE_FDW=0 when staging and warehouse share a database and ELT_STAGING_SCHEMA holds the staging tables
+ELT_USE_FDW = os.getenv('ELT_USE_FDW', '1') == '1'
+
+_fdw_ready = False
+_fdw_lock = threading.Lock()
+
+def get_transform_engine(table_name: str) -> str:
+    engine = os.getenv(f'TRANSFORM_ENGINE_{table_name.upper()}', TRANSFORM_ENGINE).lower()
+    if engine not in TRANSFORM_ENGINES:
+        raise ValueError(f"Unknown transform engine for {table_name}: {engine}")
+    return engine
+
+def _staging_schema() -> str:
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', ELT_STAGING_SCHEMA):
+        raise ValueError(f"Invalid ELT_STAGING_SCHEMA: {ELT_STAGING_SCHEMA}")
+    return ELT_STAGING_SCHEMA
+
+def _literal(value) -> str:
+    # CREATE SERVER and USER MAPPING options can't be bound as parameters
+    return str(value or '').replace("'", "''")
+
+def setup_staging_fdw():
+    """
+    Makes the staging tables visible in the warehouse through postgres_fdw (once per process).
+    The foreign tables are imported only into an empty schema; drop it to re-import after staging DDL changes.
+    ELT_STAGING_HOST and ELT_STAGING_PORT default to the STG_POSTGRES_* settings; inside docker-compose
+    they must be the address the warehouse server uses (staging_db, 5432).
+    """
+    global _fdw_ready
+    if _fdw_ready or not ELT_USE_FDW:
+        return
+    with _fdw_lock:
+        if _fdw_ready:
+            return
+        schema = _staging_schema()
+        setup_sql = read_sql("elt/setup_fdw").format(
+            host=_literal(os.getenv('ELT_STAGING_HOST', os.getenv('STG_POSTGRES_HOST'))),
+            port=_literal(os.getenv('ELT_STAGING_PORT', os.getenv('STG_POSTGRES_PORT'))),
+            dbname=_literal(os.getenv('STG_POSTGRES_DB')),
+            user=_literal(os.getenv('STG_POSTGRES_USER')),
+            password=_literal(os.getenv('STG_POSTGRES_PASSWORD')),
+            staging_schema=schema
+        )
+        with get_db_connection('warehouse').begin() as conn:
+            # Sent as-is: the options are literals, so a ':' or '%' in them isn't a parameter
+            conn.exec_driver_sql(setup_sql)
+            tables = conn.execute(
+                sqlalchemy.text("SELECT count(*) FROM information_schema.tables WHERE table_schema = :schema"),
+                {"schema": schema}
+            ).scalar()
+            if not tables:
+                conn.exec_driver_sql(read_sql("elt/import_staging").format(staging_schema=schema))
+        _fdw_ready = True
+
+def elt_select(target_table: str):
+    """
+    Returns the SELECT that produces target_table's rows from staging, bound to :etl_date.
+    """
+    return sqlalchemy.text(read_sql(f"elt/{target_table}").replace('{staging_schema}', _staging_schema()))
+
+def _upsert_statement(select_sql: str, columns: list, target_table: str, idx_name: str, return_keys: bool = False):
+    """
+    Upserts the template's rows in one statement and returns (rows produced by the template, rows written,
+    natural keys written or NULL unless return_keys).
+    """
+    column_list = ", ".join(columns)
+    update_cols = [col for col in columns if col != idx_name]
+    # Unchanged rows are left alone instead of being rewritten
+    changed = f"({', '.join(f'{target_table}.{col}' for col in update_cols)}) IS DISTINCT FROM ({', '.join(f'EXCLUDED.{col}' for col in update_cols)})"
+    return sqlalchemy.text(
+        f"WITH elt AS MATERIALIZED ({select_sql}), "
+        f"written AS ("
+        f"INSERT INTO public.{target_table} ({column_list}) "
+        f"SELECT {column_list} FROM elt "
+        f"ON CONFLICT ({idx_name}) DO UPDATE SET "
+        + ", ".join(f"{col} = EXCLUDED.{col}" for col in update_cols)
+        + f" WHERE {changed} RETURNING {idx_name}) "
+        f"SELECT (SELECT count(*) FROM elt), (SELECT count(*) FROM written), "
+        + (f"(SELECT array_agg({idx_name}) FROM written)" if return_keys else "NULL")
+    )
+
+def elt_table(staging_table: str, target_table: str, idx_name: str):
+    """
+    Transforms and loads one warehouse table inside the warehouse database, without the rows passing through Python.
+    Rows filtered out by the template (bad roles, unknown keys) count as rejected.
+    """
+    stage = start_stage("warehouse", "load", target_table)
+    try:
+        # The upsert conflicts on idx_name, which a day-partitioned fact table has no unique key on
+        check_partitioned_mode(get_db_connection('warehouse'), 'public', target_table, 'sql')
+        setup_staging_fdw()
+        etl_date = get_watermark(step="warehouse", table_name=target_table, component="load", status="success")
+        select = elt_select(target_table)
+
+        with get_db_connection('warehouse').begin() as conn:
+            # Column names of the template's result, without reading any rows
+            columns = list(conn.execute(sqlalchemy.text(f"SELECT * FROM ({select.text}) elt LIMIT 0"), {"etl_date": etl_date}).keys())
+            stage["rows_in"] = conn.execute(
+                sqlalchemy.text(f"SELECT count(*) FROM {_staging_schema()}.{staging_table} WHERE created_at > :etl_date"),
+                {"etl_date": etl_date}
+            ).scalar()
+            # Dimensions return their written keys for the surrogate key cache
+            upsert = _upsert_statement(select.text, columns, target_table, idx_name, return_keys=target_table in DIMENSION_KEYS)
+            produced, written, keys = conn.execute(upsert, {"etl_date": etl_date}).one()
+            stage["rows_out"] = written
+            stage["rows_rejected"] = stage["rows_in"] - produced
+
+        # Keep the surrogate key cache in step with the dimension, as load_warehouse does
+        try:
+            update_key_cache(target_table, keys or [])
+        except Exception as e:
+            print(f"Can't update key cache for {target_table}. Cause: {str(e)}")
+
+        log_msg = {
+            "step": "warehouse",
+            "component": "load",
+            "status": "success",
+            "table_name": target_table,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        return True
+    except Exception as e:
+        log_msg = {
+            "step": "warehouse",
+            "component": "load",
+            "status": "failed",
+            "table_name": target_table,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "error_msg": str(e)
+        }
+        print(e)
+    finally:
+        etl_log(finish_stage(stage, log_msg))
@@ -1,35 +1,61 @@
 import pandas as pd
+import sqlalchemy
 from datetime import datetime
-from src.utils.helper import get_db_connection, read_etl_log, etl_log
+from src.utils.helper import get_db_connection, etl_log
+from src.utils.watermark import get_watermark
+from src.utils.streaming import read_sql_chunks
+from src.utils.metrics import start_stage, finish_stage, frame_bytes
+from src.utils.schema import apply_dtypes
+from src.utils.checkpoint import read_checkpoint_meta, load_checkpoint
 
-def extract_staging(table_name: str, schema_name: str):
+def _staging_checkpoint(table_name: str, etl_date) -> pd.DataFrame:
+    """
+    Returns the rows the last staging load wrote, if they are exactly the rows created after etl_date:
+    the warehouse had caught up with staging before that load, and hasn't loaded since.
+    """
+    meta = read_checkpoint_meta("staging", table_name)
+    if meta is None:
+        return None
+    if pd.Timestamp(meta["previous_watermark"]) <= pd.Timestamp(etl_date) < pd.Timestamp(meta["loaded_at"]):
+        return load_checkpoint("staging", table_name)
+    return None
+
+def has_new_rows(table_name: str, schema_name: str, target_table: str = None) -> bool:
+    """
+    Cheap freshness probe: True if the staging table has rows created since target_table's warehouse watermark.
+    """
+    etl_date = get_watermark(step="warehouse", table_name=target_table or table_name, component="load", status="success")
+    query = sqlalchemy.text(f"SELECT EXISTS (SELECT 1 FROM {schema_name}.{table_name} WHERE created_at > :etl_date)")
+    with get_db_connection('staging').connect() as conn:
+        return bool(conn.execute(query, {"etl_date": etl_date}).scalar())
+
+def extract_staging(table_name: str, schema_name: str, target_table: str = None):
     """
     This function is used to extract data from the staging database. 
+    The watermark is the last successful load of target_table (the warehouse table fed by table_name).
     """    
+    stage = start_stage("warehouse", "extraction", table_name)
     try:
         # create connection to database staging
         conn = get_db_connection('staging')
 
         # Get date from previous process
-        filter_log = {"step": "warehouse",
-                    "table_name": table_name,
-                    "status": "success",
-                    "component": "load"}
-        etl_date = read_etl_log(filter_log)
-
-        # If no previous extraction has been recorded (etl_date is empty), set etl_date to '1111-01-01' indicating the initial load.
-        # Otherwise, retrieve data added since the last successful extraction (etl_date).
-        if etl_date.empty or etl_date['max'][0] is None:
-            etl_date = '1111-01-01'
-        else:
-            etl_date = etl_date['max'][0]
-            # etl_date = etl_date.strftime("%Y-%m-%d")
+        # If no previous load has been recorded, this is '1111-01-01' indicating the initial load.
+        # Otherwise, retrieve data added since the last successful load.
+        etl_date = get_watermark(step="warehouse", table_name=target_table or table_name, component="load", status="success")
 
         # Constructs a SQL query to select all columns from the specified table_name where created_at is greater than etl_date.
-        query = f"SELECT * FROM {schema_name}.{table_name} WHERE created_at > %s::timestamp"
+        query = sqlalchemy.text(f"SELECT * FROM {schema_name}.{table_name} WHERE created_at > :etl_date")
+
+        # Use the staging load's checkpoint when it holds the same rows, otherwise execute the query with pd.read_sql
+        df = _staging_checkpoint(table_name, etl_date)
+        if df is None:
+            df = pd.read_sql(sql=query, con=conn, params={"etl_date": etl_date})
 
-        # Execute the query with pd.read_sql
-        df = pd.read_sql(sql=query, con=conn, params=(etl_date,))
+        # Compact dtypes from staging_data/init.sql: categoricals, nullable int4, Arrow-backed strings
+        df = apply_dtypes(df, 'staging', table_name)
+        stage["rows_out"] = len(df)
+        stage["bytes_read"] = frame_bytes(df)
         log_msg = {
                 "step" : "warehouse",
                 "component":"extraction",
@@ -52,4 +78,42 @@ def extract_staging(table_name: str, schema_name: str):
         print(e)
     finally:
         # Save the log message
-        etl_log(log_msg)
\ No newline at end of file
+        etl_log(finish_stage(stage, log_msg))
+
+def stream_staging(table_name: str, schema_name: str, chunksize: int, target_table: str = None):
+    """
+    This function extracts data from the staging database as a stream of DataFrame chunks.
+    The watermark is the last successful load of target_table, as in extract_staging.
+    """
+    stage = start_stage("warehouse", "extraction", table_name)
+    stage["rows_out"] = 0
+    stage["bytes_read"] = 0
+    try:
+        # Get date from previous process
+        etl_date = get_watermark(step="warehouse", table_name=target_table or table_name, component="load", status="success")
+        query = sqlalchemy.text(f"SELECT * FROM {schema_name}.{table_name} WHERE created_at > :etl_date")
+
+        for chunk in read_sql_chunks(get_db_connection('staging'), query, {"etl_date": etl_date}, chunksize):
+            chunk = apply_dtypes(chunk, 'staging', table_name)
+            stage["rows_out"] += len(chunk)
+            stage["bytes_read"] += frame_bytes(chunk)
+            yield chunk
+
+        etl_log(finish_stage(stage, {
+            "step" : "warehouse",
+            "component":"extraction",
+            "status": "success",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Current timestamp
+        }))
+    except Exception as e:
+        etl_log(finish_stage(stage, {
+            "step" : "warehouse",
+            "component":"extraction",
+            "status": "failed",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),  # Current timestamp
+            "error_msg": str(e)
+        }))
+        print(e)
+        raise
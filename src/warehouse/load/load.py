@@ -1,9 +1,12 @@
 import pandas as pd
 from src.utils.helper import get_db_connection, etl_log, handle_error
+from src.utils.key_cache import update_key_cache
 from datetime import datetime
-from pangres import upsert
+from src.utils.row_hash import write_changed_rows
+from src.utils.metrics import start_stage, finish_stage
 
-def load_warehouse(data, schema: str, table_name: str, idx_name: str, source: str):
+def load_warehouse(data, schema: str, table_name: str, idx_name: str, source: str, mode: str = None):
+    stage = start_stage("warehouse", "load", table_name, rows_in=len(data) if data is not None else None)
     try:
         # create connection to database
         conn = get_db_connection('warehouse')
@@ -11,12 +14,15 @@ def load_warehouse(data, schema: str, table_name: str, idx_name: str, source: st
         # set data index or primary key
         data = data.set_index(idx_name)
 
-        # Do upsert (Update for existing data and Insert for new data)
-        upsert(con=conn, 
-               df=data, 
-               table_name=table_name, 
-               schema=schema, 
-               if_row_exists="update")
+        # Write the new or changed rows with the table's load mode: pangres upsert, or COPY into a temp table and merge
+        data = write_changed_rows(conn, data, schema, table_name, "warehouse", mode)
+        stage["rows_out"] = len(data)
+
+        # Keep the surrogate key cache in step with the dimension
+        try:
+            update_key_cache(table_name, data.index)
+        except Exception as e:
+            print(f"Can't update key cache for {table_name}. Cause: {str(e)}")
         
         #create success log message        
         log_msg = {
@@ -27,7 +33,7 @@ def load_warehouse(data, schema: str, table_name: str, idx_name: str, source: st
             "table_name": table_name,
             "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
-        # return data
+        return True
                 
     except Exception as e:
 
@@ -50,4 +56,58 @@ def load_warehouse(data, schema: str, table_name: str, idx_name: str, source: st
             print(e)
 
     finally:
-        etl_log(log_msg)
+        etl_log(finish_stage(stage, log_msg))
+
+def load_warehouse_stream(chunks, transform, schema: str, table_name: str, idx_name: str, source: str, mode: str = None):
+    """
+    Transforms and loads a stream of staging chunks one at a time.
+    Success is logged (advancing the watermark) only after the last chunk has been written.
+    """
+    stage = start_stage("warehouse", "load", table_name, rows_in=0)
+    stage["rows_out"] = 0
+    data = None
+    try:
+        conn = get_db_connection('warehouse')
+        for chunk in chunks:
+            # Counted before the transform, so rows it rejects or deduplicates still count as read
+            stage["rows_in"] += len(chunk)
+            data = transform(chunk)
+            if data is None:
+                raise ValueError(f"Transformation failed for a chunk of {table_name}")
+            data = data.set_index(idx_name)
+            data = write_changed_rows(conn, data, schema, table_name, "warehouse", mode)
+            stage["rows_out"] += len(data)
+
+            try:
+                update_key_cache(table_name, data.index)
+            except Exception as e:
+                print(f"Can't update key cache for {table_name}. Cause: {str(e)}")
+
+        log_msg = {
+            "step": "warehouse",
+            "component": "load",
+            "status": "success",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        return True
+    except Exception as e:
+        log_msg = {
+            "step": "warehouse",
+            "component": "load",
+            "status": "failed",
+            "table_name": table_name,
+            "etl_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "error_msg": str(e)
+        }
+        print(e)
+
+        # Handling error: save the failing chunk to Object Storage
+        if data is not None:
+            try:
+                handle_error(data = data, bucket_name='error-paccafe', table_name= table_name, step='warehouse', component='load')
+            except Exception as e:
+                print(e)
+
+    finally:
+        etl_log(finish_stage(stage, log_msg))
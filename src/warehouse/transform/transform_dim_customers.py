@@ -1,11 +1,13 @@
 import pandas as pd
 from src.utils.helper import etl_log, handle_error
+from src.utils.metrics import start_stage, finish_stage
 from datetime import datetime
 
 def transform_dim_customers(data: pd.DataFrame) -> pd.DataFrame:
     """
     Transform the customer data from staging to the warehouse schema (dim_customers).
     """
+    stage = start_stage("warehouse", "transformation", "dim_customers", rows_in=len(data) if data is not None else None)
     try:
         # Map staging fields to warehouse fields
         data = data.rename(columns={
@@ -21,6 +23,8 @@ def transform_dim_customers(data: pd.DataFrame) -> pd.DataFrame:
         # Drop any duplicate records if any
         data = data.drop_duplicates(subset=['nk_customer_id'])
 
+        stage["rows_out"] = len(data)
+
         # Log success
         log_msg = {
             "step": "warehouse",
@@ -46,4 +50,4 @@ def transform_dim_customers(data: pd.DataFrame) -> pd.DataFrame:
         handle_error(data, bucket_name='error-paccafe', table_name='dim_customers', step='warehouse', component='transformation')
     finally:
         # Save log
-        etl_log(log_msg)
+        etl_log(finish_stage(stage, log_msg))
@@ -1,14 +1,18 @@
 import pandas as pd
 from src.utils.helper import etl_log, handle_error
+from src.utils.metrics import start_stage, finish_stage
 from datetime import datetime
 
 def transform_dim_employees(data: pd.DataFrame) -> pd.DataFrame:
     """
     This function transforms employee data, filtering out rows with inconsistent roles.
     """
+    stage = start_stage("warehouse", "transformation", "dim_employees", rows_in=len(data) if data is not None else None)
     try:
         # Filter out inconsistent roles
-        data = data[~data['role'].isin(['today', 'third', 'me'])]
+        valid_role = ~data['role'].isin(['today', 'third', 'me'])
+        stage["rows_rejected"] = int((~valid_role).sum())
+        data = data[valid_role]
 
         # Rename columns to match the warehouse schema
         data = data.rename(columns={
@@ -27,6 +31,8 @@ def transform_dim_employees(data: pd.DataFrame) -> pd.DataFrame:
         # Drop rows where the role or other important fields are missing
         data = data.dropna(subset=['role', 'first_name', 'last_name'])
 
+        stage["rows_out"] = len(data)
+
         log_msg = {
             "step": "warehouse",
             "component": "transformation",
@@ -52,4 +58,4 @@ def transform_dim_employees(data: pd.DataFrame) -> pd.DataFrame:
         handle_error(data, bucket_name='error-paccafe', table_name='dim_employees', step='warehouse', component='transformation')
 
     finally:
-        etl_log(log_msg)
+        etl_log(finish_stage(stage, log_msg))
@@ -1,13 +1,32 @@
 import pandas as pd
+import numpy as np
 from src.utils.helper import etl_log, handle_error
+from src.utils.metrics import start_stage, finish_stage
+from src.utils.surrogate_key import resolve_surrogate_key
+from src.utils.key_cache import get_key_lookup
 from datetime import datetime
 import re
 
-def transform_dim_products(data: pd.DataFrame, df_store_branch_tf: pd.DataFrame) -> pd.DataFrame:
+# Anything that isn't a digit or decimal point: currency symbols, minus signs, spaces
+PRICE_JUNK_PATTERN = re.compile(r'[^\d.]')
+
+def clean_price(prices: pd.Series) -> pd.Series:
+    """
+    Parses price strings like '$-47.00' into non-negative floats.
+    Each distinct value is cleaned once and mapped back, since product feeds repeat prices heavily.
+    """
+    codes, uniques = pd.factorize(prices)
+    cleaned = pd.to_numeric(pd.Series(uniques, dtype='string').str.replace(PRICE_JUNK_PATTERN, '', regex=True), errors='coerce')
+    # Missing prices have code -1, which picks the trailing NaN
+    values = np.append(cleaned.to_numpy(dtype='float64', na_value=np.nan), np.nan)[codes]
+    return pd.Series(values, index=prices.index, name=prices.name)
+
+def transform_dim_products(data: pd.DataFrame) -> pd.DataFrame:
     """
     This function is used to transform product data from staging to the data warehouse.
     Handles negative values in `unit_price` and `cost_price` by converting them to absolute values.
     """
+    stage = start_stage("warehouse", "transformation", "dim_products", rows_in=len(data) if data is not None else None)
     try:
         # Rename columns to match the warehouse schema
         data = data.rename(columns={
@@ -24,21 +43,19 @@ def transform_dim_products(data: pd.DataFrame, df_store_branch_tf: pd.DataFrame)
         # Drop duplicate nk_product_id if any
         data = data.drop_duplicates(subset="nk_product_id")        
 
-        # Extract data from dim_store_branch
-        data['sk_store_branch'] = data["store_name"].apply(lambda x: df_store_branch_tf.loc[df_store_branch_tf['store_name'] == x, 'sk_store_id'].values[0])
-
-        # Convert price columns to numeric
-        data['unit_price'] = pd.to_numeric(data['unit_price'].apply(lambda x: re.sub(r'\D', '', str(x))), errors='coerce')
-        data['cost_price'] = pd.to_numeric(data['cost_price'].apply(lambda x: re.sub(r'\D', '', str(x))), errors='coerce')        
+        # Look up the store surrogate key from the dim_store_branch key cache
+        data, _ = resolve_surrogate_key(data, 'store_name', get_key_lookup('dim_store_branch', data['store_name']), 'sk_store_branch', on_missing='null')
 
-        # Ensure no negative values in the price fields
-        data['unit_price'] = data['unit_price'].apply(lambda x: re.sub(r'\s*-', '', str(x)))
-        data['cost_price'] = data['cost_price'].apply(lambda x: re.sub(r'\s*-', '', str(x)))
+        # Convert price columns to numeric, dropping currency symbols and minus signs (absolute values)
+        data['unit_price'] = clean_price(data['unit_price'])
+        data['cost_price'] = clean_price(data['cost_price'])
 
         # Drop unnecessary columns and handle nulls
-        data = data.drop(columns=['nk_store_id', 'store_name'])
+        data = data.drop(columns=['nk_store_id', 'store_name'], errors='ignore')
         data = data.dropna(subset=['nk_product_id'])
 
+        stage["rows_out"] = len(data)
+
         log_msg = {
             "step": "warehouse",
             "component": "transformation",
@@ -64,4 +81,4 @@ def transform_dim_products(data: pd.DataFrame, df_store_branch_tf: pd.DataFrame)
         handle_error(data, bucket_name='error-paccafe', table_name='dim_products', step='warehouse', component='transformation')
 
     finally:
-        etl_log(log_msg)
+        etl_log(finish_stage(stage, log_msg))
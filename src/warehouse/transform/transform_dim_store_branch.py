@@ -1,11 +1,13 @@
 import pandas as pd
 from src.utils.helper import etl_log, handle_error
+from src.utils.metrics import start_stage, finish_stage
 from datetime import datetime
 
 def transform_dim_store_branch(data: pd.DataFrame) -> pd.DataFrame:
     """
     Transform store branch data from staging to the warehouse schema (dim_store_branch).
     """
+    stage = start_stage("warehouse", "transformation", "dim_store_branch", rows_in=len(data) if data is not None else None)
     try:
         data = data.rename(columns={
             'store_id': 'nk_store_id',
@@ -16,6 +18,8 @@ def transform_dim_store_branch(data: pd.DataFrame) -> pd.DataFrame:
         # Drop duplicates based on nk_store_id
         data = data.drop_duplicates(subset=['nk_store_id'])
 
+        stage["rows_out"] = len(data)
+
         # Log success
         log_msg = {
             "step": "warehouse",
@@ -39,4 +43,4 @@ def transform_dim_store_branch(data: pd.DataFrame) -> pd.DataFrame:
         print(e)
         handle_error(data, bucket_name='error-paccafe', table_name='dim_store_branch', step='warehouse', component='transformation')
     finally:
-        etl_log(log_msg)
+        etl_log(finish_stage(stage, log_msg))
@@ -1,11 +1,15 @@
 import pandas as pd
 from src.utils.helper import etl_log, handle_error
+from src.utils.metrics import start_stage, finish_stage
+from src.utils.surrogate_key import resolve_surrogate_key
+from src.utils.key_cache import get_key_lookup
 from datetime import datetime
 
-def transform_fct_inventory(data: pd.DataFrame, df_products_tf: pd.DataFrame) -> pd.DataFrame:
+def transform_fct_inventory(data: pd.DataFrame) -> pd.DataFrame:
     """
     This function transforms inventory data from staging into the fct_inventory table in the warehouse.
     """
+    stage = start_stage("warehouse", "transformation", "fct_inventory", rows_in=len(data) if data is not None else None)
     try:
         # Rename columns
         data = data.rename(columns={
@@ -17,15 +21,27 @@ def transform_fct_inventory(data: pd.DataFrame, df_products_tf: pd.DataFrame) ->
             'created_at': 'created_at'
         })
 
-        # Merge with products to get product keys
-        data['nk_product_id'] = data["nk_product_id"].apply(lambda x: df_products_tf.loc[df_products_tf['nk_product_id'] == x, 'sk_product_id'].values[0])
+        # Merge with products to get product keys (rows with an unknown product go to the reject set)
+        data, rejected = resolve_surrogate_key(
+            data, 'nk_product_id', get_key_lookup('dim_products', data['nk_product_id']),
+            'nk_product_id', on_missing='reject'
+        )
+        stage["rows_rejected"] = len(rejected)
+        if not rejected.empty:
+            print(f"fct_inventory: {len(rejected)} rows rejected, unknown nk_product_id")
+            try:
+                handle_error(rejected, bucket_name='error-paccafe', table_name='fct_inventory', step='warehouse', component='reject')
+            except Exception as e:
+                print(e)
 
-        # Convert change_date to integer (timestamp in DWH)
-        data['change_date'] = pd.to_datetime(data['change_date']).astype(int) / 10**9  # Convert to Unix timestamp (int)
+        # Convert change_date to integer (timestamp in DWH); pinned to ns, pandas may infer another resolution
+        data['change_date'] = pd.to_datetime(data['change_date']).astype('datetime64[ns]').astype(int) / 10**9  # Convert to Unix timestamp (int)
 
         # Drop duplicates based on nk_tracking_id
         data = data.drop_duplicates(subset=['nk_tracking_id'])
 
+        stage["rows_out"] = len(data)
+
         # Log success
         log_msg = {
             "step": "warehouse",
@@ -50,4 +66,4 @@ def transform_fct_inventory(data: pd.DataFrame, df_products_tf: pd.DataFrame) ->
         print(e)
         handle_error(data, bucket_name='error-dellstore', table_name='fct_inventory', step='warehouse', component='transformation')
     finally:
-        etl_log(log_msg)
+        etl_log(finish_stage(stage, log_msg))
@@ -1,11 +1,16 @@
 import pandas as pd
 from src.utils.helper import etl_log, handle_error
+from src.utils.metrics import start_stage, finish_stage
+from src.utils.surrogate_key import resolve_surrogate_key
+from src.utils.key_cache import get_key_lookup
 from datetime import datetime
 
-def transform_fct_order(data: pd.DataFrame, df_customers_tf: pd.DataFrame, df_employees_tf: pd.DataFrame, df_order_details: pd.DataFrame) -> pd.DataFrame:
+def transform_fct_order(data: pd.DataFrame) -> pd.DataFrame:
     """
     This function transforms order data from staging into the fct_order table in the warehouse.
+    Surrogate keys come from the warehouse key cache, so older dimension members resolve too.
     """
+    stage = start_stage("warehouse", "transformation", "fct_order", rows_in=len(data) if data is not None else None)
     try:
         # Rename columns to match the warehouse schema
         data = data.rename(columns={
@@ -19,21 +24,23 @@ def transform_fct_order(data: pd.DataFrame, df_customers_tf: pd.DataFrame, df_em
             'created_at': 'created_at'
         })
 
-        # Extract data from df_employees_tf
-        data['sk_employee_id'] = data["nk_employee_id"].apply(
-            lambda x: df_employees_tf.loc[df_employees_tf['nk_employee_id'] == x, 'sk_employee_id'].values[0]
+        # Resolve surrogate keys with hash lookups instead of scanning the dimensions per row
+        # Orders without a known employee go to the reject set; unknown customers keep a null key
+        data, rejected_employees = resolve_surrogate_key(
+            data, 'nk_employee_id', get_key_lookup('dim_employees', data['nk_employee_id']),
+            'sk_employee_id', on_missing='reject'
         )
-        
-        # Extract data from df_customers_tf
-        data['sk_customer_id'] = data["nk_customer_id"].apply(
-            lambda x: df_customers_tf.loc[df_customers_tf['nk_customer_id'] == x, 'sk_customer_id'].values[0]
-            if pd.notnull(x) and any(df_customers_tf["nk_customer_id"] == x) else None
+        data, _ = resolve_surrogate_key(
+            data, 'nk_customer_id', get_key_lookup('dim_customers', data['nk_customer_id']),
+            'sk_customer_id', on_missing='null'
         )
-
-        # Merge with customers and employees to get the customer and employee keys
-        # data = data.merge(df_customers_tf[['customer_id', 'nk_customer_id']], on='customer_id', how='left')
-        # data = data.merge(df_employees_tf[['employee_id', 'nk_employee_id']], on='employee_id', how='left')
-        # data = data.merge(df_order_details[['order_id', 'nk_order_id']], on='order_id', how='left')
+        stage["rows_rejected"] = len(rejected_employees)
+        if not rejected_employees.empty:
+            print(f"fct_order: {len(rejected_employees)} rows rejected, unknown nk_employee_id")
+            try:
+                handle_error(rejected_employees, bucket_name='error-paccafe', table_name='fct_order', step='warehouse', component='reject')
+            except Exception as e:
+                print(e)
 
         # Convert order_date to integer (timestamp in DWH)
         data['order_date'] = data['order_date'].dt.strftime('%Y%m%d').astype(int)
@@ -44,6 +51,8 @@ def transform_fct_order(data: pd.DataFrame, df_customers_tf: pd.DataFrame, df_em
         # Drop unnecessary columns
         data = data.drop(columns=["nk_employee_id", "nk_customer_id"])    
 
+        stage["rows_out"] = len(data)
+
         # Log success
         log_msg = {
             "step": "warehouse",
@@ -68,4 +77,4 @@ def transform_fct_order(data: pd.DataFrame, df_customers_tf: pd.DataFrame, df_em
         print(e)
         handle_error(data, bucket_name='error-paccafe', table_name='fct_order', step='warehouse', component='transformation')
     finally:
-        etl_log(log_msg)
+        etl_log(finish_stage(stage, log_msg))
@@ -1,34 +1,121 @@
-from src.warehouse.extract.extract import extract_staging
+from src.warehouse.extract.extract import extract_staging, stream_staging, has_new_rows
 from src.warehouse.transform.transform_dim_customers import transform_dim_customers
 from src.warehouse.transform.transform_dim_employees import transform_dim_employees
 from src.warehouse.transform.transform_dim_products import transform_dim_products
 from src.warehouse.transform.transform_dim_store_branch import transform_dim_store_branch
 from src.warehouse.transform.transform_fct_order import transform_fct_order
 from src.warehouse.transform.transform_fct_inventory import transform_fct_inventory
-from src.warehouse.load.load import load_warehouse
-
-def warehouse_pipeline():
-    # Extract data from staging
-    df_store_branch = extract_staging('store_branch', 'public')
-    df_customers = extract_staging('customers', 'public')
-    df_employees = extract_staging('employees', 'public')
-    df_products = extract_staging('products', 'public')
-    df_orders = extract_staging('orders', 'public')
-    df_order_details = extract_staging('order_details', 'public')
-    df_inventory = extract_staging('inventory_tracking', 'public')
-    
-    # Transform data
-    df_store_branch_tf = transform_dim_store_branch(df_store_branch)
-    df_customers_tf = transform_dim_customers(df_customers)
-    df_employees_tf = transform_dim_employees(df_employees)
-    df_products_tf = transform_dim_products(df_products, df_store_branch_tf)
-    df_orders_tf = transform_fct_order(df_orders, df_customers_tf, df_employees_tf, df_order_details)  # merging with other data
-    df_inventory_tf = transform_fct_inventory(df_inventory, df_products_tf)  # merging with other data
-    
-    # Load data into warehouse
-    load_warehouse(df_store_branch_tf, 'public', 'dim_store_branch', 'nk_store_id', 'staging')
-    load_warehouse(df_customers_tf, 'public', 'dim_customers', 'nk_customer_id', 'staging')
-    load_warehouse(df_employees_tf, 'public', 'dim_employees', 'nk_employee_id', 'staging')
-    load_warehouse(df_products_tf, 'public', 'dim_products', 'nk_product_id', 'staging')
-    load_warehouse(df_orders_tf, 'public', 'fct_order', 'nk_order_id', 'staging')
-    load_warehouse(df_inventory_tf, 'public', 'fct_inventory', 'nk_tracking_id', 'staging')
+from src.warehouse.load.load import load_warehouse, load_warehouse_stream
+from src.warehouse.elt.elt import elt_table, get_transform_engine
+from src.utils.dag import task, run_dag
+from src.utils.streaming import get_chunksize
+from src.utils.checkpoint import save_checkpoint, read_checkpoint_meta, load_checkpoint
+from src.utils.run_state import current_run_id, is_done, mark_unit
+from src.utils.process_pool import run_transform
+
+def _checkpointed(name: str, transform):
+    """
+    Wraps a transform so its output is checkpointed for resuming this run after a failed load.
+    """
+    def run(data, *args):
+        result = transform(data, *args)
+        if result is not None:
+            try:
+                save_checkpoint("warehouse", name, result, {"run_id": current_run_id()})
+            except Exception as e:
+                print(f"Can't save checkpoint for {name}. Cause: {str(e)}")
+        return result
+    return run
+
+def _skip_empty(func):
+    """
+    Wraps a transform or load so an empty extract passes through as a successful no-op.
+    Nothing is transformed or loaded, and no load is logged, so the table's watermark stays where it was.
+    """
+    def run(data, *args):
+        if data is not None and data.empty:
+            return data
+        return func(data, *args)
+    return run
+
+def _restore(name: str):
+    """
+    Returns a task's checkpointed output if it was written by the current run.
+    """
+    meta = read_checkpoint_meta("warehouse", name)
+    if meta is None or meta.get("run_id") != current_run_id():
+        return None
+    return load_checkpoint("warehouse", name)
+
+def _table_tasks(staging_table: str, transform, target_table: str, idx_name: str, after: tuple = ()) -> list:
+    """
+    Builds the extract, transform and load tasks for one warehouse table.
+    With the SQL transform engine, or a chunk size configured for the staging table, they collapse into one load task.
+    """
+    # The SQL engine transforms and loads inside the warehouse in one task
+    if get_transform_engine(target_table) == 'sql':
+        return [task(f'load_{target_table}', elt_table, args=(staging_table, target_table, idx_name), after=after, source='warehouse')]
+
+    chunksize = get_chunksize(staging_table)
+    if chunksize:
+        return [
+            task(f'load_{target_table}', load_warehouse_stream,
+                 args=(stream_staging(staging_table, 'public', chunksize, target_table), transform, 'public', target_table, idx_name, 'staging'),
+                 after=after, source='warehouse')
+        ]
+    return [
+        task(f'extract_{staging_table}', extract_staging, args=(staging_table, 'public', target_table), source='staging'),
+        # TRANSFORM_EXECUTOR=process runs the transform in worker processes
+        task(f'transform_{target_table}', _skip_empty(_checkpointed(f'transform_{target_table}', run_transform)), inputs=(f'extract_{staging_table}',),
+             args=(transform, staging_table, target_table), after=after),
+        task(f'load_{target_table}', _skip_empty(load_warehouse), inputs=(f'transform_{target_table}',), args=('public', target_table, idx_name, 'staging'), source='warehouse')
+    ]
+
+# Staging table, transform, warehouse table, its natural key, and the loads it must wait for.
+# Facts and dim_products resolve surrogate keys from the key cache, which is refreshed by the dimension loads.
+WAREHOUSE_TABLES = [
+    ('store_branch', transform_dim_store_branch, 'dim_store_branch', 'nk_store_id', ()),
+    ('customers', transform_dim_customers, 'dim_customers', 'nk_customer_id', ()),
+    ('employees', transform_dim_employees, 'dim_employees', 'nk_employee_id', ()),
+    ('products', transform_dim_products, 'dim_products', 'nk_product_id', ('load_dim_store_branch',)),
+    ('orders', transform_fct_order, 'fct_order', 'nk_order_id', ('load_dim_customers', 'load_dim_employees')),
+    ('inventory_tracking', transform_fct_inventory, 'fct_inventory', 'nk_tracking_id', ('load_dim_products',))
+]
+
+def _stale(staging_table: str, target_table: str) -> bool:
+    """
+    True if staging has rows past the warehouse table's watermark, so its done tasks must run again.
+    """
+    try:
+        return has_new_rows(staging_table, 'public', target_table)
+    except Exception as e:
+        print(f"Can't probe {staging_table} for new rows, loading {target_table} again. Cause: {str(e)}")
+        return True
+
+def warehouse_pipeline(tables: list = None):
+    """
+    Transforms and loads the warehouse tables; `tables` limits the run to some staging tables.
+    A dimension left out of the run is already up to date, so nothing waits for it.
+    """
+    selected = [entry for entry in WAREHOUSE_TABLES if tables is None or entry[0] in tables]
+    loads = {f"load_{target_table}" for _, _, target_table, _, _ in selected}
+    tasks = []
+    completed = set()
+    for staging_table, transform, target_table, idx_name, after in selected:
+        table_tasks = _table_tasks(staging_table, transform, target_table, idx_name, after=tuple(dep for dep in after if dep in loads))
+        tasks += table_tasks
+
+        # Tasks done by an earlier attempt of this run are skipped, unless the table was loaded
+        # and staging has received new rows for it since (its watermark only moves on a load)
+        done = {node["name"] for node in table_tasks if is_done(f"warehouse.{node['name']}")}
+        if f"load_{target_table}" not in done or not _stale(staging_table, target_table):
+            completed |= done
+
+    # Independent tasks run in parallel; a failed task skips everything downstream of it.
+    # Skipped tasks' outputs are restored from checkpoints.
+    return run_dag(
+        tasks,
+        completed=completed,
+        restore=_restore,
+        on_finish=lambda name, status: mark_unit(f"warehouse.{name}", status)
+    )
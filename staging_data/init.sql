@@ -120,4 +120,32 @@ CREATE TABLE public.store_branch (
 	store_name varchar NULL,
 	created_at timestamp NULL,
 	CONSTRAINT store_branch_pk PRIMARY KEY (store_id)
-);
\ No newline at end of file
+);
+
+-- Upserts of changed source rows (EXTRACT_MODE=cdc) restamp created_at,
+-- so the warehouse extract picks up updated rows as well as new ones.
+CREATE OR REPLACE FUNCTION public.touch_created_at()
+RETURNS trigger AS $$
+BEGIN
+	NEW.created_at := now();
+	RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER customers_touch BEFORE UPDATE ON public.customers
+FOR EACH ROW EXECUTE FUNCTION public.touch_created_at();
+
+CREATE TRIGGER employees_touch BEFORE UPDATE ON public.employees
+FOR EACH ROW EXECUTE FUNCTION public.touch_created_at();
+
+CREATE TRIGGER orders_touch BEFORE UPDATE ON public.orders
+FOR EACH ROW EXECUTE FUNCTION public.touch_created_at();
+
+CREATE TRIGGER products_touch BEFORE UPDATE ON public.products
+FOR EACH ROW EXECUTE FUNCTION public.touch_created_at();
+
+CREATE TRIGGER inventory_tracking_touch BEFORE UPDATE ON public.inventory_tracking
+FOR EACH ROW EXECUTE FUNCTION public.touch_created_at();
+
+CREATE TRIGGER order_details_touch BEFORE UPDATE ON public.order_details
+FOR EACH ROW EXECUTE FUNCTION public.touch_created_at();
@@ -0,0 +1,63 @@
+"""
+Shared fixtures. Run the suite from the repository root with `python -m pytest`.
+
+Tests that use the `postgres` fixture run against a throwaway local server from the pgserver
+package (`pip install pgserver`) and are skipped when it isn't installed.
+"""
+import os
+import pytest
+from sqlalchemy import create_engine, text
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# read_sql reads MODEL_PATH on every call
+os.environ.setdefault('MODEL_PATH', os.path.join(REPO_ROOT, 'src', 'models') + os.sep)
+
+from src.utils import helper
+
+ETL_LOG_DDL = (
+    "CREATE TABLE etl_log (step TEXT, component TEXT, status TEXT, table_name TEXT, etl_date TIMESTAMP, error_msg TEXT, "
+    "duration_sec REAL, rows_in INTEGER, rows_out INTEGER, bytes_read INTEGER, rows_rejected INTEGER, peak_memory_mb REAL)"
+)
+
+@pytest.fixture(autouse=True)
+def log_db(tmp_path, monkeypatch):
+    """
+    Gives every test a SQLite log database and etl_log spill and dead-letter files of its own.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'log.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(ETL_LOG_DDL))
+    monkeypatch.setitem(helper._engines, 'log', engine)
+    monkeypatch.setattr(helper, 'ETL_LOG_SPILL_PATH', str(tmp_path / 'etl_log_spill.jsonl'))
+    monkeypatch.setattr(helper, 'ETL_LOG_DEAD_LETTER_PATH', str(tmp_path / 'etl_log_dead_letter.jsonl'))
+    yield engine
+    # Nothing a test logged may reach the next test's database
+    helper.flush_etl_log()
+    with helper._log_lock:
+        del helper._log_buffer[:]
+    helper._log_failures = 0
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def object_store(tmp_path, monkeypatch):
+    """
+    Sends failure dumps to a LocalObjectStore under the test's directory instead of MinIO.
+    """
+    store = helper.LocalObjectStore(str(tmp_path / 'minio'))
+    monkeypatch.setattr(helper, '_minio_client', store)
+    monkeypatch.setattr(helper, '_known_buckets', set())
+    yield store
+    helper.flush_error_dumps()
+
+@pytest.fixture(scope='session')
+def postgres(tmp_path_factory):
+    """
+    SQLAlchemy engine of a local Postgres server shared by the session.
+    """
+    pgserver = pytest.importorskip('pgserver')
+    server = pgserver.get_server(str(tmp_path_factory.mktemp('pgdata')), cleanup_mode='stop')
+    engine = create_engine(server.get_uri().replace('postgresql://', 'postgresql+psycopg2://'))
+    yield engine
+    engine.dispose()
+    server.cleanup()
@@ -0,0 +1,48 @@
+"""
+Offline stand-in for a gspread client, injected with extract_spreadsheet.set_client.
+"""
+import csv
+import os
+from datetime import datetime, timezone
+
+class FakeWorksheet:
+    """
+    Worksheet backed by <directory>/<worksheet name>.csv.
+    """
+    def __init__(self, path: str, client):
+        self.path = path
+        self.client = client
+
+    def get_all_values(self) -> list:
+        self.client.downloads += 1
+        with open(self.path, newline='') as f:
+            return [row for row in csv.reader(f)]
+
+class FakeSpreadsheet:
+    def __init__(self, directory: str, key: str, client):
+        self.directory = directory
+        self.id = key
+        self.client = client
+
+    def get_lastUpdateTime(self) -> str:
+        # Like the Drive modifiedTime: the newest change to any worksheet file
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.csv')]
+        modified = max((os.path.getmtime(path) for path in paths), default=0)
+        return datetime.fromtimestamp(modified, tz=timezone.utc).isoformat()
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        path = os.path.join(self.directory, f"{title}.csv")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Worksheet {title} not found in {self.directory}")
+        return FakeWorksheet(path, self.client)
+
+class FakeClient:
+    """
+    Every key opens the same directory of CSV worksheets; downloads counts the worksheets read.
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.downloads = 0
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        return FakeSpreadsheet(self.directory, key, self)
@@ -0,0 +1,23 @@
+"""
+Checkpoints round-trip through Arrow IPC files, and importing the module doesn't need pyarrow.
+"""
+import subprocess
+import sys
+import pandas as pd
+from conftest import REPO_ROOT
+from src.utils import checkpoint
+
+def test_checkpoint_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, 'CHECKPOINTS', True)
+    monkeypatch.setattr(checkpoint, 'CHECKPOINT_DIR', str(tmp_path))
+    data = pd.DataFrame({'order_id': [1, 2], 'payment_method': ['card', None]})
+
+    checkpoint.save_checkpoint('staging', 'orders', data, {'rows': 2})
+
+    assert checkpoint.read_checkpoint_meta('staging', 'orders') == {'rows': 2}
+    pd.testing.assert_frame_equal(checkpoint.load_checkpoint('staging', 'orders'), data, check_dtype=False)
+
+def test_import_does_not_load_pyarrow():
+    # A None entry makes any `import pyarrow` fail
+    script = "import sys; sys.modules['pyarrow'] = None; import src.utils.checkpoint, src.utils.schema"
+    subprocess.run([sys.executable, '-c', script], cwd=REPO_ROOT, check=True, timeout=60)
@@ -0,0 +1,63 @@
+"""
+DAG runs: inputs flow downstream, failures skip their dependents, and completed tasks resume.
+"""
+import threading
+import pytest
+from src.utils.dag import task, run_dag
+
+def test_inputs_and_args_flow_downstream():
+    report = run_dag([
+        task('extract', lambda: [1, 2, 3]),
+        task('transform', lambda rows, factor: [row * factor for row in rows], inputs=('extract',), args=(10,)),
+        task('load', lambda rows: len(rows), inputs=('transform',))
+    ])
+
+    assert report['results']['transform'] == [10, 20, 30]
+    assert report['results']['load'] == 3
+    assert report['critical_path'] == ['extract', 'transform', 'load']
+
+@pytest.mark.parametrize('failure', [lambda: None, lambda: False, lambda: 1 / 0])
+def test_failure_skips_downstream_only(failure):
+    report = run_dag([
+        task('dim', failure),
+        task('fact', lambda: True, after=('dim',)),
+        task('fact_load', lambda value: value, inputs=('fact',)),
+        task('other', lambda: True)
+    ])
+
+    assert report['status'] == {'dim': 'failed', 'fact': 'skipped', 'fact_load': 'skipped', 'other': 'success'}
+
+def test_independent_tasks_run_concurrently():
+    both_started = threading.Barrier(2, timeout=5)
+    report = run_dag([task('a', both_started.wait), task('b', both_started.wait)], max_workers=2)
+    assert set(report['status'].values()) == {'success'}
+
+def test_completed_tasks_are_restored_or_rerun():
+    calls = []
+
+    def extract():
+        calls.append('extract')
+        return 'fresh'
+
+    tasks = [
+        task('extract', extract),
+        task('transform', lambda value: value, inputs=('extract',)),
+        task('dim', lambda: calls.append('dim') or True)
+    ]
+
+    # A completed input whose result can be restored isn't run again
+    report = run_dag(tasks, completed={'extract', 'dim'}, restore=lambda name: 'restored')
+    assert report['results']['transform'] == 'restored' and calls == []
+
+    # Without a restorable result it runs again for the task that needs it
+    report = run_dag(tasks, completed={'extract', 'dim'}, restore=lambda name: None)
+    assert report['results']['transform'] == 'fresh' and calls == ['extract']
+
+def test_on_finish_reports_every_task():
+    finished = {}
+    run_dag([task('a', lambda: None), task('b', lambda: True, after=('a',))], on_finish=finished.__setitem__)
+    assert finished == {'a': 'failed', 'b': 'skipped'}
+
+def test_unknown_dependency_is_refused():
+    with pytest.raises(ValueError, match='unknown task'):
+        run_dag([task('load', lambda: True, after=('missing',))])
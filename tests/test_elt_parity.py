@@ -0,0 +1,137 @@
+"""
+The SQL transform engine (src/models/elt) must produce the same rows as the pandas transforms.
+Both engines read the same fixture staging rows and resolve keys against the same warehouse dimensions.
+"""
+import decimal
+import os
+import pandas as pd
+import pytest
+import sqlalchemy
+from conftest import REPO_ROOT
+from src.utils import helper, key_cache
+from src.utils.schema import apply_dtypes
+from src.utils.watermark import INITIAL_ETL_DATE
+from src.warehouse.elt import elt
+from src.warehouse.transform.transform_dim_customers import transform_dim_customers
+from src.warehouse.transform.transform_dim_employees import transform_dim_employees
+from src.warehouse.transform.transform_dim_products import transform_dim_products
+from src.warehouse.transform.transform_dim_store_branch import transform_dim_store_branch
+from src.warehouse.transform.transform_fct_order import transform_fct_order
+from src.warehouse.transform.transform_fct_inventory import transform_fct_inventory
+
+PLAN = [
+    ('store_branch', transform_dim_store_branch, 'dim_store_branch', 'nk_store_id'),
+    ('customers', transform_dim_customers, 'dim_customers', 'nk_customer_id'),
+    ('employees', transform_dim_employees, 'dim_employees', 'nk_employee_id'),
+    ('products', transform_dim_products, 'dim_products', 'nk_product_id'),
+    ('orders', transform_fct_order, 'fct_order', 'nk_order_id'),
+    ('inventory_tracking', transform_fct_inventory, 'fct_inventory', 'nk_tracking_id')
+]
+
+# Staging rows covering the cases the engines handle differently if they drift apart:
+# a store name shared by two stores, bad roles, unparseable and negative prices,
+# and facts with known, unknown and null dimension keys
+STAGING_ROWS = """
+INSERT INTO staging.store_branch VALUES
+    (1, 'Central', '2024-01-01'), (2, 'Central', '2024-01-02'), (3, 'North', '2024-01-03');
+INSERT INTO staging.customers VALUES
+    (1, 'Ann', 'Lee', 'ann@x.com', '555-1', 10, '2024-01-01'),
+    (2, 'Bob', 'Ray', NULL, NULL, NULL, '2024-01-01');
+INSERT INTO staging.employees VALUES
+    (1, 'Cid', 'Moe', '2020-05-01', 'Barista', 'cid@x.com', '2024-01-01'),
+    (2, 'Dee', 'Fox', '2021-06-01', 'Manager', NULL, '2024-01-01'),
+    (3, 'Eve', 'Kim', '2022-07-01', 'me', NULL, '2024-01-01');
+INSERT INTO staging.products VALUES
+    (1, 'Latte', 'Coffee', '$-4.50', '1.20', 'yes', 'Central', '2024-01-01'),
+    (2, 'Scone', 'Bakery', 'n/a', '$0.80', NULL, NULL, '2024-01-01'),
+    (3, 'Tea', 'Tea', '3', '.5', 'no', 'Nowhere', '2024-01-01');
+INSERT INTO staging.orders VALUES
+    (1, 1, 1, '2024-02-01 09:30', 12.50, 'card', 'done', '2024-02-01'),
+    (2, NULL, 2, '2024-02-02 10:00', 3.00, 'cash', 'done', '2024-02-02'),
+    (3, 99, 1, '2024-02-03 11:00', 7.25, 'card', 'void', '2024-02-03'),
+    (4, 2, 99, '2024-02-04 12:00', 1.00, 'cash', 'done', '2024-02-04'),
+    (5, 2, NULL, '2024-02-05 13:00', 2.00, 'card', 'done', '2024-02-05');
+INSERT INTO staging.inventory_tracking VALUES
+    (1, 1, 5, '2024-02-01 08:00', 'restock', '2024-02-01'),
+    (2, 99, -1, '2024-02-02 08:00', 'sale', '2024-02-02'),
+    (3, NULL, 2, '2024-02-03 08:00', NULL, '2024-02-03');
+"""
+
+# Dimension members the fact transforms resolve against
+WAREHOUSE_DDL = """
+CREATE TABLE public.dim_store_branch (sk_store_id serial PRIMARY KEY, nk_store_id int UNIQUE, store_name varchar, created_at timestamp);
+CREATE TABLE public.dim_customers (sk_customer_id serial PRIMARY KEY, nk_customer_id int UNIQUE);
+CREATE TABLE public.dim_employees (sk_employee_id serial PRIMARY KEY, nk_employee_id int UNIQUE);
+CREATE TABLE public.dim_products (sk_product_id serial PRIMARY KEY, nk_product_id int UNIQUE);
+INSERT INTO public.dim_store_branch (nk_store_id, store_name) VALUES (1, 'Central'), (2, 'Central'), (3, 'North');
+INSERT INTO public.dim_customers (nk_customer_id) VALUES (1), (2);
+INSERT INTO public.dim_employees (nk_employee_id) VALUES (2), (1);
+INSERT INTO public.dim_products (nk_product_id) VALUES (2), (1), (3);
+"""
+
+@pytest.fixture
+def elt_db(postgres, tmp_path, monkeypatch):
+    """
+    Staging tables (staging_data/init.sql) in a 'staging' schema of the warehouse database, as ELT_USE_FDW=0 expects.
+    """
+    with open(os.path.join(REPO_ROOT, 'staging_data', 'init.sql')) as file:
+        # pgserver ships without contrib extensions, and the staging tables don't use uuid-ossp
+        staging_ddl = file.read().replace('CREATE EXTENSION IF NOT EXISTS "uuid-ossp";', '').replace('public.', 'staging.')
+    with postgres.begin() as conn:
+        conn.exec_driver_sql("DROP SCHEMA IF EXISTS staging CASCADE; DROP SCHEMA public CASCADE; CREATE SCHEMA public; CREATE SCHEMA staging")
+        conn.exec_driver_sql(staging_ddl)
+        conn.exec_driver_sql(STAGING_ROWS)
+        conn.exec_driver_sql(WAREHOUSE_DDL)
+
+    monkeypatch.setitem(helper._engines, 'warehouse', postgres)
+    monkeypatch.setattr(elt, 'ELT_USE_FDW', False)
+    monkeypatch.setattr(elt, 'ELT_STAGING_SCHEMA', 'staging')
+    monkeypatch.setattr(key_cache, 'KEY_CACHE_DIR', str(tmp_path / 'key_cache'))
+    monkeypatch.setattr(key_cache, '_caches', {})
+    return postgres
+
+def normalize(data: pd.DataFrame, idx_name: str) -> pd.DataFrame:
+    """
+    Puts both engines' output in the same row order, column order and dtypes.
+    """
+    data = data.sort_values(idx_name).reset_index(drop=True)
+    data = data[sorted(data.columns)].copy()
+    for col in data.columns:
+        values = data[col].dropna()
+        if pd.api.types.is_datetime64_any_dtype(data[col]):
+            data[col] = pd.to_datetime(data[col]).astype('datetime64[ns]')
+        elif pd.api.types.is_bool_dtype(data[col]):
+            continue
+        elif pd.api.types.is_numeric_dtype(data[col]) or (len(values) and values.map(lambda value: isinstance(value, decimal.Decimal)).all()):
+            data[col] = data[col].astype('float64')
+        else:
+            # Dates and strings compare by their text
+            data[col] = data[col].map(lambda value: None if pd.isnull(value) else str(value)).astype(object)
+    return data
+
+@pytest.mark.parametrize('staging_table, transform, target_table, idx_name', PLAN, ids=[entry[2] for entry in PLAN])
+def test_sql_engine_matches_pandas(elt_db, staging_table, transform, target_table, idx_name):
+    params = {"etl_date": INITIAL_ETL_DATE}
+    staging = pd.read_sql(
+        sql=sqlalchemy.text(f"SELECT * FROM staging.{staging_table} WHERE created_at > :etl_date"),
+        con=elt_db, params=params
+    )
+    expected = transform(apply_dtypes(staging, 'staging', staging_table))
+    actual = pd.read_sql(sql=elt.elt_select(target_table), con=elt_db, params=params)
+
+    assert expected is not None, "pandas transform failed"
+    assert sorted(expected.columns) == sorted(actual.columns)
+    pd.testing.assert_frame_equal(normalize(expected, idx_name), normalize(actual, idx_name), check_exact=False, rtol=1e-9)
+
+def test_elt_table_updates_key_cache(elt_db, monkeypatch):
+    from src.utils import watermark
+    monkeypatch.setattr(watermark, '_watermarks', {})
+    key_cache.get_key_lookup('dim_store_branch')
+    with elt_db.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO staging.store_branch VALUES (4, 'South', '2024-03-01')")
+
+    assert elt.elt_table('store_branch', 'dim_store_branch', 'nk_store_id')
+    with elt_db.connect() as conn:
+        sk_store_id = conn.exec_driver_sql("SELECT sk_store_id FROM public.dim_store_branch WHERE nk_store_id = 4").scalar()
+    # Written by the upsert, not fetched on a cache miss
+    assert key_cache._caches['dim_store_branch']['South'] == sk_store_id
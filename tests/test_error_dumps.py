@@ -0,0 +1,83 @@
+"""
+Failed batches are queued for upload to object storage (a LocalObjectStore here) without blocking the pipeline.
+"""
+import os
+import queue
+import subprocess
+import sys
+import threading
+import pandas as pd
+import pytest
+from conftest import REPO_ROOT
+from src.utils import helper
+
+@pytest.fixture(autouse=True)
+def dump_queue(monkeypatch):
+    # A writer of this test's own, so a blocked upload can't hold up other tests
+    monkeypatch.setattr(helper, '_dump_queue', queue.Queue(maxsize=helper.ERROR_DUMP_QUEUE_SIZE))
+    monkeypatch.setattr(helper, '_dump_writer', None)
+
+class BlockingStore(helper.LocalObjectStore):
+    """
+    Holds every upload until released.
+    """
+    def __init__(self, root: str):
+        super().__init__(root)
+        self.uploading = threading.Event()
+        self.release = threading.Event()
+
+    def put_object(self, *args, **kwargs):
+        self.uploading.set()
+        self.release.wait(timeout=10)
+        super().put_object(*args, **kwargs)
+
+def objects(store) -> list:
+    path = os.path.join(store.root, 'error-paccafe')
+    return sorted(os.listdir(path)) if os.path.isdir(path) else []
+
+def test_queued_dump_is_uploaded(object_store):
+    data = pd.DataFrame({'order_id': [1, 2], 'total_price': [3.5, None]})
+
+    helper.handle_error(data, bucket_name='error-paccafe', table_name='orders', step='staging', component='load')
+    helper.flush_error_dumps()
+
+    (name,) = objects(object_store)
+    assert name.startswith('staging_load_orders_') and name.endswith('.csv.gz')
+    dumped = pd.read_csv(os.path.join(object_store.root, 'error-paccafe', name), index_col=0)
+    pd.testing.assert_frame_equal(dumped, data)
+
+def test_full_queue_drops_the_dump(tmp_path, monkeypatch, capsys):
+    store = BlockingStore(str(tmp_path / 'blocking'))
+    monkeypatch.setattr(helper, '_minio_client', store)
+    monkeypatch.setattr(helper, '_dump_queue', queue.Queue(maxsize=1))
+    data = pd.DataFrame({'order_id': [1]})
+
+    # The first dump is being uploaded, the second waits in the queue, the third finds it full
+    helper.handle_error(data, bucket_name='error-paccafe', table_name='uploading', step='staging', component='load')
+    assert store.uploading.wait(timeout=10)
+    helper.handle_error(data, bucket_name='error-paccafe', table_name='queued', step='staging', component='load')
+    helper.handle_error(data, bucket_name='error-paccafe', table_name='dropped', step='staging', component='load')
+    store.release.set()
+    helper.flush_error_dumps()
+
+    assert [name.split('_')[2] for name in objects(store)] == ['queued', 'uploading']
+    assert "Error dump queue is full, dropping staging_load_dropped_" in capsys.readouterr().out
+
+def test_queued_dumps_are_flushed_at_exit(tmp_path):
+    root = tmp_path / 'minio'
+    # The upload is still running when the script ends; only the exit flush waits for it
+    script = (
+        "import time\n"
+        "import pandas as pd\n"
+        "from src.utils import helper\n"
+        "class SlowStore(helper.LocalObjectStore):\n"
+        "    def put_object(self, *args, **kwargs):\n"
+        "        time.sleep(1)\n"
+        "        super().put_object(*args, **kwargs)\n"
+        f"helper._minio_client = SlowStore({str(root)!r})\n"
+        "helper.handle_error(pd.DataFrame({'order_id': [1]}), bucket_name='error-paccafe', table_name='orders', step='staging', component='load')\n"
+    )
+    env = {**os.environ, 'ETL_LOG_SPILL_PATH': str(tmp_path / 'etl_log_spill.jsonl')}
+    subprocess.run([sys.executable, '-c', script], cwd=REPO_ROOT, env=env, check=True, timeout=60)
+
+    assert len(objects(helper.LocalObjectStore(str(root)))) == 1
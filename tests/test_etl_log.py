@@ -0,0 +1,83 @@
+"""
+Buffered etl_log records: the per-process spill file, recovery after a crash, and the dead-letter file.
+"""
+import json
+import os
+import subprocess
+import sys
+from sqlalchemy import create_engine, text
+from conftest import ETL_LOG_DDL
+from src.utils import helper
+
+def logged(engine) -> list:
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(text("SELECT table_name FROM etl_log ORDER BY table_name"))]
+
+def record(table_name: str, status: str = 'success') -> dict:
+    return {"step": "staging", "component": "load", "status": status, "table_name": table_name, "etl_date": "2024-01-01 00:00:00"}
+
+def dead_pid() -> int:
+    child = subprocess.Popen([sys.executable, '-c', 'pass'])
+    child.wait()
+    return child.pid
+
+def write_lines(path: str, records: list):
+    with open(path, 'w') as file:
+        for entry in records:
+            file.write(json.dumps(entry) + "\n")
+
+def test_spill_file_is_per_process_and_removed_once_flushed(log_db):
+    helper.etl_log(record('orders'))
+    spill_path = f"{helper.ETL_LOG_SPILL_PATH}.{os.getpid()}"
+    assert os.path.exists(spill_path) or logged(log_db) == ['orders']
+
+    helper.flush_etl_log()
+
+    assert logged(log_db) == ['orders']
+    assert not os.path.exists(spill_path)
+
+def test_recovers_spill_files_of_dead_processes_only(log_db):
+    base = helper.ETL_LOG_SPILL_PATH
+    live_path = f"{base}.{os.getppid()}"
+    write_lines(f"{base}.{dead_pid()}", [record('crashed_run')])
+    write_lines(live_path, [record('running_run')])
+    # Written by versions that didn't suffix the spill file with the pid
+    write_lines(base, [record('old_version')])
+    # A torn last line from a crash mid-write is skipped
+    with open(base, 'a') as file:
+        file.write('{"step": "stag')
+
+    with helper._log_lock:
+        helper._log_buffer.extend(helper._recover_spill())
+    helper.flush_etl_log()
+
+    assert logged(log_db) == ['crashed_run', 'old_version']
+    assert os.path.exists(live_path)
+    os.remove(live_path)
+
+def test_unreachable_log_database_keeps_records(tmp_path, monkeypatch):
+    unreachable = create_engine(f"sqlite:///{tmp_path / 'missing' / 'log.db'}")
+    monkeypatch.setitem(helper._engines, 'log', unreachable)
+    monkeypatch.setattr(helper, 'ETL_LOG_MAX_RETRIES', 1)
+
+    helper.etl_log(record('orders'))
+    helper.flush_etl_log()
+
+    assert [entry['table_name'] for entry in helper._log_buffer] == ['orders']
+    assert [entry['table_name'] for entry in helper._read_spill(helper._spill_path())] == ['orders']
+    assert not os.path.exists(helper.ETL_LOG_DEAD_LETTER_PATH)
+
+def test_rejected_records_are_dead_lettered(log_db, monkeypatch):
+    with log_db.begin() as conn:
+        conn.execute(text("DROP TABLE etl_log"))
+        conn.execute(text(ETL_LOG_DDL.replace("status TEXT", "status TEXT NOT NULL")))
+    monkeypatch.setattr(helper, 'ETL_LOG_MAX_RETRIES', 1)
+
+    helper.etl_log(record('orders'))
+    helper.etl_log(record('customers', status=None))
+    helper.flush_etl_log()
+
+    assert logged(log_db) == ['orders']
+    assert helper._log_buffer == []
+    with open(helper.ETL_LOG_DEAD_LETTER_PATH) as file:
+        assert [json.loads(line)['table_name'] for line in file] == ['customers']
@@ -0,0 +1,62 @@
+"""
+The store_branch sheet is downloaded only when its revision changed, and its snapshot is kept only once loaded.
+"""
+import os
+import pytest
+from fake_gspread import FakeClient
+from src import staging_pipeline
+from src.staging.extract import extract_spreadsheet
+from src.utils import run_state
+
+@pytest.fixture
+def sheet(tmp_path, monkeypatch):
+    directory = tmp_path / 'sheet'
+    directory.mkdir()
+    write_sheet(directory, [('1', 'Central')], mtime=1_700_000_000)
+    client = FakeClient(str(directory))
+    extract_spreadsheet.set_client(client)
+    monkeypatch.setattr(extract_spreadsheet, 'SHEET_CACHE_DIR', str(tmp_path / 'sheet_cache'))
+    monkeypatch.setenv('KEY_SPREADSHEET', 'key')
+    yield client
+    extract_spreadsheet.set_client(None)
+
+def write_sheet(directory, rows: list, mtime: int):
+    path = os.path.join(directory, 'store_branch.csv')
+    with open(path, 'w') as file:
+        file.write("store_id,store_name\n" + "".join(f"{store_id},{name}\n" for store_id, name in rows))
+    os.utime(path, (mtime, mtime))
+
+def test_unchanged_revision_skips_the_download(sheet):
+    data, unchanged = extract_spreadsheet.extract_sheet('key', 'store_branch')
+    assert not unchanged and len(data) == 1
+    extract_spreadsheet.commit_sheet_snapshot('key', 'store_branch')
+
+    data, unchanged = extract_spreadsheet.extract_sheet('key', 'store_branch')
+
+    assert unchanged and data.empty
+    assert sheet.downloads == 1
+
+def test_changed_revision_reloads(sheet):
+    extract_spreadsheet.extract_sheet('key', 'store_branch')
+    extract_spreadsheet.commit_sheet_snapshot('key', 'store_branch')
+    write_sheet(sheet.directory, [('1', 'Central'), ('2', 'North')], mtime=1_700_000_100)
+
+    data, unchanged = extract_spreadsheet.extract_sheet('key', 'store_branch')
+
+    assert not unchanged
+    assert data['store_name'].tolist() == ['Central', 'North']
+    assert sheet.downloads == 2
+
+@pytest.mark.parametrize('load_succeeds', [False, True])
+def test_snapshot_is_committed_only_after_a_successful_load(sheet, tmp_path, monkeypatch, load_succeeds):
+    monkeypatch.setattr(run_state, 'RUN_STATE_PATH', str(tmp_path / 'run_state.json'))
+    monkeypatch.setattr(run_state, '_state', None)
+    monkeypatch.setattr(staging_pipeline, 'load_staging', lambda **kwargs: load_succeeds)
+    run_state.start_run(resume=False)
+
+    staging_pipeline.staging_pipeline(tables=['store_branch'])
+    _, unchanged = extract_spreadsheet.extract_sheet('key', 'store_branch')
+
+    # After a failed load the sheet is downloaded again
+    assert unchanged == load_succeeds
+    assert sheet.downloads == (1 if load_succeeds else 2)
@@ -0,0 +1,45 @@
+"""
+The pickled surrogate key cache is trusted only while its dimension is unchanged.
+"""
+import pandas as pd
+import pytest
+from src.utils import helper, key_cache
+
+@pytest.fixture
+def dim_customers(postgres, tmp_path, monkeypatch):
+    with postgres.begin() as conn:
+        conn.exec_driver_sql(
+            "DROP SCHEMA IF EXISTS staging CASCADE; DROP SCHEMA public CASCADE; CREATE SCHEMA public; "
+            "CREATE TABLE public.dim_customers (sk_customer_id serial PRIMARY KEY, nk_customer_id int UNIQUE); "
+            "INSERT INTO public.dim_customers (nk_customer_id) VALUES (1), (2)"
+        )
+    monkeypatch.setitem(helper._engines, 'warehouse', postgres)
+    monkeypatch.setattr(key_cache, 'KEY_CACHE_DIR', str(tmp_path / 'key_cache'))
+    monkeypatch.setattr(key_cache, '_caches', {})
+    return postgres
+
+def restart(monkeypatch):
+    # A new process starts from the pickled file
+    monkeypatch.setattr(key_cache, '_caches', {})
+
+def test_unchanged_dimension_reads_the_file(dim_customers, monkeypatch):
+    assert key_cache.get_key_lookup('dim_customers').to_dict() == {1: 1, 2: 2}
+    restart(monkeypatch)
+    monkeypatch.setattr(key_cache, '_query_keys', lambda *args: pytest.fail("the warehouse was queried"))
+
+    assert key_cache.get_key_lookup('dim_customers').to_dict() == {1: 1, 2: 2}
+
+def test_rebuilt_dimension_reseeds(dim_customers, monkeypatch):
+    key_cache.get_key_lookup('dim_customers')
+    with dim_customers.begin() as conn:
+        conn.exec_driver_sql("TRUNCATE public.dim_customers; INSERT INTO public.dim_customers (nk_customer_id) VALUES (2), (1)")
+    restart(monkeypatch)
+
+    assert key_cache.get_key_lookup('dim_customers').to_dict() == {2: 3, 1: 4}
+
+def test_file_without_fingerprint_reseeds(dim_customers, monkeypatch):
+    key_cache.get_key_lookup('dim_customers')
+    pd.Series({1: 99, 2: 98}).to_pickle(key_cache._cache_path('dim_customers'))
+    restart(monkeypatch)
+
+    assert key_cache.get_key_lookup('dim_customers').to_dict() == {1: 1, 2: 2}
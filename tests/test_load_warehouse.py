@@ -0,0 +1,25 @@
+"""
+Streamed warehouse loads count the staging rows they read, not the rows left after the transform.
+"""
+import pandas as pd
+from sqlalchemy import text
+from src.utils import helper
+from src.warehouse.load import load
+
+def test_stream_counts_rows_before_the_transform(log_db, monkeypatch):
+    monkeypatch.setattr(load, 'write_changed_rows', lambda conn, data, *args: data)
+    monkeypatch.setattr(load, 'update_key_cache', lambda *args: None)
+    monkeypatch.setattr(load, 'get_db_connection', lambda db_type: None)
+    chunks = [pd.DataFrame({'order_id': [1, 2, 2]}), pd.DataFrame({'order_id': [3, 4]})]
+
+    def dedupe(chunk):
+        return chunk.drop_duplicates().rename(columns={'order_id': 'nk_order_id'})
+
+    assert load.load_warehouse_stream(iter(chunks), dedupe, 'public', 'fct_order', 'nk_order_id', 'staging')
+    helper.flush_etl_log()
+
+    with log_db.connect() as conn:
+        rows_in, rows_out = conn.execute(text(
+            "SELECT rows_in, rows_out FROM etl_log WHERE step = 'warehouse' AND component = 'load' AND table_name = 'fct_order'"
+        )).one()
+    assert (rows_in, rows_out) == (5, 4)
@@ -0,0 +1,63 @@
+"""
+Swap loads into a day-partitioned fact table, and the modes that refuse one.
+"""
+import pandas as pd
+import pytest
+from src.utils import helper, loader
+
+FCT_ORDER_DDL = """
+DROP SCHEMA IF EXISTS staging CASCADE; DROP SCHEMA public CASCADE; CREATE SCHEMA public;
+CREATE TABLE public.fct_order (sk_order_id serial, nk_order_id int UNIQUE, order_date int, total_price numeric);
+INSERT INTO public.fct_order (nk_order_id, order_date, total_price) VALUES (1, 20240101, 10), (2, 20240102, 20), (3, 20230101, 30);
+"""
+
+@pytest.fixture
+def fct_order(postgres, monkeypatch):
+    with postgres.begin() as conn:
+        conn.exec_driver_sql(FCT_ORDER_DDL)
+    monkeypatch.setitem(helper._engines, 'warehouse', postgres)
+    monkeypatch.setattr(loader, '_partitioned', set())
+    loader.partition_fact_table('fct_order')
+    return postgres
+
+def rows(engine) -> dict:
+    with engine.connect() as conn:
+        return {row[0]: row[1:] for row in conn.exec_driver_sql("SELECT nk_order_id, order_date, sk_order_id FROM public.fct_order")}
+
+def test_swap_moves_rows_and_attaches_new_days(fct_order):
+    before = rows(fct_order)
+    batch = pd.DataFrame({
+        'nk_order_id': [1, 4], 'order_date': [20240103, 20240103], 'total_price': [11, 40]
+    }).set_index('nk_order_id')
+
+    loader.write_table(fct_order, batch, 'public', 'fct_order', mode='swap')
+
+    after = rows(fct_order)
+    assert sorted(after) == [1, 2, 3, 4]
+    # Order 1 moved day and kept its surrogate key
+    assert after[1] == (20240103, before[1][1])
+    assert after[2] == before[2]
+
+def test_swap_searches_only_days_near_the_batch(fct_order, monkeypatch):
+    monkeypatch.setattr(loader, 'SWAP_MOVED_LOOKBACK_DAYS', 31)
+    batch = pd.DataFrame({'nk_order_id': [3], 'order_date': [20240105], 'total_price': [30]}).set_index('nk_order_id')
+
+    loader.write_table(fct_order, batch, 'public', 'fct_order', mode='swap')
+
+    # A year-old copy is outside the lookback, as documented
+    with fct_order.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM public.fct_order WHERE nk_order_id = 3").scalar() == 2
+
+@pytest.mark.parametrize('mode', ['upsert', 'copy'])
+def test_partitioned_table_refuses_other_modes(fct_order, mode):
+    batch = pd.DataFrame({'nk_order_id': [1], 'order_date': [20240101], 'total_price': [12]}).set_index('nk_order_id')
+    with pytest.raises(ValueError, match='day-partitioned'):
+        loader.write_table(fct_order, batch, 'public', 'fct_order', mode=mode)
+
+def test_elt_refuses_partitioned_table(fct_order, log_db):
+    from src.warehouse.elt import elt
+    assert not elt.elt_table('orders', 'fct_order', 'nk_order_id')
+    helper.flush_etl_log()
+    with log_db.connect() as conn:
+        status, error_msg = conn.exec_driver_sql("SELECT status, error_msg FROM etl_log WHERE table_name = 'fct_order'").one()
+    assert status == 'failed' and 'day-partitioned' in error_msg
@@ -0,0 +1,51 @@
+"""
+Key-range reads run in parallel, but never with more readers than the engine's pool can serve.
+"""
+import threading
+import time
+import pandas as pd
+import pytest
+import sqlalchemy
+from sqlalchemy import create_engine
+from src.utils import partition
+
+@pytest.fixture
+def orders(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'source.db'}", poolclass=sqlalchemy.pool.QueuePool, pool_size=2, max_overflow=1)
+    pd.DataFrame({'order_id': range(1, 101), 'total_price': range(100)}).to_sql('orders', engine, index=False)
+
+    active, peak, lock = [0], [0], threading.Lock()
+    read_range = partition._read_range
+
+    def counting_read(*args):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            time.sleep(0.05)
+            return read_range(*args)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    monkeypatch.setattr(partition, '_read_range', counting_read)
+    yield engine, peak
+    engine.dispose()
+
+QUERY = sqlalchemy.text("SELECT * FROM orders WHERE total_price >= :low")
+
+def test_read_partitioned_caps_readers_at_the_pool(orders):
+    engine, peak = orders
+
+    data = partition.read_partitioned(engine, QUERY, {"low": 0}, 'order_id', partitions=10)
+
+    assert data['order_id'].tolist() == list(range(1, 101))
+    assert peak[0] == 3
+
+def test_stream_partitioned_caps_readers_at_the_pool(orders):
+    engine, peak = orders
+
+    chunks = list(partition.stream_partitioned(engine, QUERY, {"low": 0}, 'order_id', partitions=10, chunksize=10))
+
+    assert sorted(pd.concat(chunks)['order_id']) == list(range(1, 101))
+    assert peak[0] <= 3
@@ -0,0 +1,32 @@
+"""
+Transforms in the worker process pool: sharded results match the in-process transform, and 'fork' is refused.
+"""
+import pandas as pd
+import pytest
+from src.utils import process_pool
+
+def double_total(data: pd.DataFrame) -> pd.DataFrame:
+    return data.assign(total_price=data['total_price'] * 2)
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    # Workers read their settings from the environment they are spawned with
+    monkeypatch.setenv('ETL_LOG_SPILL_PATH', str(tmp_path / 'etl_log_spill.jsonl'))
+    monkeypatch.setenv('TRANSFORM_EXECUTOR_FCT_ORDER', 'process')
+    monkeypatch.setenv('TRANSFORM_SHARDS_FCT_ORDER', '3')
+    monkeypatch.setattr(process_pool, 'TRANSFORM_WORKERS', 2)
+    monkeypatch.setattr(process_pool, 'TRANSFORM_SHM_DIR', str(tmp_path))
+    yield
+    process_pool.shutdown_transform_pool()
+
+def test_sharded_transform_matches_in_process(pool):
+    data = pd.DataFrame({'order_id': range(10), 'total_price': [float(value) for value in range(10)]})
+
+    result = process_pool.run_transform(data, double_total, 'orders', 'fct_order')
+
+    pd.testing.assert_frame_equal(result.sort_values('order_id').reset_index(drop=True), double_total(data))
+
+def test_fork_start_method_is_refused(pool, monkeypatch):
+    monkeypatch.setattr(process_pool, 'TRANSFORM_START_METHOD', 'fork')
+    with pytest.raises(ValueError, match='TRANSFORM_START_METHOD'):
+        process_pool.run_transform(pd.DataFrame({'order_id': [1], 'total_price': [1.0]}), double_total, 'orders', 'fct_order')
@@ -0,0 +1,44 @@
+"""
+Stored row hashes skip unchanged rows only while the target still holds them.
+"""
+import pandas as pd
+import pytest
+from src.utils import helper
+from src.utils.row_hash import write_changed_rows
+
+@pytest.fixture
+def customers(postgres, monkeypatch):
+    with postgres.begin() as conn:
+        conn.exec_driver_sql(
+            "DROP SCHEMA IF EXISTS staging CASCADE; DROP SCHEMA public CASCADE; CREATE SCHEMA public; "
+            "CREATE TABLE public.customers (customer_id int PRIMARY KEY, first_name varchar); "
+            "CREATE TABLE public.etl_row_hash (step varchar, table_name varchar, row_key varchar, row_hash int8, "
+            "PRIMARY KEY (step, table_name, row_key))"
+        )
+    monkeypatch.setitem(helper._engines, 'staging', postgres)
+    monkeypatch.setitem(helper._engines, 'log', postgres)
+    return postgres
+
+def load(engine) -> int:
+    data = pd.DataFrame({'customer_id': [1, 2], 'first_name': ['Ann', 'Bob']}).set_index('customer_id')
+    return len(write_changed_rows(engine, data, 'public', 'customers', 'staging', mode='copy'))
+
+def test_unchanged_rows_are_skipped(customers):
+    assert load(customers) == 2
+    assert load(customers) == 0
+
+def test_truncated_target_is_reloaded(customers):
+    load(customers)
+    with customers.begin() as conn:
+        conn.exec_driver_sql("TRUNCATE public.customers")
+
+    assert load(customers) == 2
+
+def test_deleted_row_is_reloaded(customers):
+    load(customers)
+    with customers.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM public.customers WHERE customer_id = 2")
+
+    assert load(customers) == 1
+    with customers.connect() as conn:
+        assert conn.exec_driver_sql("SELECT count(*) FROM public.customers").scalar() == 2
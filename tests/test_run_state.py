@@ -0,0 +1,73 @@
+"""
+The run-state manifest: failed runs resume with their done units, within the attempt and age bounds.
+"""
+import json
+from datetime import datetime, timedelta
+import pytest
+from src.utils import run_state
+
+@pytest.fixture(autouse=True)
+def manifest(tmp_path, monkeypatch):
+    path = tmp_path / 'run_state.json'
+    monkeypatch.setattr(run_state, 'RUN_STATE_PATH', str(path))
+    monkeypatch.setattr(run_state, 'RUN_RESUME', True)
+    monkeypatch.setattr(run_state, '_state', None)
+    return path
+
+def failed_run() -> str:
+    run_id = run_state.start_run()
+    run_state.mark_unit('staging.orders', 'success')
+    run_state.mark_unit('staging.customers', 'failed')
+    run_state.finish_run(completed=True)
+    return run_id
+
+def test_failed_run_resumes_with_its_done_units():
+    run_id = failed_run()
+
+    assert run_state.start_run() == run_id
+    assert run_state.is_done('staging.orders')
+    assert not run_state.is_done('staging.customers')
+    assert run_state.failed_units() == ['staging.customers']
+
+def test_successful_run_starts_fresh():
+    run_id = run_state.start_run()
+    run_state.mark_unit('staging.orders', 'success')
+    assert run_state.finish_run(completed=True) == 'success'
+
+    assert run_state.start_run() != run_id
+    assert not run_state.is_done('staging.orders')
+
+def test_incomplete_run_fails_even_if_its_units_succeeded():
+    run_state.start_run()
+    run_state.mark_unit('staging.orders', 'success')
+    assert run_state.finish_run(completed=False) == 'failed'
+
+def test_resume_false_starts_fresh():
+    run_id = failed_run()
+    assert run_state.start_run(resume=False) != run_id
+
+def test_resume_stops_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(run_state, 'RUN_RESUME_MAX_ATTEMPTS', 2)
+    run_id = failed_run()
+    assert run_state.start_run() == run_id
+    run_state.finish_run(completed=True)
+
+    assert run_state.start_run() != run_id
+
+def test_resume_stops_after_max_age(manifest, monkeypatch):
+    run_id = failed_run()
+    state = json.loads(manifest.read_text())
+    state['started_at'] = str(datetime.now() - timedelta(hours=run_state.RUN_RESUME_MAX_AGE + 1))
+    manifest.write_text(json.dumps(state))
+
+    assert run_state.start_run() != run_id
+
+def test_unreadable_manifest_starts_fresh(manifest):
+    manifest.write_text('{"run_id": "torn')
+    assert run_state.start_run()
+    assert run_state.failed_units() == []
+
+def test_outside_a_run_nothing_is_done(manifest):
+    run_state.mark_unit('staging.orders', 'success')
+    assert not run_state.is_done('staging.orders')
+    assert not manifest.exists()
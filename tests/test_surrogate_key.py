@@ -0,0 +1,52 @@
+"""
+Surrogate key resolution and its missing-key policies.
+"""
+import pandas as pd
+import pytest
+from src.utils.surrogate_key import build_key_lookup, resolve_surrogate_key, UNKNOWN_MEMBER_KEY
+
+@pytest.fixture
+def facts() -> pd.DataFrame:
+    return pd.DataFrame({'order_id': [1, 2, 3], 'customer_id': [10, 99, None]})
+
+@pytest.fixture
+def lookup() -> pd.Series:
+    dim = pd.DataFrame({'nk_customer_id': [10, 20, 10, None], 'sk_customer_id': [1, 2, 3, 4]})
+    return build_key_lookup(dim, 'nk_customer_id', 'sk_customer_id')
+
+def test_lookup_keeps_the_last_member_of_a_key(lookup):
+    assert lookup.to_dict() == {10: 3, 20: 2}
+
+def test_null_policy_keeps_rows_with_null_keys(facts, lookup):
+    data, rejected = resolve_surrogate_key(facts, 'customer_id', lookup, 'sk_customer_id')
+
+    assert data['sk_customer_id'].tolist() == [3, pd.NA, pd.NA]
+    assert str(data['sk_customer_id'].dtype) == 'Int64'
+    assert rejected.empty
+
+def test_unknown_policy_points_at_the_unknown_member(facts, lookup):
+    data, _ = resolve_surrogate_key(facts, 'customer_id', lookup, 'sk_customer_id', on_missing='unknown')
+
+    # A null natural key stays null: only keys without a member are unknown
+    assert data['sk_customer_id'].tolist() == [3, UNKNOWN_MEMBER_KEY, pd.NA]
+
+def test_reject_policy_returns_unknown_keys_apart(facts, lookup):
+    data, rejected = resolve_surrogate_key(facts, 'customer_id', lookup, 'sk_customer_id', on_missing='reject')
+
+    assert data['order_id'].tolist() == [1, 3]
+    assert rejected['order_id'].tolist() == [2]
+    assert 'sk_customer_id' not in rejected.columns
+
+def test_dict_lookup_and_input_left_unchanged(facts):
+    data, _ = resolve_surrogate_key(facts, 'customer_id', {10: 7}, 'sk_customer_id')
+
+    assert data['sk_customer_id'].tolist()[0] == 7
+    assert 'sk_customer_id' not in facts.columns
+
+def test_empty_lookup(facts):
+    data, rejected = resolve_surrogate_key(facts, 'customer_id', {}, 'sk_customer_id', on_missing='reject')
+    assert data['order_id'].tolist() == [3] and len(rejected) == 2
+
+def test_unknown_policy_name_is_refused(facts, lookup):
+    with pytest.raises(ValueError, match='policy'):
+        resolve_surrogate_key(facts, 'customer_id', lookup, 'sk_customer_id', on_missing='drop')
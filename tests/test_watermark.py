@@ -0,0 +1,25 @@
+"""
+The watermark cache must never silently empty, which would reload every table from INITIAL_ETL_DATE.
+"""
+import pytest
+from src.utils import watermark
+
+def unreachable():
+    raise ConnectionError("log database is down")
+
+def test_refresh_keeps_previous_watermarks_on_error(monkeypatch):
+    key = ('staging', 'load', 'success', 'orders')
+    monkeypatch.setattr(watermark, '_watermarks', {key: '2024-01-01 00:00:00'})
+    monkeypatch.setattr(watermark, '_fetch_watermarks', unreachable)
+
+    watermark.refresh_watermarks()
+
+    assert watermark.get_watermark('staging', 'orders') == '2024-01-01 00:00:00'
+
+def test_first_load_error_is_raised(monkeypatch):
+    monkeypatch.setattr(watermark, '_watermarks', None)
+    monkeypatch.setattr(watermark, '_fetch_watermarks', unreachable)
+
+    with pytest.raises(ConnectionError):
+        watermark.get_watermark('staging', 'orders')
+    assert watermark._watermarks is None